@@ -0,0 +1,28 @@
+from typing import Dict, List
+import math
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """ nearest-rank 방식으로 samples의 q(0~100) 백분위 값을 구합니다.
+
+    """
+    if not samples:
+        return 0.0
+
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples: List[float], elapsed: float) -> Dict[str, float]:
+    """ 지연 시간(초) 리스트를 ms 단위의 p50/p95/p99와 초당 처리량으로 요약합니다.
+
+    """
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "max_ms": round(max(samples, default=0.0) * 1000, 2),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed > 0 else 0.0,
+    }
@@ -0,0 +1,71 @@
+""" 예외 로그가 몰릴 때 로그를 남기는 쪽(이벤트 루프)이 쓰는 시간을 이전 방식과 지금 방식으로 비교합니다. DB가 필요 없습니다.
+
+    python -m benchmark.error_storm [--errors 10000]
+
+    before: except 블록에서 traceback.format_exception 으로 문자열을 만들고 StreamHandler 가 바로 씀
+    after:  logging.error(e, exc_info=e) 를 utility.log 의 QueueHandler 로 넣음 (포맷과 쓰기는 listener 스레드, 중복 억제 포함)
+
+    출력은 /dev/null 로 보내고, 결과는 로그 한 번당 호출한 쪽 시간(µs) 중앙값/p99 를 JSON 으로 출력합니다.
+"""
+from benchmark.common import percentile
+import statistics
+import traceback
+import argparse
+import logging
+import json
+import time
+import os
+
+
+def nested(depth: int):
+    if depth == 0:
+        raise ValueError("invalid input syntax for type uuid")
+
+    nested(depth - 1)
+
+
+def storm(log, errors: int) -> list:
+    samples = []
+    for _ in range(errors):
+        try:
+            nested(10)
+
+        except Exception as e:
+            started = time.perf_counter()
+            log(e)
+            samples.append(time.perf_counter() - started)
+
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--errors", type=int, default=10000)
+    args = parser.parse_args()
+
+    from utility import log as log_module
+
+    devnull = open(os.devnull, "w")
+    root = logging.getLogger()
+
+    handler = logging.StreamHandler(devnull)
+    root.handlers, root.level = [handler], logging.INFO
+    before = storm(lambda e: logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}"), args.errors)
+
+    log_module.setup_logging("INFO")
+    for listener_handler in log_module._listener.handlers:
+        listener_handler.setStream(devnull)
+
+    after = storm(lambda e: logging.error(e, exc_info=e), args.errors)
+    log_module.shutdown_logging()
+
+    results = {}
+    for name, samples in {"before": before, "after": after}.items():
+        results[name] = {"median_us": round(statistics.median(samples) * 1e6, 2),
+                         "p99_us": round(percentile(samples, 99) * 1e6, 2)}
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+""" 실제 사용 패턴을 흉내 낸 부하 시나리오를 돌리고 엔드포인트 별 p50/p95/p99 와 처리량을 JSON 파일로 남깁니다.
+
+    python -m benchmark.seed --universities 400 --accounts 10000 --follows 5 --articles 1000000
+    python -m benchmark.load --duration 60 --output load.json                     # 떠 있는 서버(--base-url)에 요청
+    python -m benchmark.load --in-process --duration 60 --output load.json        # main.app 을 같은 프로세스에서 ASGI 로 호출
+
+    시나리오마다 --*-workers 개의 가상 사용자가 --duration 초 동안 반복합니다.
+    - register: 새 계정 회원가입 + 로그인 (아이디는 benchmark.seed 와 같은 bench + 7자리, 9000000 번부터 사용)
+    - feed: benchmark.seed 로 만든 bench 계정으로 로그인한 다음 GET /article 을 next_cursor 로 --pages 쪽까지 넘기기를 반복
+    - posting: bench 계정으로 이미지 0~3장을 붙여 PUT /article/posting
+    - logo: GET /univ/ 로 받은 대학교의 GET /univ/logo/{u_uuid}, 가끔 POST /univ/logo/sprite
+
+    만든 데이터는 python -m benchmark.seed --cleanup 으로 지웁니다.
+"""
+from benchmark.common import summarize
+from benchmark.seed import ACCOUNT_PREFIX, DEFAULT_PASSWORD
+from collections import defaultdict, Counter
+from datetime import datetime
+from PIL import Image
+import subprocess
+import argparse
+import asyncio
+import random
+import httpx
+import json
+import time
+import io
+
+REGISTER_ID_START = 9_000_000
+SPRITE_EVERY = 10  # logo 시나리오에서 몇 번에 한 번 스프라이트를 요청할지
+
+
+class Recorder:
+    """ 엔드포인트 별 지연 시간과 상태 코드를 모읍니다. 엔드포인트 이름은 "METHOD 경로 템플릿" 입니다.
+
+    """
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.iterations = Counter()
+
+    async def request(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status = str(response.status_code)
+
+        except httpx.HTTPError as e:
+            response, status = None, type(e).__name__
+
+        self.samples[endpoint].append(time.perf_counter() - started)
+        self.statuses[endpoint][status] += 1
+        # in-process 로 돌릴 때 I/O 없이 끝나는 요청만 반복하는 시나리오가 다른 시나리오를 굶기지 않도록 양보합니다.
+        await asyncio.sleep(0)
+        return response
+
+    def report(self, elapsed: float) -> dict:
+        return {endpoint: {**summarize(samples, elapsed), "status": dict(self.statuses[endpoint])}
+                for endpoint, samples in sorted(self.samples.items())}
+
+
+def make_jpeg(rng: random.Random, size=(800, 600)) -> bytes:
+    buffer = io.BytesIO()
+    Image.effect_noise(size, rng.randint(32, 96)).convert("RGB").save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+async def login(client: httpx.AsyncClient, recorder: Recorder, user_id: str, password: str) -> str | None:
+    response = await recorder.request(client, "POST /account/login", "POST", "/account/login",
+                                      data={"username": user_id, "password": password})
+    if response is None or response.status_code != 200:
+        return None
+
+    return response.json().get("token")
+
+
+def bench_id(number: int) -> str:
+    return f"{ACCOUNT_PREFIX}{number:07d}"
+
+
+async def register_user(client: httpx.AsyncClient, recorder: Recorder, args, state: dict, deadline: float):
+    while time.perf_counter() < deadline:
+        number = state["next_id"]
+        state["next_id"] += 1
+        user_id = bench_id(number)
+        body = {"user_id": user_id, "password": args.password, "nickname": user_id, "email": f"{user_id}@bench.local",
+                "phone": f"099-{number:09d}", "u_uuid": random.choice(state["univs"]), "s_id": "20240000"}
+        await recorder.request(client, "PUT /account/register", "PUT", "/account/register", json=body)
+        await login(client, recorder, user_id, args.password)
+        recorder.iterations["register"] += 1
+
+
+async def feed_user(client: httpx.AsyncClient, recorder: Recorder, args, state: dict, deadline: float):
+    token = await login(client, recorder, bench_id(random.randint(1, args.accounts)), args.password)
+    if token is None:
+        return
+
+    while time.perf_counter() < deadline:
+        after = None
+        for _ in range(args.pages):
+            params = {"access_token": token} | ({"after": after} if after else {})
+            response = await recorder.request(client, "GET /article", "GET", "/article", params=params)
+            after = response.json().get("next_cursor") if response is not None and response.status_code == 200 else None
+            if after is None:
+                break
+
+        recorder.iterations["feed"] += 1
+
+
+async def posting_user(client: httpx.AsyncClient, recorder: Recorder, args, state: dict, deadline: float):
+    token = await login(client, recorder, bench_id(random.randint(1, args.accounts)), args.password)
+    if token is None:
+        return
+
+    while time.perf_counter() < deadline:
+        images = random.sample(state["images"], random.randint(0, min(3, len(state["images"]))))
+        params = {"title": "부하 테스트", "content": "벤치마크로 작성한 게시물입니다. " * 5,
+                  "is_anonymous": random.random() < 0.3, "access_token": token}
+        files = [("images_files", (f"bench{index}.jpeg", data, "image/jpeg")) for index, data in enumerate(images)]
+        await recorder.request(client, "PUT /article/posting", "PUT", "/article/posting", params=params, files=files or None)
+        recorder.iterations["posting"] += 1
+
+
+async def logo_user(client: httpx.AsyncClient, recorder: Recorder, args, state: dict, deadline: float):
+    while time.perf_counter() < deadline:
+        if recorder.iterations["logo"] % SPRITE_EVERY == 0:
+            body = {"u_uuids": random.sample(state["univs"], min(16, len(state["univs"]))), "size": 64, "format": "png"}
+            await recorder.request(client, "POST /univ/logo/sprite", "POST", "/univ/logo/sprite", json=body)
+        else:
+            await recorder.request(client, "GET /univ/logo/{u_uuid}", "GET", f"/univ/logo/{random.choice(state['univs'])}")
+
+        recorder.iterations["logo"] += 1
+
+
+SCENARIOS = {"register": register_user, "feed": feed_user, "posting": posting_user, "logo": logo_user}
+
+
+async def run(client: httpx.AsyncClient, args) -> dict:
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+    recorder = Recorder()
+
+    response = await recorder.request(client, "GET /univ/", "GET", "/univ/")
+    univs = [univ["u_uuid"] for univ in response.json()["univ_list"]] if response is not None and response.status_code == 200 else []
+    if not univs:
+        raise SystemExit("GET /univ/ 가 대학교를 돌려주지 않았습니다. benchmark.seed 로 데이터를 먼저 만드세요.")
+
+    state = {"univs": univs, "images": [make_jpeg(rng) for _ in range(args.images)],
+             "next_id": REGISTER_ID_START + rng.randrange(0, 900_000, 1000)}
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    workers = [scenario(client, recorder, args, state, deadline)
+               for name, scenario in SCENARIOS.items() for _ in range(getattr(args, f"{name}_workers"))]
+    await asyncio.gather(*workers)
+    elapsed = time.perf_counter() - started
+
+    return {"elapsed_s": round(elapsed, 2), "iterations": dict(recorder.iterations), "endpoints": recorder.report(elapsed)}
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args):
+    total_workers = sum(getattr(args, f"{name}_workers") for name in SCENARIOS)
+    limits = httpx.Limits(max_connections=total_workers + 1)
+    if args.in_process:
+        from main import app
+
+        # ASGITransport 는 lifespan 을 실행하지 않으므로 서버처럼 직접 열고 닫습니다.
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+                result = await run(client, args)
+    else:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=60, limits=limits) as client:
+            result = await run(client, args)
+
+    result = {"meta": {"time": datetime.now().isoformat(timespec="seconds"), "revision": git_revision(),
+                       "target": "in-process" if args.in_process else args.base_url, "args": vars(args)}, **result}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    print(json.dumps({endpoint: {key: value[key] for key in ("count", "p50_ms", "p95_ms", "p99_ms", "throughput_rps")}
+                      for endpoint, value in result["endpoints"].items()}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="시나리오 부하 테스트, 엔드포인트 별 p50/p95/p99 와 처리량")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--in-process", action="store_true", help="서버 없이 main.app 을 직접 호출합니다.")
+    parser.add_argument("--duration", type=float, default=30.0, help="초")
+    parser.add_argument("--accounts", type=int, default=10000, help="benchmark.seed 로 만든 계정 수")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="benchmark.seed 의 --password")
+    parser.add_argument("--pages", type=int, default=5, help="feed 시나리오가 한 번에 넘겨 보는 쪽 수")
+    parser.add_argument("--images", type=int, default=8, help="posting 시나리오가 돌려 쓰는 JPEG 수")
+    parser.add_argument("--register-workers", type=int, default=2)
+    parser.add_argument("--feed-workers", type=int, default=16)
+    parser.add_argument("--posting-workers", type=int, default=2)
+    parser.add_argument("--logo-workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="load.json")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,64 @@
+""" 로그인 요청이 몰리는 동안 GET /article 의 지연 시간이 얼마나 늘어나는지 측정합니다.
+
+    python -m benchmark.login_storm --user-id union_id --password union_password
+
+    먼저 로그인 없이 피드를 조회해서 기준 지연 시간을 재고, 그 다음 --logins 개의 동시 로그인 루프를
+    돌리면서 같은 시간 동안 다시 피드를 조회해서 두 결과의 p50/p95/p99 를 JSON으로 출력합니다.
+"""
+from benchmark.common import summarize
+import argparse
+import asyncio
+import httpx
+import json
+import time
+
+
+async def login(client: httpx.AsyncClient, user_id: str, password: str) -> str:
+    response = await client.post("/account/login", data={"username": user_id, "password": password})
+    return response.json()["token"]
+
+
+async def login_loop(client: httpx.AsyncClient, user_id: str, password: str, stop: asyncio.Event) -> int:
+    count = 0
+    while not stop.is_set():
+        await client.post("/account/login", data={"username": user_id, "password": password})
+        count += 1
+
+    return count
+
+
+async def probe_feed(client: httpx.AsyncClient, token: str, duration: float) -> dict:
+    samples = []
+    started = time.perf_counter()
+    while time.perf_counter() - started < duration:
+        request_started = time.perf_counter()
+        await client.get("/article", params={"access_token": token})
+        samples.append(time.perf_counter() - request_started)
+
+    return summarize(samples, time.perf_counter() - started)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    limits = httpx.Limits(max_connections=args.logins + 1)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60, limits=limits) as client:
+        token = await login(client, args.user_id, args.password)
+        baseline = await probe_feed(client, token, args.duration)
+
+        stop = asyncio.Event()
+        storm = [asyncio.create_task(login_loop(client, args.user_id, args.password, stop))
+                 for _ in range(args.logins)]
+        during_logins = await probe_feed(client, token, args.duration)
+        stop.set()
+        logins = sum(await asyncio.gather(*storm))
+
+    return {"baseline": baseline, "during_logins": during_logins, "logins_completed": logins}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GET /article p99 latency under a login storm")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=32, help="동시에 로그인 요청을 보내는 클라이언트 수")
+    parser.add_argument("--duration", type=float, default=10.0, help="각 측정 구간의 길이(초)")
+    print(json.dumps(asyncio.run(run(parser.parse_args())), indent=2))
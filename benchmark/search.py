@@ -0,0 +1,152 @@
+""" GET /article/search 가 쓰는 쿼리의 지연 시간을 합성 데이터로 측정합니다.
+
+    python -m benchmark.search --seed 1000000      # category='bench' 게시물 100만 개 생성 (이미 있는 대학교에 나눠서)
+    python -m benchmark.search --queries 200       # fts 첫 페이지, fts 두 번째 페이지(keyset), trgm 의 p50/p95/p99 측정
+    python -m benchmark.search --explain           # 대표 쿼리의 EXPLAIN (ANALYZE, BUFFERS) 출력
+    python -m benchmark.search --cleanup           # 생성한 게시물 삭제
+
+    user_info.txt 가 있는 저장소 루트에서 실행합니다. university 테이블에 데이터가 있어야 합니다. (python main.py init)
+"""
+from benchmark.common import summarize
+from benchmark.seed import WORDS
+from sqlalchemy import TEXT, text, select, any_, bindparam, ARRAY
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlalchemy.ext.compiler import compiles
+import argparse
+import asyncio
+import random
+import json
+import time
+
+SEED_BATCH_SIZE = 100_000
+
+SEED_SQL = text("""
+    INSERT INTO article (art_uuid, u_uuid, title, content, upload_date, update_date, category, is_anonymous, image_urls, image_types)
+    SELECT gen_random_uuid(),
+           (:univs)[1 + (i % cardinality(:univs))],
+           left(array_to_string(ARRAY(SELECT (:words)[1 + floor(random() * cardinality(:words))::int]
+                                      FROM generate_series(1, 3) WHERE i > 0), ' '), 30),
+           array_to_string(ARRAY(SELECT (:words)[1 + floor(random() * cardinality(:words))::int]
+                                 FROM generate_series(1, 40) WHERE i > 0), ' '),
+           now() - random() * interval '365 days', NULL, 'bench', false, '{}', '{}'
+    FROM generate_series(1, :count) AS i
+""")
+
+
+class Explain(Executable, ClauseElement):
+    """ EXPLAIN (ANALYZE, BUFFERS) 로 감싼 쿼리, 파라미터는 원래 쿼리처럼 바인딩됩니다.
+
+    """
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return f"EXPLAIN (ANALYZE, BUFFERS) {compiler.process(element.statement, **kw)}"
+
+
+async def seed(session, count: int):
+    from models import University
+
+    univs = [row[0] for row in (await session.execute(select(University.u_uuid))).all()]
+    if not univs:
+        raise SystemExit("university 테이블이 비어 있습니다. python main.py init 을 먼저 실행하세요.")
+
+    started = time.perf_counter()
+    for done in range(0, count, SEED_BATCH_SIZE):
+        batch = min(SEED_BATCH_SIZE, count - done)
+        await session.execute(SEED_SQL.bindparams(
+            bindparam("univs", univs, type_=ARRAY(UUID(as_uuid=True))),
+            bindparam("words", WORDS, type_=ARRAY(TEXT)),
+            count=batch))
+        await session.commit()
+        print(f"seeded {done + batch}/{count} ({time.perf_counter() - started:.1f}s)")
+
+    await session.execute(text("ANALYZE article"))
+    await session.commit()
+
+
+async def bench_univs(session) -> list:
+    rows = (await session.execute(text("SELECT DISTINCT u_uuid FROM article WHERE category = 'bench' LIMIT 50"))).all()
+    if not rows:
+        raise SystemExit("벤치마크 데이터가 없습니다. --seed 로 먼저 생성하세요.")
+
+    return [row[0] for row in rows]
+
+
+async def measure(session, queries: int) -> dict:
+    from models.article import Article
+
+    univs = await bench_univs(session)
+    results = {"fts": [], "fts_page2": [], "trgm": []}
+    started = time.perf_counter()
+    for _ in range(queries):
+        u_uuid, term = random.choice(univs), random.choice(WORDS)
+
+        t = time.perf_counter()
+        status_code, result = await Article.search_articles(session, None, term, u_uuid=str(u_uuid))
+        results["fts"].append(time.perf_counter() - t)
+
+        if result["next_cursor"]:
+            t = time.perf_counter()
+            await Article.search_articles(session, None, term, after=result["next_cursor"], u_uuid=str(u_uuid))
+            results["fts_page2"].append(time.perf_counter() - t)
+
+        # 조사가 붙은 부분 문자열 검색은 trgm 경로로 측정합니다.
+        scope = Article.u_uuid == any_(bindparam("followed", [u_uuid], type_=ARRAY(UUID(as_uuid=True))))
+        t = time.perf_counter()
+        (await session.execute(Article._trgm_query(scope, term[1:] or term, None, 10))).all()
+        results["trgm"].append(time.perf_counter() - t)
+
+    elapsed = time.perf_counter() - started
+    return {name: summarize(samples, elapsed) for name, samples in results.items()}
+
+
+async def explain(session):
+    from models.article import Article
+
+    u_uuid = (await bench_univs(session))[0]
+    scope = Article.u_uuid == any_(bindparam("followed", [u_uuid], type_=ARRAY(UUID(as_uuid=True))))
+    for name, query in (("fts", Article._fts_query(scope, [WORDS[0]], None, 10)),
+                        ("trgm", Article._trgm_query(scope, WORDS[5][1:], None, 10))):
+        plan = (await session.execute(Explain(query))).all()
+        print(f"--- {name}")
+        print("\n".join(row[0] for row in plan))
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", type=int, default=0, help="생성할 합성 게시물 수")
+    parser.add_argument("--queries", type=int, default=0, help="측정할 검색 횟수")
+    parser.add_argument("--explain", action="store_true")
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+
+    from database.conn import DBObject
+    import models  # noqa: F401  DBObject 생성
+
+    try:
+        async with DBObject.instance.session_factory() as session:
+            if args.seed:
+                await seed(session, args.seed)
+
+            if args.queries:
+                print(json.dumps(await measure(session, args.queries), indent=2))
+
+            if args.explain:
+                await explain(session)
+
+            if args.cleanup:
+                await session.execute(text("DELETE FROM article WHERE category = 'bench'"))
+                await session.commit()
+
+    finally:
+        await DBObject.instance.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,230 @@
+""" 부하 테스트용 합성 데이터를 로컬 PostgreSQL 에 넣습니다.
+
+    python -m benchmark.seed --universities 400 --accounts 10000 --follows 5 --articles 1000000 --images 20
+    python -m benchmark.seed --cleanup
+
+    - universities: university 테이블이 이 개수보다 적으면 "벤치대학교N" 을 더 만듭니다. (CareerNet 데이터가 없어도 됩니다.)
+    - accounts: id/nickname 이 bench0000001 형태인 계정, 비밀번호는 모두 --password (bcrypt 해시는 한 번만 계산)
+    - follows: 계정마다 무작위 대학교 팔로우 수 (중복은 건너뜀)
+    - articles: 무작위 bench 계정이 쓴 게시물 (category='bench'), --image-ratio 비율로 images/article/bench-NNN.jpeg 첨부
+
+    모든 INSERT 는 generate_series 로 한 문장에 SEED_BATCH_SIZE 행씩 넣습니다. 문장마다 setseed() 를 먼저 실행하므로
+    --seed 가 같으면 uuid 를 빼고 같은 데이터(제목, 본문, 작성자, 팔로우, 이미지 첨부)가 만들어집니다.
+    끝나면 university_stat 을 다시 집계하고 ANALYZE 합니다. 결과(개수, 걸린 시간)는 JSON 으로 출력합니다.
+"""
+from sqlalchemy import TEXT, text, bindparam, ARRAY
+from sqlalchemy.dialects.postgresql import UUID
+from PIL import Image
+import argparse
+import asyncio
+import random
+import json
+import time
+import os
+
+SEED_BATCH_SIZE = 100_000
+ACCOUNT_PREFIX = "bench"
+ACCOUNT_PATTERN = f"^{ACCOUNT_PREFIX}[0-9]{{7}}$"
+BENCH_UNIV_PREFIX = "벤치대학교"
+IMAGE_DIR = "images/article"
+DEFAULT_PASSWORD = "bench-password"
+WORDS = ["학교", "축제", "시험", "기숙사", "동아리", "수강신청", "도서관", "장학금", "교수님", "과제",
+         "졸업", "취업", "인턴", "학식", "버스", "알바", "공모전", "스터디", "중간고사", "기말고사",
+         "campus", "festival", "library", "exam", "club", "scholarship", "dorm", "study", "intern", "bus"]
+
+UNIVERSITY_SQL = text("""
+    INSERT INTO university (u_uuid, univ_name, link, est_type, univ_gubun, address, logo_path)
+    SELECT gen_random_uuid(), :name_prefix || i, NULL, '사립', '대학교', '서울특별시 벤치구 ' || i, NULL
+    FROM generate_series(:start, :stop) AS i
+    ON CONFLICT DO NOTHING
+""")
+
+ACCOUNT_SQL = text("""
+    INSERT INTO account (a_uuid, id, nickname, password, email, phone, s_id, profile, signup_date, login_date, u_uuid)
+    SELECT gen_random_uuid(), :prefix || lpad(i::text, 7, '0'), :prefix || lpad(i::text, 7, '0'), :password,
+           :prefix || i || '@bench.local', '099-' || lpad(i::text, 9, '0'), '20240000', NULL,
+           now() - random() * interval '365 days', NULL,
+           (:univs)[1 + floor(random() * cardinality(:univs))::int]
+    FROM generate_series(:start, :stop) AS i
+    ON CONFLICT DO NOTHING
+""")
+
+FOLLOWING_SQL = text("""
+    INSERT INTO following (f_uuid, a_uuid, u_uuid, following_date)
+    SELECT gen_random_uuid(), a.a_uuid, (:univs)[1 + floor(random() * cardinality(:univs))::int], now()
+    FROM account a CROSS JOIN generate_series(1, :per_account) AS g
+    WHERE a.id ~ :pattern
+    ON CONFLICT (a_uuid, u_uuid) DO NOTHING
+""")
+
+# 상관 서브쿼리의 WHERE s.i > 0 은 행마다 단어를 새로 뽑게 하려는 것입니다.
+ARTICLE_SQL = text("""
+    INSERT INTO article (art_uuid, a_uuid, u_uuid, title, content, upload_date, update_date, category, is_anonymous, image_urls, image_types)
+    SELECT gen_random_uuid(), acc.a_uuid,
+           coalesce(acc.u_uuid, (:univs)[1 + (s.i % cardinality(:univs))]),
+           left(array_to_string(ARRAY(SELECT (:words)[1 + floor(random() * cardinality(:words))::int]
+                                      FROM generate_series(1, 3) WHERE s.i > 0), ' '), 30),
+           array_to_string(ARRAY(SELECT (:words)[1 + floor(random() * cardinality(:words))::int]
+                                 FROM generate_series(1, 40) WHERE s.i > 0), ' '),
+           now() - random() * interval '365 days', NULL, 'bench', random() < 0.3,
+           CASE WHEN s.has_image THEN ARRAY[(:images)[1 + (s.i % greatest(cardinality(:images), 1))]] ELSE '{}'::text[] END,
+           CASE WHEN s.has_image THEN ARRAY['jpeg']::varchar[] ELSE '{}'::varchar[] END
+    FROM (SELECT i, random() < :image_ratio AS has_image, 1 + floor(random() * greatest(:accounts, 1))::int AS author
+          FROM generate_series(1, :count) AS i) AS s
+    LEFT JOIN account acc ON :accounts > 0 AND acc.id = :prefix || lpad(s.author::text, 7, '0')
+""")
+
+
+def _batches(count: int):
+    for start in range(1, count + 1, SEED_BATCH_SIZE):
+        yield start, min(start + SEED_BATCH_SIZE - 1, count)
+
+
+async def _setseed(session, seed: int):
+    # random() 의 시작값은 커넥션마다 따로이고 commit 하면 커넥션이 풀로 돌아가므로, INSERT 와 같은 트랜잭션에서 매번 정합니다.
+    await session.execute(text("SELECT setseed(:seed)").bindparams(seed=(seed % 1000) / 1000))
+
+
+async def _univ_uuids(session) -> list:
+    return [row[0] for row in (await session.execute(text("SELECT u_uuid FROM university ORDER BY u_uuid"))).all()]
+
+
+async def seed_universities(session, count: int) -> int:
+    existing = len(await _univ_uuids(session))
+    if existing >= count:
+        return 0
+
+    await session.execute(UNIVERSITY_SQL.bindparams(name_prefix=BENCH_UNIV_PREFIX, start=existing + 1, stop=count))
+    await session.commit()
+    return count - existing
+
+
+async def seed_accounts(session, count: int, password: str, seed: int = 0) -> int:
+    from utility.password import hash_password
+
+    univs = await _univ_uuids(session)
+    hashed = await hash_password(password)
+    for start, stop in _batches(count):
+        await _setseed(session, seed + start)
+        await session.execute(ACCOUNT_SQL.bindparams(
+            bindparam("univs", univs, type_=ARRAY(UUID(as_uuid=True))),
+            prefix=ACCOUNT_PREFIX, password=hashed, start=start, stop=stop))
+        await session.commit()
+
+    return count
+
+
+async def seed_follows(session, per_account: int, seed: int = 0) -> int:
+    univs = await _univ_uuids(session)
+    await _setseed(session, seed)
+    result = await session.execute(FOLLOWING_SQL.bindparams(
+        bindparam("univs", univs, type_=ARRAY(UUID(as_uuid=True))),
+        per_account=per_account, pattern=ACCOUNT_PATTERN))
+    await session.commit()
+    return result.rowcount
+
+
+def make_images(count: int, seed: int) -> list:
+    """ 첨부용 JPEG 와 그 variant 를 images/article 에 만듭니다. 이미 있으면 다시 만들지 않습니다.
+
+    """
+    from utility.derivative import generate_derivatives
+
+    rng = random.Random(seed)
+    os.makedirs(IMAGE_DIR, exist_ok=True)
+    paths = []
+    for index in range(count):
+        path = os.path.join(IMAGE_DIR, f"bench-{index:03d}.jpeg")
+        if not os.path.exists(path):
+            Image.effect_noise((1280, 960), rng.randint(32, 96)).convert("RGB").save(path, format="JPEG", quality=85)
+            generate_derivatives(path)
+
+        paths.append(path)
+
+    return paths
+
+
+async def seed_articles(session, count: int, image_paths: list = (), image_ratio: float = 0.0, accounts: int = 0, seed: int = 0, progress: bool = True) -> int:
+    univs = await _univ_uuids(session)
+    if not univs:
+        raise SystemExit("university 테이블이 비어 있습니다. --universities 를 주거나 python main.py init 을 먼저 실행하세요.")
+
+    started = time.perf_counter()
+    for start, stop in _batches(count):
+        await _setseed(session, seed + start)
+        await session.execute(ARTICLE_SQL.bindparams(
+            bindparam("univs", univs, type_=ARRAY(UUID(as_uuid=True))),
+            bindparam("words", WORDS, type_=ARRAY(TEXT)),
+            bindparam("images", list(image_paths), type_=ARRAY(TEXT)),
+            image_ratio=image_ratio if image_paths else 0.0,
+            accounts=accounts, prefix=ACCOUNT_PREFIX, count=stop - start + 1))
+        await session.commit()
+        if progress:
+            print(f"articles {stop}/{count} ({time.perf_counter() - started:.1f}s)")
+
+    return count
+
+
+async def cleanup(session):
+    await session.execute(text("DELETE FROM article WHERE category = 'bench'"))
+    await session.execute(text("DELETE FROM following WHERE a_uuid IN (SELECT a_uuid FROM account WHERE id ~ :pattern)")
+                          .bindparams(pattern=ACCOUNT_PATTERN))
+    await session.execute(text("DELETE FROM account WHERE id ~ :pattern").bindparams(pattern=ACCOUNT_PATTERN))
+    await session.execute(text("DELETE FROM university WHERE univ_name LIKE :prefix || '%'")
+                          .bindparams(prefix=BENCH_UNIV_PREFIX))
+    await session.commit()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="부하 테스트용 합성 데이터 생성")
+    parser.add_argument("--universities", type=int, default=0)
+    parser.add_argument("--accounts", type=int, default=0)
+    parser.add_argument("--follows", type=int, default=0, help="계정마다 팔로우할 대학교 수")
+    parser.add_argument("--articles", type=int, default=0)
+    parser.add_argument("--images", type=int, default=20, help="만들어 둘 첨부 이미지 파일 수")
+    parser.add_argument("--image-ratio", type=float, default=0.2, help="이미지가 첨부된 게시물 비율")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cleanup", action="store_true", help="bench 데이터를 지우고 끝냅니다.")
+    args = parser.parse_args()
+
+    from database.conn import DBObject
+    from models import UniversityStat, create_tables
+
+    await create_tables()
+    timings, counts = {}, {}
+    try:
+        async with DBObject.instance.session_factory() as session:
+            if args.cleanup:
+                await cleanup(session)
+                await UniversityStat.rebuild(session)
+                return
+
+            steps = [
+                ("universities", args.universities, lambda: seed_universities(session, args.universities)),
+                ("accounts", args.accounts, lambda: seed_accounts(session, args.accounts, args.password, args.seed)),
+                ("follows", args.follows, lambda: seed_follows(session, args.follows, args.seed)),
+                ("articles", args.articles, lambda: seed_articles(session, args.articles,
+                                                                  make_images(args.images, args.seed) if args.image_ratio > 0 else [],
+                                                                  args.image_ratio, args.accounts, args.seed)),
+            ]
+            for name, amount, step in steps:
+                if amount:
+                    started = time.perf_counter()
+                    counts[name] = await step()
+                    timings[name] = round(time.perf_counter() - started, 2)
+
+            started = time.perf_counter()
+            await UniversityStat.rebuild(session)
+            await session.execute(text("ANALYZE"))
+            await session.commit()
+            timings["rebuild_and_analyze"] = round(time.perf_counter() - started, 2)
+
+    finally:
+        await DBObject.instance.dispose()
+
+    print(json.dumps({"inserted": counts, "elapsed_s": timings}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
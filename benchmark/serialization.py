@@ -0,0 +1,106 @@
+""" 피드 1000 줄을 응답 본문으로 만드는 비용을 이전 방식과 지금 방식으로 비교합니다. DB가 필요 없습니다.
+
+    python -m benchmark.serialization [--rows 1000] [--repeat 50]
+
+    before: Article ORM 객체 생성 + strftime/str(uuid) 로 만든 dict + stdlib json (JSONResponse)
+    after:  FEED_COLUMNS Row + Article._feed_item (UUID 그대로, isoformat) + orjson (ResponseModel.show_json)
+    univ_list: UniversityCatalog.name_list_json 을 stdlib json 과 orjson 으로 만드는 비용
+
+    결과는 1000 줄 기준 ms (중앙값) 로 JSON 출력합니다.
+"""
+from fastapi.responses import JSONResponse
+from datetime import datetime, timedelta
+from collections import namedtuple
+import statistics
+import argparse
+import random
+import uuid
+import time
+import json
+
+
+def legacy_feed_item(article, author_nickname):
+    """ 바꾸기 전의 Article._feed_item """
+    return {
+        "art_uuid": str(article.art_uuid),
+        "a_uuid": str(article.a_uuid) if author_nickname is not None else "Unknown",
+        "nickname": author_nickname,
+        "title": article.title,
+        "content": article.content,
+        'upload_date': article.upload_date.strftime("%Y-%m-%d %H:%M:%S"),
+        "is_anonymous": article.is_anonymous,
+        "u_uuid": str(article.u_uuid),
+        "images": article.image_urls
+    }
+
+
+def make_values(rows: int) -> list:
+    now = datetime.now()
+    return [dict(art_uuid=uuid.uuid4(), a_uuid=uuid.uuid4(), u_uuid=uuid.uuid4(),
+                 title=f"축제 일정 공유합니다 {i}", content="이번 주 금요일부터 학교 축제가 시작됩니다. " * 5,
+                 upload_date=now - timedelta(seconds=random.randint(0, 10 ** 7)), is_anonymous=False,
+                 image_urls=[f"/article/image?image_path={uuid.uuid4()}.webp"], nickname="유니")
+            for i in range(rows)]
+
+
+def measure(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    from models.article import Article, FEED_COLUMNS
+    from models.response import ResponseModel
+    from models.university import UniversityNameModel
+    import orjson
+
+    values = make_values(args.rows)
+    FeedRow = namedtuple("FeedRow", [column.key for column in FEED_COLUMNS] + ["nickname"])
+    columns = [column.key for column in FEED_COLUMNS]
+
+    def before():
+        articles = [(Article(a_uuid=v["a_uuid"], u_uuid=v["u_uuid"], title=v["title"], content=v["content"],
+                             upload_date=v["upload_date"], is_anonymous=v["is_anonymous"], art_uuid=v["art_uuid"],
+                             image_urls=v["image_urls"]), v["nickname"]) for v in values]
+        items = [legacy_feed_item(article, nickname) for article, nickname in articles]
+        return JSONResponse({"status_code": 200, "articles": items}).body
+
+    def after():
+        rows = [FeedRow(*(v[key] for key in columns), v["nickname"]) for v in values]
+        items = [Article._feed_item(row, row.nickname) for row in rows]
+        return ResponseModel.show_json(200, articles=items).body
+
+    assert json.loads(before()) == json.loads(after()), "응답 본문이 달라졌습니다."
+
+    Name = namedtuple("Name", ["u_uuid", "univ_name", "address"])
+    names = [UniversityNameModel(Name(uuid.uuid4(), f"대학교{i}", "서울특별시 어딘가")) for i in range(args.rows)]
+
+    def univ_before():
+        return json.dumps([{"u_uuid": str(model.u_uuid), "univ_name": model.info["univ_name"]} for model in names],
+                          ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def univ_after():
+        return orjson.dumps([model.info for model in names])
+
+    scale = 1000 / args.rows * 1000
+    results = {}
+    for name, (old, new) in {"feed": (before, after), "univ_list": (univ_before, univ_after)}.items():
+        old_ms, new_ms = measure(old, args.repeat) * scale, measure(new, args.repeat) * scale
+        results[name] = {"before_ms_per_1k": round(old_ms, 3), "after_ms_per_1k": round(new_ms, 3),
+                         "speedup": round(old_ms / new_ms, 2) if new_ms else None}
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+""" 워커 하나가 요청을 받을 수 있을 때까지 걸리는 시간을 재고 예산을 넘으면 실패합니다.
+
+    python -m benchmark.startup [--runs 5] [--import-budget-ms 1500] [--lifespan --startup-budget-ms 200]
+
+    import: 새 파이썬 프로세스에서 `import main` 에 걸리는 시간 (--runs 번 측정)
+    lifespan: 이미 import 된 앱의 lifespan 시작 구간 (카탈로그, 로고 적재) 시간, DB가 필요해서 --lifespan 을 줄 때만 측정
+
+    결과는 JSON으로 출력하고, 중앙값이 예산을 넘으면 종료 코드 1로 끝납니다.
+"""
+import statistics
+import subprocess
+import argparse
+import asyncio
+import json
+import time
+import sys
+
+IMPORT_BUDGET_MS = 1500
+STARTUP_BUDGET_MS = 200
+IMPORT_PROBE = "import time; started = time.perf_counter(); import main; print(time.perf_counter() - started)"
+
+
+def measure_import(runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", IMPORT_PROBE], capture_output=True, text=True, check=True)
+        samples.append(float(output.stdout.strip().splitlines()[-1]))
+
+    return samples
+
+
+async def measure_lifespan(runs: int) -> list:
+    import main
+
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        async with main.lifespan(main.app):
+            samples.append(time.perf_counter() - started)
+
+    return samples
+
+
+def report(samples: list, budget_ms: float) -> dict:
+    median_ms = statistics.median(samples) * 1000
+    return {
+        "runs": len(samples),
+        "median_ms": round(median_ms, 2),
+        "max_ms": round(max(samples) * 1000, 2),
+        "budget_ms": budget_ms,
+        "ok": median_ms <= budget_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--lifespan", action="store_true", help="DB에 연결해서 lifespan 시작 시간도 측정합니다.")
+    parser.add_argument("--startup-budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    args = parser.parse_args()
+
+    results = {"import": report(measure_import(args.runs), args.import_budget_ms)}
+    if args.lifespan:
+        results["lifespan"] = report(asyncio.run(measure_lifespan(args.runs)), args.startup_budget_ms)
+
+    print(json.dumps(results, indent=2))
+    if not all(result["ok"] for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
-from sqlalchemy.engine import create_engine
-from sqlalchemy.orm import sessionmaker
-from typing import Dict, Any
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from utility.slow_query import install_slow_query_log, SLOW_QUERY_LOG
+from typing import Dict, Any, AsyncIterator
 
 
 def load_postgresql_user_info() -> Dict[str, Any]:
@@ -15,6 +15,18 @@ def load_postgresql_user_info() -> Dict[str, Any]:
         - IndexError: user_info.txt 파일에서 키와 값의 개수가 맞지 않을 때 발생하는 에러입니다.
         - KeyError: user_info.txt 파일에서 필요한 정보가 부족할 때 발생하는 에러입니다.
 
+    ### Optional
+        - pool_size: 커넥션 풀에 유지할 커넥션 개수 (기본값 10)
+        - max_overflow: pool_size를 넘어서 추가로 열 수 있는 커넥션 개수 (기본값 20)
+        - pool_recycle: 커넥션을 재생성하기까지의 시간(초) (기본값 1800)
+        - pool_timeout: 풀에서 커넥션을 기다리는 최대 시간(초) (기본값 30)
+        - feed_notify: true면 실시간 피드를 PostgreSQL LISTEN/NOTIFY로 워커끼리 공유 (여러 워커로 띄울 때, 기본값 false)
+        - slow_query_ms: 이 시간(ms) 이상 걸린 SQL 문을 기록 (없으면 기록하지 않음)
+        - slow_query_explain_rate: 느린 SELECT 문의 EXPLAIN (ANALYZE, BUFFERS) 를 실행할 확률 (기본값 0.1)
+        - slow_query_log: 느린 쿼리 회전 로그 파일 경로 (기본값 ./logs/slow_query.log)
+        - log_level: 애플리케이션 로그 레벨 (기본값 INFO)
+        - log_file: 애플리케이션 로그(JSON 한 줄씩)를 stderr 와 함께 남길 회전 로그 파일 경로 (없으면 stderr 에만)
+
     ### Returns
         Dict[str, Any]: user_info.txt 파일에서 불러온 정보들을 반환합니다.
     """
@@ -48,19 +60,34 @@ def load_postgresql_user_info() -> Dict[str, Any]:
 
 class DBObject(object):
     """ DBObject 클래스는 데이터베이스 시스템에 연결 해주는 패키지 입니다.
+        asyncpg 기반의 AsyncEngine과 커넥션 풀을 가지고 있으며,
+        요청마다 get_session()으로 독립된 AsyncSession을 발급합니다.
 
     """
     def __init__(self):
         user_info = load_postgresql_user_info()
-        DB_URL = f'''postgresql://{user_info["user"]}:\
+        DB_URL = f'''postgresql+asyncpg://{user_info["user"]}:\
             {user_info["password"]}@{user_info["host"]}:{user_info["port"]}/\
             {user_info["db"]}'''
-        self.engine = create_engine(DB_URL.replace(" ", ""))
-        self.session = sessionmaker(bind=self.engine)()
-
-    def __del__(self):
-        self.engine.dispose()
-        self.session.close()
+        self.engine = create_async_engine(
+            DB_URL.replace(" ", ""),
+            pool_size=int(user_info.get("pool_size", 10)),
+            max_overflow=int(user_info.get("max_overflow", 20)),
+            pool_recycle=int(user_info.get("pool_recycle", 1800)),
+            pool_timeout=int(user_info.get("pool_timeout", 30)),
+            pool_pre_ping=True
+        )
+        self.session_factory = async_sessionmaker(bind=self.engine, expire_on_commit=False)
+        self.feed_notify = user_info.get("feed_notify", "false").lower() == "true"
+        self.log_level = user_info.get("log_level", "INFO")
+        self.log_file = user_info.get("log_file")
+        if "slow_query_ms" in user_info:
+            install_slow_query_log(self.engine, float(user_info["slow_query_ms"]),
+                                   float(user_info.get("slow_query_explain_rate", 0.1)),
+                                   user_info.get("slow_query_log", SLOW_QUERY_LOG))
+
+    async def dispose(self):
+        await self.engine.dispose()
 
     # DBObject 클래스를 싱글톤으로 구현
     def __new__(cls):
@@ -68,3 +95,14 @@ class DBObject(object):
             cls.instance = super(DBObject, cls).__new__(cls)
 
         return cls.instance
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """ get_session() 함수는 요청마다 커넥션 풀에서 AsyncSession을 하나 발급하는 FastAPI 의존성입니다.
+        요청이 끝나면 세션을 닫고 커넥션을 풀에 반납합니다.
+
+    ### Yields
+        AsyncSession: 요청 하나에서만 사용하는 데이터베이스 세션
+    """
+    async with DBObject.instance.session_factory() as session:
+        yield session
@@ -1,16 +1,53 @@
 from models.response import ResponseModel, ResponseStatusCode
+from utility.derivative import shutdown_derivative_executor
+from utility.password import shutdown_password_executor
+from utility.auth import AuthenticationError
+from utility.feed import FeedHub
+from utility.metrics import MetricsMiddleware, install_query_hooks
+from utility.log import RequestIdMiddleware, setup_logging
 from fastapi.exceptions import RequestValidationError
 from starlette.middleware.cors import CORSMiddleware
 from env.UNIVERSITY import CARRERNET_URL, API_KEY
 from fastapi.openapi.utils import get_openapi
+from contextlib import asynccontextmanager
+from models import University, UniversityCatalog, UniversityStat, LogoStore, LoginDateBuffer, Article, create_tables
 from database.conn import DBObject
-from models import University
 from fastapi import FastAPI
+import logging
+import asyncio
 import uvicorn
 import routers
+import sys
 
+setup_logging(DBObject.instance.log_level, DBObject.instance.log_file)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 테이블 생성과 대학교 데이터 수집은 `python main.py init` 에서 한 번만 하고,
+    # 워커는 메모리 캐시만 채운 뒤 바로 요청을 받습니다.
+    async with DBObject.instance.session_factory() as session:
+        status_code, _ = await UniversityCatalog.load(session)
+        if status_code != ResponseStatusCode.SUCCESS:
+            logging.warning("University catalog is empty. Run `python main.py init` first.")
+
+        await LogoStore.load(session)
+
+    await FeedHub.start(DBObject.instance.engine, DBObject.instance.feed_notify, replay=Article.get_articles_posted_since)
+    LoginDateBuffer.start(DBObject.instance.engine)
+    # `python main.py init` 이 대학교 목록을 바꾸면 떠 있는 워커도 카탈로그와 로고를 다시 불러옵니다.
+    UniversityCatalog.start(DBObject.instance.session_factory, on_change=[LogoStore.load])
+
+    yield
+    await UniversityCatalog.stop()
+    await FeedHub.stop()
+    await LoginDateBuffer.stop()
+    shutdown_password_executor()
+    shutdown_derivative_executor()
+    await DBObject.instance.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 def custom_openapi():
     if not app.openapi_schema:
@@ -40,6 +77,8 @@ app.include_router(routers.univ_router)
 app.include_router(routers.account_router)
 app.include_router(routers.article_router)
 app.include_router(routers.following_router)
+app.include_router(routers.metrics_router)
+app.include_router(routers.admin_router)
 
 app.add_middleware(
     CORSMiddleware,
@@ -48,26 +87,65 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# CORS 처리까지 포함한 요청 시간을 잽니다.
+app.add_middleware(MetricsMiddleware)
+# 요청 ID는 가장 바깥에서 정해서 모든 미들웨어의 로그에 붙게 합니다.
+app.add_middleware(RequestIdMiddleware)
+install_query_hooks(DBObject.instance.engine)
+
+@app.exception_handler(AuthenticationError)
+async def authentication_exception_handler(request, exc: AuthenticationError):
+    return ResponseModel.show_json(
+        status_code=exc.status_code.value,
+        message=exc.message,
+        detail=exc.detail.text
+    )
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request, exc):
     data = exc.__dict__["_errors"][0]
     message = "데이터를 서버에 전송해 주세요." if data["type"] == "missing" else "Validation 오류가 발생하였습니다."
-    print(data)
+    logging.info("Request validation failed", extra={"fields": {"error_type": data["type"], "loc": data["loc"]}})
     return ResponseModel.show_json(
         status_code=422,
         message=message,
         detail=f"{data['type']} {data['loc'][0]} in {data['loc'][1]}, {data['msg']}"
     )
 
+async def init(fixture_dir: str | None = None) -> bool:
+    """ 테이블 생성, 대학교 데이터 수집(upsert), 로고 확인을 한 번에 실행하는 초기화 명령입니다.
+        서버를 띄우기 전에 `python main.py init` 으로 실행하고, 대학교 목록을 갱신할 때 다시 실행해도 됩니다.
+        `python main.py init --fixtures DIR` 은 CareerNet 대신 저장된 응답으로 데이터를 넣습니다.
+
+    """
+    await create_tables()
+    try:
+        async with DBObject.instance.session_factory() as session:
+            status_code, result = await University._init_univ(session, CARRERNET_URL, API_KEY, fixture_dir)
+            if status_code != ResponseStatusCode.SUCCESS:
+                logging.error("University init failed: %s", result.text)
+                return False
+
+            logging.info("University init finished: %s", result)
+
+            status_code, result = await UniversityStat.rebuild(session)
+            if status_code != ResponseStatusCode.SUCCESS:
+                logging.error("University stat rebuild failed: %s", result.text)
+                return False
+
+            status_code, data = await University._check_image_exist(session)
+            if status_code != ResponseStatusCode.SUCCESS:
+                logging.warning("University logo check failed: %s", data.text)
+
+            return True
+
+    finally:
+        # 커넥션은 이 이벤트 루프에 묶여 있으므로 uvicorn 실행 전에 풀을 비워줍니다.
+        await DBObject.instance.dispose()
+
 if __name__ == "__main__":
-    status_code, data = University._check_data_exist(DBObject.instance)
-    if status_code != ResponseStatusCode.CONFLICT:
-        status_code, result = University._init_univ(DBObject.instance, CARRERNET_URL, API_KEY)
-        if status_code != ResponseStatusCode.SUCCESS:
-            print(result.text)
-            exit(0)
-    
-    status_code, data = University._check_image_exist(DBObject.instance)
-    
+    if sys.argv[1:2] == ["init"]:
+        fixture_dir = sys.argv[3] if sys.argv[2:3] == ["--fixtures"] and len(sys.argv) > 3 else None
+        exit(0 if asyncio.run(init(fixture_dir)) else 1)
+
     uvicorn.run("main:app", reload=True, host = "localhost", port = 8000)
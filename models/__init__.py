@@ -1,10 +1,50 @@
-from .account import Account
-from .university import University
-from .article import Article
+from .account import Account, LoginDateBuffer
+from .university import University, UniversityCatalog
+from .logo_store import LogoStore
+from .article import Article, SEARCH_VECTOR_SQL
+from .university_stat import UniversityStat
 from .following import Following
 from database.conn import DBObject
+from sqlalchemy import text
 
-tables = [University, Account, Article, Following]
+tables = [University, Account, Article, Following, UniversityStat]
+# create_all 이 이미 있는 테이블에는 컬럼을 추가하지 않으므로, 나중에 추가된 컬럼은 여기서 만듭니다.
+schema_patches = [
+    f"ALTER TABLE article ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED",
+    # 피드 정렬에 art_uuid 까지 넣은 ix_article_u_uuid_upload_date_art_uuid 로 바뀌었습니다.
+    "DROP INDEX IF EXISTS ix_article_u_uuid_upload_date",
+    # uq_university_name_address 를 만들기 전에 (univ_name, address) 가 같은 대학교를 ctid 가 가장 작은 행 하나로 합칩니다.
+    # account 와 university_stat 은 ON DELETE CASCADE 라서, 지울 행을 가리키던 계정, 게시물, 팔로우를 먼저 남길 행으로 옮깁니다.
+    """CREATE TEMP TABLE university_duplicate ON COMMIT DROP AS
+       SELECT duplicate, keep FROM (
+           SELECT u_uuid AS duplicate, first_value(u_uuid) OVER w AS keep, row_number() OVER w AS n
+           FROM university WINDOW w AS (PARTITION BY univ_name, address ORDER BY ctid)
+       ) AS ranked WHERE n > 1""",
+    "UPDATE account a SET u_uuid = d.keep FROM university_duplicate d WHERE a.u_uuid = d.duplicate",
+    "UPDATE article a SET u_uuid = d.keep FROM university_duplicate d WHERE a.u_uuid = d.duplicate",
+    # 옮기면 uq_following_account_university 와 겹칠 팔로우(이미 남길 행을 팔로우했거나 같은 대학교의 다른 중복을 먼저 팔로우함)는 지웁니다.
+    """DELETE FROM following f USING university_duplicate d
+       WHERE f.u_uuid = d.duplicate AND EXISTS (
+           SELECT 1 FROM following g LEFT JOIN university_duplicate e ON e.duplicate = g.u_uuid
+           WHERE g.a_uuid = f.a_uuid AND coalesce(e.keep, g.u_uuid) = d.keep AND (g.u_uuid = d.keep OR g.ctid < f.ctid))""",
+    "UPDATE following f SET u_uuid = d.keep FROM university_duplicate d WHERE f.u_uuid = d.duplicate",
+    "DELETE FROM university u USING university_duplicate d WHERE u.u_uuid = d.duplicate",
+    # uq_following_account_university 를 만들기 전에 중복 팔로우를 하나만 남깁니다.
+    "DELETE FROM following a USING following b WHERE a.a_uuid = b.a_uuid AND a.u_uuid = b.u_uuid AND a.ctid > b.ctid",
+]
 DBObject()
-for table in tables:
-    table.__table__.create(bind=DBObject.instance.engine, checkfirst=True)
+
+
+async def create_tables():
+    async with DBObject.instance.engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for table in tables:
+            await conn.run_sync(table.__table__.create, checkfirst=True)
+
+        for statement in schema_patches:
+            await conn.execute(text(statement))
+
+        # 이미 있던 테이블에도 나중에 추가된 인덱스를 만들어 줍니다.
+        for table in tables:
+            for index in table.__table__.indexes:
+                await conn.run_sync(index.create, checkfirst=True)
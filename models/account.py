@@ -1,24 +1,34 @@
 from env.ACCOUNT import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, TOKEN_TYPE
-from sqlalchemy import Column, TEXT, String, DateTime, ForeignKeyConstraint
-from models.response import ResponseStatusCode, Detail
+from sqlalchemy import Column, TEXT, String, DateTime, ForeignKeyConstraint, select, update, delete, values, column, or_
+from models.response import ResponseStatusCode, Detail, format_datetime
 from utility.checker import is_valid_uuid_format
+from utility.password import hash_password, check_password, PasswordHasherBusy
+from utility.cache import TTLCache
 from sqlalchemy.dialects.postgresql import UUID
-from typing import TypeVar, Tuple, Optional
+from typing import TypeVar, Tuple, Optional, Dict
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine
 from models.university import University
-from database.conn import DBObject
 from pydantic import BaseModel
 from datetime import timedelta
 from datetime import datetime
 from models.base import Base
-import traceback
 import logging
-import bcrypt
+import asyncio
 import uuid
 import jwt
-import os
 
 Account = TypeVar("Account", bound="Account")
 
+TOKEN_CACHE_SIZE = 10000
+TOKEN_CACHE_TTL = 60 * 5  # 검증한 토큰 claim을 재사용하는 최대 시간(초), 토큰의 exp를 넘지 않음
+PRINCIPAL_CACHE_SIZE = 10000
+PRINCIPAL_CACHE_TTL = 60  # 다른 워커의 변경이 반영되기까지의 최대 지연 시간(초)
+LOGIN_FLUSH_INTERVAL = 5  # 모아 둔 로그인 시각을 저장하는 주기(초)
+LOGIN_FLUSH_BATCH = 1000  # UPDATE 한 문장에 담는 계정 수 (asyncpg 파라미터 개수 제한 아래로)
+
+_token_cache = TTLCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
+_principal_cache = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)
+
 
 class IDPWDModel(BaseModel):
     """ 기본적인 ID, Password를 갖는 클래스, 보안을 위해 사용
@@ -69,6 +79,22 @@ class TokenModel:
         self.token_type = TOKEN_TYPE
 
 
+class Principal:
+    """ 인증된 사용자를 나타내는 가벼운 account 투영(projection) 클래스
+
+    """
+    __slots__ = ("a_uuid", "u_uuid", "nickname")
+
+    a_uuid: str
+    u_uuid: str | None
+    nickname: str
+
+    def __init__(self, a_uuid: str, u_uuid: str | None, nickname: str):
+        self.a_uuid = a_uuid
+        self.u_uuid = u_uuid
+        self.nickname = nickname
+
+
 class Account(Base):
     __tablename__ = "account"
 
@@ -94,15 +120,15 @@ class Account(Base):
     @property
     def info(self):
         return {
-            "a_uuid": str(self.a_uuid),
+            "a_uuid": self.a_uuid,
             "id": self.id,
             "nickname": self.nickname,
             "email": self.email,
             "phone": self.phone,
             "s_id": self.s_id,
             "profile": self.profile,
-            "login_date": self.login_date.strftime("%Y-%m-%d %H:%M:%S"),
-            "signup_date": self.signup_date.strftime("%Y-%m-%d %H:%M:%S"),
+            "login_date": format_datetime(self.login_date),
+            "signup_date": format_datetime(self.signup_date),
         }
 
     def __init__ (self, id: str, nickname: str, password: str, phone: str, email: str, s_id : str, u_uuid: str, a_uuid: str | None = None, login_date: datetime | None = None, signup_date: datetime | None = None):
@@ -118,46 +144,52 @@ class Account(Base):
         self.u_uuid = u_uuid
 
     @staticmethod
-    def register(dbo: DBObject, id: str, password: str, nickname: str, email: str, phone: str, u_uuid: str, s_id: str) -> Tuple[ResponseStatusCode, None | Detail]:
+    async def register(session: AsyncSession, id: str, password: str, nickname: str, email: str, phone: str, u_uuid: str, s_id: str) -> Tuple[ResponseStatusCode, None | Detail]:
         try:
             if not is_valid_uuid_format(u_uuid):
                 return (ResponseStatusCode.ENTITY_ERROR, Detail(f"{u_uuid} is not valid uuid format"))
             
-            hashed_password = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
-            status_code, result = Account.check_duplicate(dbo, id, nickname, email, phone)
+            status_code, result = await Account.check_duplicate(session, id, nickname, email, phone)
             if status_code != ResponseStatusCode.SUCCESS:
                 return (status_code, result)
 
-            status_code, result = University._load_all_u_uuid(dbo)
+            status_code, result = await University._load_all_u_uuid(session)
             if status_code != ResponseStatusCode.SUCCESS:
                 return (status_code, result)
             
             if u_uuid not in result:
                 return (ResponseStatusCode.NOT_FOUND, Detail(f"u_uuid {u_uuid} not in University relation"))
             
+            hashed_password = await hash_password(password)
             account = Account(id = id,password = hashed_password, nickname = nickname, email = email, phone = phone, u_uuid = uuid.UUID(u_uuid), s_id = s_id)
-            dbo.session.add(account)
-            dbo.session.commit()
+            session.add(account)
+            await session.commit()
             return (ResponseStatusCode.SUCCESS, None)
         
+        except PasswordHasherBusy as e:
+            return (ResponseStatusCode.SERVICE_UNAVAILABLE, Detail(str(e)))
+
         except Exception as e:
-            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            await session.rollback()
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
         
-    def register_out(self, dbo: DBObject) -> Tuple[ResponseStatusCode, None | Detail]:
+    async def register_out(self, session: AsyncSession) -> Tuple[ResponseStatusCode, None | Detail]:
         try:
-            dbo.session.query(Account).filter_by(a_uuid = self.a_uuid).delete()
-            dbo.session.commit()
+            await session.execute(delete(Account).where(Account.a_uuid == self.a_uuid))
+            await session.commit()
+            Account.invalidate_principal(str(self.a_uuid))
             return (ResponseStatusCode.SUCCESS, None)
         
         except Exception as e:
-            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            await session.rollback()
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
             
     @staticmethod
-    def login(dbo: DBObject, user_id: str, password: str) -> Tuple[ResponseStatusCode, TokenModel | Detail]: 
+    async def login(session: AsyncSession, user_id: str, password: str) -> Tuple[ResponseStatusCode, TokenModel | Detail]: 
         try:
-            status_code, result = Account._load_user_info(dbo, id = user_id)
+            status_code, result = await Account._load_user_info(session, id = user_id)
             if status_code != ResponseStatusCode.SUCCESS:
                 if status_code == ResponseStatusCode.NOT_FOUND:
                     status_code = ResponseStatusCode.FAIL
@@ -165,9 +197,8 @@ class Account(Base):
             
             account = result
             if account:
-                if bcrypt.checkpw(password.encode("utf-8"), account.password.encode("utf-8")):
-                    dbo.session.query(Account).update({"login_date": datetime.now()})
-                    dbo.session.commit()
+                if await check_password(password, account.password):
+                    LoginDateBuffer.record(account.a_uuid, datetime.now())
                     return (ResponseStatusCode.SUCCESS, TokenModel(str(account.a_uuid)))
                 
                 else:
@@ -176,15 +207,19 @@ class Account(Base):
             return (ResponseStatusCode.FAIL, Detail(f"{account.id} not founded in account"))            
         
 
+        except PasswordHasherBusy as e:
+            return (ResponseStatusCode.SERVICE_UNAVAILABLE, Detail(str(e)))
+
         except Exception as e:
-            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            await session.rollback()
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
     
     @staticmethod
-    def forgot_password(dbo: DBObject, account_id: str, new_password: str) -> ResponseStatusCode:
+    async def forgot_password(session: AsyncSession, account_id: str, new_password: str) -> ResponseStatusCode:
         """
         Parameters:
-            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            session (AsyncSession): 데이터베이스 연동을 위한 sqlalchemy AsyncSession 객체. \n
             user_id (str): 유저가 변경할 비밀번호의 아이디 \n
             session (Dict[str, Any]): 로그인을 관리하는 세션 \n
             new_password (str): 유저가 변경할 새로운 비밀번호 \n
@@ -195,99 +230,94 @@ class Account(Base):
             ResponseStatusCode.INTERNAL_SERVER_ERROR: 서버 내부 에러. \n
         """
         try:
-            status_code, result = Account._load_user_info(dbo, id = account_id)
+            status_code, result = await Account._load_user_info(session, id = account_id)
             if status_code != ResponseStatusCode.SUCCESS:
                 if status_code == ResponseStatusCode.NOT_FOUND:
                     status_code = ResponseStatusCode.FAIL
                 return (status_code, result)
             
-            hashed_password = bcrypt.hashpw(new_password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
-            dbo.session.query(Account).filter_by(a_uuid = Account.a_uuid).update({"password": hashed_password})
-            dbo.session.commit()
+            hashed_password = await hash_password(new_password)
+            await session.execute(update(Account).where(Account.a_uuid == result.a_uuid).values(password = hashed_password))
+            await session.commit()
             return (ResponseStatusCode.SUCCESS, None)
 
+        except PasswordHasherBusy as e:
+            return (ResponseStatusCode.SERVICE_UNAVAILABLE, Detail(str(e)))
+
         except Exception as e:
-            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            await session.rollback()
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
 
     @staticmethod
-    def forgot_id(dbo: DBObject, email: str) -> Tuple[ResponseStatusCode, str | Detail]:
+    async def forgot_id(session: AsyncSession, email: str) -> Tuple[ResponseStatusCode, str | Detail]:
         try:
-            status_code, result = Account._load_user_info(dbo, email = email)
+            status_code, result = await Account._load_user_info(session, email = email)
             if status_code != ResponseStatusCode.SUCCESS:
                 return (status_code, result)
             
             return (ResponseStatusCode.SUCCESS, result.id)
         
         except Exception as e:
-            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
     
     @staticmethod
-    def check_duplicate(dbo: DBObject, id: str | None = None, nickname: str | None = None, email: str | None = None, phone: str | None = None) -> ResponseStatusCode | str:
-        query = dbo.session.query(Account)
+    async def check_duplicate(session: AsyncSession, id: str | None = None, nickname: str | None = None, email: str | None = None, phone: str | None = None) -> ResponseStatusCode | str:
+        query = select(Account.a_uuid)
         result = None
         detail = ""
 
         if id:
-            result = query.filter_by(id = id).first()
+            result = (await session.execute(query.filter_by(id = id).limit(1))).first()
             if result:
                 detail = f"{id} ID already exist"
         
         if result is None and nickname:
-            result = query.filter_by(nickname = nickname).first()
+            result = (await session.execute(query.filter_by(nickname = nickname).limit(1))).first()
             if result:
                 detail = f"{nickname} nickname already exist"
             
         if result is None and email:
-            result = query.filter_by(email = email).first()
+            result = (await session.execute(query.filter_by(email = email).limit(1))).first()
             if result:
                 detail = f"{email} email already exist"
 
         if result is None and phone:
-            result = query.filter_by(phone = phone).first()
+            result = (await session.execute(query.filter_by(phone = phone).limit(1))).first()
             if result:
                 detail = f"{phone} phone number already exist"
 
         return (ResponseStatusCode.SUCCESS, None) if result is None else (ResponseStatusCode.CONFLICT, Detail(detail))
     
-    def update_profile_image(self, dbo: DBObject, access_token: str, profile: bytes | None = None) -> Tuple[ResponseStatusCode, None | Detail]:
+    async def update_profile_image(self, session: AsyncSession, profile_path: str | None = None) -> Tuple[ResponseStatusCode, None | Detail]:
+        """ profile_path는 utility.upload.save_upload()로 이미 저장된 파일 경로이며, None이면 기본 이미지로 되돌립니다.
+
+        """
         try:
-            status_code, result = self._check_is_valid_token(access_token)
-            if status_code != ResponseStatusCode.SUCCESS:
-                return (status_code, result)
-            
-            if profile:
-                file_name = f"{str(uuid.uuid4())}.jpg"
-                with open(os.path.join("images/profile", file_name), "wb") as fp:
-                    fp.write(profile)
-                
-                self.profile = os.path.join("images/profile", file_name)
-            
-            else:
-                self.profile = None
-                
-            dbo.session.commit()
+            self.profile = profile_path
+            await session.commit()
+            Account.invalidate_principal(str(self.a_uuid))
             return (ResponseStatusCode.SUCCESS, None)
             
         except Exception as e:
-            dbo.session.rollback()
-            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            await session.rollback()
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
 
     @staticmethod
-    def _load_user_info(dbo:DBObject, a_uuid: Optional[str] = None, id: Optional[str] = None, email: Optional[str] = None) -> Tuple[ResponseStatusCode, Account | Detail]:
+    async def _load_user_info(session: AsyncSession, a_uuid: Optional[str] = None, id: Optional[str] = None, email: Optional[str] = None) -> Tuple[ResponseStatusCode, Account | Detail]:
         try:
             result = None
-            query = dbo.session.query(Account)
+            query = select(Account)
             if a_uuid:
-                result = query.filter_by(a_uuid = a_uuid).first()
+                result = (await session.execute(query.filter_by(a_uuid = a_uuid))).scalars().first()
                 
             elif id:
-                result = query.filter_by(id = id).first()
+                result = (await session.execute(query.filter_by(id = id))).scalars().first()
                 
             elif email:
-                result = query.filter_by(email = email).first()
+                result = (await session.execute(query.filter_by(email = email))).scalars().first()
                 
             if result:
                 return (ResponseStatusCode.SUCCESS, result)
@@ -295,25 +325,60 @@ class Account(Base):
             return (ResponseStatusCode.NOT_FOUND, Detail("account not founded"))
             
         except Exception as e:
-            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
     
+    @staticmethod
+    async def load_principal(session: AsyncSession, a_uuid: str) -> Tuple[ResponseStatusCode, Principal | Detail]:
+        """ a_uuid에 해당하는 Principal을 캐시에서 찾고, 없으면 필요한 컬럼만 조회해서 캐시에 저장합니다.
+
+        """
+        principal = _principal_cache.get(a_uuid)
+        if principal is not None:
+            return (ResponseStatusCode.SUCCESS, principal)
+
+        try:
+            row = (await session.execute(select(Account.a_uuid, Account.u_uuid, Account.nickname)
+                                         .filter_by(a_uuid = a_uuid))).first()
+            if row is None:
+                return (ResponseStatusCode.NOT_FOUND, Detail("account not founded"))
+
+            principal = Principal(str(row.a_uuid), str(row.u_uuid) if row.u_uuid else None, row.nickname)
+            _principal_cache.set(a_uuid, principal)
+            return (ResponseStatusCode.SUCCESS, principal)
+
+        except Exception as e:
+            logging.error(e, exc_info=e)
+            return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
+
+    @staticmethod
+    def invalidate_principal(a_uuid: str):
+        _principal_cache.pop(a_uuid)
+
     @staticmethod
     def _decode_token_to_uuid(access_token: str) -> Tuple[ResponseStatusCode, str | Detail]:
+        a_uuid = _token_cache.get(access_token)
+        if a_uuid is not None:
+            return (ResponseStatusCode.SUCCESS, a_uuid)
+
         try:
             payload = jwt.decode(access_token, SECRET_KEY, algorithms=[ALGORITHM])
             a_uuid = payload.get("sub")
             if not is_valid_uuid_format(a_uuid):
                 return (ResponseStatusCode.ENTITY_ERROR, Detail(f"{a_uuid} is not valid uuid format"))
             
+            _token_cache.set(access_token, a_uuid, expires_at=payload.get("exp"))
             return (ResponseStatusCode.SUCCESS, a_uuid)
+
+        except jwt.exceptions.ExpiredSignatureError as e:
+            return (ResponseStatusCode.TIME_OUT, Detail(str(e)))
                 
         except jwt.exceptions.DecodeError as e:
-            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.ENTITY_ERROR, Detail(str(e)))
 
         except Exception as e:
-            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
         
     def _check_is_valid_token(self, access_token: str):
@@ -328,5 +393,85 @@ class Account(Base):
             return (ResponseStatusCode.SUCCESS, None)
             
         except Exception as e:
-            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
-            return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
\ No newline at end of file
+            logging.error(e, exc_info=e)
+            return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
+
+
+class LoginDateBuffer:
+    """ LoginDateBuffer 클래스는 로그인 시각을 a_uuid 별로 모아 두었다가 LOGIN_FLUSH_INTERVAL 초마다 한 번에 저장하는 write-behind 버퍼입니다.
+        같은 계정이 여러 번 로그인하면 마지막 시각만 남기고, 저장은 UPDATE ... FROM (VALUES ...) 한 문장으로 해당 계정 행만 고칩니다.
+        워커가 끝날 때 stop() 이 남은 시각을 저장합니다.
+
+    """
+    _pending: Dict[uuid.UUID, datetime] = {}
+    _engine: AsyncEngine | None = None
+    _task: asyncio.Task | None = None
+    _stopping: asyncio.Event | None = None
+
+    @classmethod
+    def record(cls, a_uuid: uuid.UUID, login_date: datetime):
+        cls._pending[a_uuid] = login_date
+
+    @classmethod
+    async def flush(cls) -> int:
+        """ 모아 둔 로그인 시각을 저장합니다. 저장하지 못하면 다음 flush 에서 다시 시도합니다.
+
+        ### Returns
+            int: 저장을 시도한 계정 수
+        """
+        if not cls._pending or cls._engine is None:
+            return 0
+
+        pending, cls._pending = cls._pending, {}
+        # 여러 워커가 동시에 저장해도 같은 순서로 행 잠금을 잡도록 정렬합니다.
+        rows = sorted(pending.items())
+        try:
+            async with cls._engine.begin() as conn:
+                for start in range(0, len(rows), LOGIN_FLUSH_BATCH):
+                    logins = values(column("a_uuid", UUID(as_uuid=True)), column("login_date", DateTime),
+                                    name="logins").data(rows[start:start + LOGIN_FLUSH_BATCH])
+                    # 다른 워커가 더 나중 시각을 먼저 저장했으면 덮어쓰지 않습니다.
+                    await conn.execute(update(Account)
+                                       .where(Account.a_uuid == logins.c.a_uuid)
+                                       .where(or_(Account.login_date.is_(None), Account.login_date < logins.c.login_date))
+                                       .values(login_date = logins.c.login_date))
+
+            return len(rows)
+
+        except Exception as e:
+            # 그 사이에 다시 로그인한 계정은 새 시각을 남깁니다.
+            for a_uuid, login_date in pending.items():
+                cls._pending.setdefault(a_uuid, login_date)
+
+            logging.error(e, exc_info=e)
+            return 0
+
+    @classmethod
+    async def _run(cls, interval: float):
+        while not cls._stopping.is_set():
+            try:
+                await asyncio.wait_for(cls._stopping.wait(), interval)
+
+            except asyncio.TimeoutError:
+                pass
+
+            await cls.flush()
+
+    @classmethod
+    def start(cls, engine: AsyncEngine, interval: float = LOGIN_FLUSH_INTERVAL):
+        if cls._task is not None:
+            return
+
+        cls._engine = engine
+        cls._stopping = asyncio.Event()
+        cls._task = asyncio.get_running_loop().create_task(cls._run(interval))
+
+    @classmethod
+    async def stop(cls):
+        """ 주기적인 저장을 멈추고 남은 로그인 시각을 저장합니다. 저장 중에 취소되지 않도록 태스크가 스스로 끝나기를 기다립니다.
+
+        """
+        if cls._task is not None:
+            cls._stopping.set()
+            await cls._task
+            cls._task = None
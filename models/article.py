@@ -1,19 +1,34 @@
-from sqlalchemy import Column, TEXT, DateTime, ForeignKeyConstraint, Boolean
-from models.response import ResponseStatusCode, Detail
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import ARRAY, Enum, String
-from typing import Tuple, TypeVar, List
+from sqlalchemy import Column, TEXT, DateTime, ForeignKeyConstraint, Boolean, Index, Computed, select, func
+from sqlalchemy import ARRAY, Enum, String, Float, and_, or_, any_, bindparam, literal_column, tuple_, true
+from sqlalchemy.orm import deferred
+from models.response import ResponseStatusCode, Detail, format_datetime
+from sqlalchemy.engine import Row
+from utility.cursor import encode_cursor, decode_cursor
+from utility.checker import is_valid_uuid_format
+from utility.feed import FeedHub, FEED_PREVIEW_LENGTH
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from typing import Tuple, TypeVar, List, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.following import Following
-from database.conn import DBObject
+from models.university_stat import UniversityStat
 from datetime import datetime
-from .account import Account
+from .account import Account, Principal
 from models.base import Base
-import traceback
 import logging
 import uuid
+import re
 
 Article = TypeVar("Article", bound="Article")
 
+FEED_PAGE_SIZE = 10
+SEARCH_PAGE_SIZE = 10
+STREAM_REPLAY_LIMIT = 50  # 다시 연결했을 때 Last-Event-ID 이후로 보내 줄 게시물 수의 상한
+SEARCH_CANDIDATE_LIMIT = 1000  # 순위를 매길 최신 매칭 게시물 수의 상한 (검색 지연 시간을 일정하게 유지)
+SEARCH_MAX_TERMS = 8
+SEARCH_MAX_LENGTH = 100
+# 한국어 형태소 분석기가 없으므로 'simple' 설정으로 공백 단위 토큰만 만들고, 조사가 붙은 단어는 접두사 검색과 trigram으로 찾습니다.
+SEARCH_VECTOR_SQL = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(content, ''))"
+
 class ImageType(Enum):
     JPEG = "jpeg"
     PNG = "png"
@@ -34,6 +49,7 @@ class Article(Base):
     is_anonymous: bool = Column(Boolean, default=False)  # 게시물 업로드 유저 익명 여부
     image_urls: List[str] = Column(ARRAY(TEXT), nullable=True)  # 이미지 URL 리스트
     image_types: List[str] = Column(ARRAY(String(255)), nullable=True)  # 이미지 타입 리스트
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))  # 전문 검색용 생성 컬럼
 
     __table_args__ = (ForeignKeyConstraint(
         ["a_uuid"], ["account.a_uuid"],
@@ -41,7 +57,10 @@ class Article(Base):
     ), ForeignKeyConstraint(
         ["u_uuid"], ["university.u_uuid"],
         ondelete="SET NULL", onupdate="CASCADE"
-    ),)
+    ), Index("ix_article_u_uuid_upload_date_art_uuid", u_uuid, upload_date.desc(), art_uuid.desc()),
+       Index("ix_article_search_vector", "search_vector", postgresql_using="gin"),
+       Index("ix_article_title_trgm", title, postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+       Index("ix_article_content_trgm", content, postgresql_using="gin", postgresql_ops={"content": "gin_trgm_ops"}),)
 
     # 나머지 메소드...
 
@@ -49,12 +68,12 @@ class Article(Base):
     @property
     def info(self):
         return {
-            'art_uuid': str(self.art_uuid),
-            'a_uuid': str(self.a_uuid),
+            'art_uuid': self.art_uuid,
+            'a_uuid': self.a_uuid,
             'title': self.title,
             'content': self.content,
-            'upload_date': self.upload_date.strftime("%Y-%m-%d %H:%M:%S"),
-            'update_date': self.update_date.strftime("%Y-%m-%d %H:%M:%S") if self.update_date else None,
+            'upload_date': format_datetime(self.upload_date),
+            'update_date': format_datetime(self.update_date),
             'category': self.category,
             'is_anonymous': self.is_anonymous,
             'image_url': self.image_url,
@@ -64,11 +83,11 @@ class Article(Base):
     @property
     def shallow_info(self):
         return {
-            "art_uuid": str(self.art_uuid),
-            "a_uuid": str(self.a_uuid),
+            "art_uuid": self.art_uuid,
+            "a_uuid": self.a_uuid,
             "title": self.title,
             "content": self.content,
-            'upload_date': self.upload_date.strftime("%Y-%m-%d %H:%M:%S"),
+            'upload_date': format_datetime(self.upload_date),
             "is_anonymous": self.is_anonymous
         }
 
@@ -87,68 +106,65 @@ class Article(Base):
         self.image_types = image_types or []
     
     @staticmethod
-    def insert_article(dbo: DBObject, token: str, title: str, content: str, is_anonymous: bool, image_urls: List[str] | None = None, image_types: List[ImageType] | None = None) -> Tuple[ResponseStatusCode, None | Detail]:
+    async def insert_article(session: AsyncSession, principal: Principal, title: str, content: str, is_anonymous: bool, image_urls: List[str] | None = None, image_types: List[ImageType] | None = None) -> Tuple[ResponseStatusCode, None | Detail]:
         try:
-            status_code, result = Account._decode_token_to_uuid(token)
-            if status_code != ResponseStatusCode.SUCCESS:
-                return (status_code, result)
-            
-            status_code, result = Account._load_user_info(dbo, result)
-            if status_code != ResponseStatusCode.SUCCESS:
-                return (status_code, result)
-            
             article = Article(
                 art_uuid=uuid.uuid4(),
-                a_uuid=str(result.a_uuid),
+                a_uuid=principal.a_uuid,
                 title=title,
                 content=content,
                 upload_date=datetime.now(),
                 is_anonymous=is_anonymous,
-                u_uuid = str(result.u_uuid),
+                u_uuid = principal.u_uuid,
                 image_urls=image_urls if image_urls else [],
                 image_types=image_types if image_types else []
             )
             
-            dbo.session.add(article)
-            dbo.session.commit()
+            session.add(article)
+            if principal.u_uuid:
+                await UniversityStat._on_article_insert(session, principal.u_uuid, article.upload_date)
+                event = Article._feed_event(article, principal.nickname)
+                await FeedHub.stage(session, event)
+
+            await session.commit()
+            if principal.u_uuid:
+                FeedHub.publish(event)
             
             return (ResponseStatusCode.SUCCESS, None)
         
         except Exception as e:
-            dbo.session.rollback()
-            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            await session.rollback()
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(f"{e}"))
 
     @staticmethod
-    def delete_article(dbo: DBObject, art_uuid: str, a_uuid: str) -> Tuple[ResponseStatusCode, None | Detail]:
+    async def delete_article(session: AsyncSession, art_uuid: str, a_uuid: str) -> Tuple[ResponseStatusCode, None | Detail]:
         try:
-            article = dbo.session.query(Article).filter_by(art_uuid = art_uuid).first()
+            article = (await session.execute(select(Article).filter_by(art_uuid = art_uuid))).scalars().first()
             if not article:
                 return (ResponseStatusCode.NOT_FOUND, Detail(f"Article with id {art_uuid} not found"))
 
             if str(article.a_uuid) != a_uuid:
                 return (ResponseStatusCode.FAIL, Detail(f"User with id {a_uuid} is not authorized to delete this article"))
 
-            dbo.session.delete(article)
-            dbo.session.commit()
+            await session.delete(article)
+            if article.u_uuid:
+                await session.flush()
+                await UniversityStat._on_article_delete(session, article.u_uuid, article.upload_date)
+
+            await session.commit()
 
             return (ResponseStatusCode.SUCCESS, None)
 
         except Exception as e:
-            dbo.session.rollback()
-            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            await session.rollback()
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
 
     @staticmethod
-    def update_article(dbo: DBObject, art_uuid: str, token: str, title: str, content: str, is_anonymous: bool) -> Tuple[ResponseStatusCode, None | Detail]:
+    async def update_article(session: AsyncSession, art_uuid: str, a_uuid: str, title: str, content: str, is_anonymous: bool) -> Tuple[ResponseStatusCode, None | Detail]:
         try:
-            # Token을 이용하여 사용자 확인
-            response_code, result = Account._decode_token_to_uuid(token)
-            if response_code != ResponseStatusCode.SUCCESS:
-                return (response_code, result)
-            
-            a_uuid = result
-            status_code, result = Article._load_article_from_uuid(dbo, art_uuid)
+            status_code, result = await Article._load_article_from_uuid(session, art_uuid)
             if status_code != ResponseStatusCode.SUCCESS:
                 return (status_code, result)
 
@@ -156,7 +172,7 @@ class Article(Base):
                 return (ResponseStatusCode.FAIL, Detail("User is not authorized to update this article"))
 
             # 업데이트할 게시물 찾기
-            article = dbo.session.query(Article).filter(Article.art_uuid == art_uuid, Article.a_uuid == result.a_uuid).one_or_none()
+            article = (await session.execute(select(Article).filter(Article.art_uuid == art_uuid, Article.a_uuid == result.a_uuid))).scalars().one_or_none()
             if not article:
                 return (ResponseStatusCode.NOT_FOUND, Detail(f"Article with id {art_uuid} not found"))
 
@@ -166,82 +182,302 @@ class Article(Base):
             article.is_anonymous = is_anonymous
             article.update_date = datetime.now()
 
-            dbo.session.commit()
+            await session.commit()
 
             return (ResponseStatusCode.SUCCESS, None)
         
         except Exception as e:
-            dbo.session.rollback()
-            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            await session.rollback()
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
     
     @staticmethod
-    def get_article_list(dbo: DBObject, token: str ,start: int, u_uuid: str | None = None) -> Tuple[ResponseStatusCode, list | Detail]:
+    async def get_article_list(session: AsyncSession, a_uuid: str, after: str | None = None, u_uuid: str | None = None, limit: int = FEED_PAGE_SIZE) -> Tuple[ResponseStatusCode, Dict[str, Any] | Detail]:
+        """ 팔로우한 대학교(또는 u_uuid로 지정한 대학교)의 게시물을 최신순으로 limit개 불러옵니다.
+            after 커서 이후의 게시물만 조회하는 keyset 페이지네이션이라 OFFSET 없이 인덱스만 타고 내려갑니다.
+            u_uuid = ANY(...) 로 한 번에 조회하면 여러 대학교의 인덱스 순서를 합치지 못해서 팔로우한 대학교의 게시물을 전부 읽고 정렬하므로,
+            LATERAL 로 대학교마다 (u_uuid, upload_date DESC, art_uuid DESC) 인덱스에서 limit + 1개만 읽은 다음 합칩니다.
+            읽는 행 수는 팔로우한 대학교 수 * (limit + 1) 이하라 게시물이 늘어도 일정합니다.
+
+        ### Returns
+            Dict[str, Any]: {"articles": 게시물 리스트, "next_cursor": 다음 페이지 커서 (없으면 None)}
+        """
         try:
-            status_code, result = Account._decode_token_to_uuid(token)
+            status_code, followed = await Article._resolve_scope(session, a_uuid, u_uuid)
             if status_code != ResponseStatusCode.SUCCESS:
-                return (status_code, result)
-            
-            status_code, result = Following.get_follow_univ_list(dbo, result)
+                return (status_code, followed)
+
+            if not followed:
+                return (ResponseStatusCode.SUCCESS, {"articles": [], "next_cursor": None})
+
+            followed_univ = func.unnest(bindparam("followed", followed, type_=ARRAY(UUID(as_uuid=True))))\
+                .table_valued("u_uuid").render_derived("followed_univ")
+            recent = select(*FEED_COLUMNS).where(Article.u_uuid == followed_univ.c.u_uuid)
+
+            if after:
+                try:
+                    upload_date, art_uuid = decode_cursor(after, 2)
+                    upload_date, art_uuid = datetime.fromisoformat(upload_date), uuid.UUID(art_uuid)
+
+                except ValueError as e:
+                    return (ResponseStatusCode.ENTITY_ERROR, Detail(str(e)))
+
+                # 행 비교는 인덱스 한 구간으로 바로 이어서 읽습니다.
+                recent = recent.where(tuple_(Article.upload_date, Article.art_uuid) < tuple_(upload_date, art_uuid))
+
+            recent = recent.order_by(Article.upload_date.desc(), Article.art_uuid.desc()).limit(limit + 1).lateral("recent")
+
+            # 작성자 닉네임은 같은 쿼리에서 account를 outer join 해서 한 번에 가져옵니다.
+            query = select(*(recent.c[column.key] for column in FEED_COLUMNS), Account.nickname)\
+                .select_from(followed_univ)\
+                .join(recent, true())\
+                .outerjoin(Account, Account.a_uuid == recent.c.a_uuid)\
+                .order_by(recent.c.upload_date.desc(), recent.c.art_uuid.desc())\
+                .limit(limit + 1)
+            rows = (await session.execute(query)).all()
+
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(rows[-1].upload_date.isoformat(), rows[-1].art_uuid)
+
+            articles_list = [Article._feed_item(row, row.nickname) for row in rows]
+
+            return (ResponseStatusCode.SUCCESS, {"articles": articles_list, "next_cursor": next_cursor})
+
+        except Exception as e:
+            logging.error(e, exc_info=e)
+            return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
+
+    @staticmethod
+    async def search_articles(session: AsyncSession, a_uuid: str, q: str, after: str | None = None, u_uuid: str | None = None, limit: int = SEARCH_PAGE_SIZE) -> Tuple[ResponseStatusCode, Dict[str, Any] | Detail]:
+        """ 팔로우한 대학교(또는 u_uuid로 지정한 대학교)의 게시물에서 q를 검색합니다.
+            먼저 search_vector GIN 인덱스로 단어 접두사 검색을 해서 최신 SEARCH_CANDIDATE_LIMIT 개 안에서 ts_rank_cd 순으로 정렬하고,
+            결과가 없으면 title, content 의 trigram 인덱스로 부분 문자열(ILIKE) 검색을 해서 최신순으로 정렬합니다.
+            두 방식 모두 (rank, upload_date, art_uuid) keyset 페이지네이션이고, 커서에 검색 방식이 들어 있습니다.
+
+        ### Returns
+            Dict[str, Any]: {"articles": 게시물 리스트 (rank 포함), "next_cursor": 다음 페이지 커서, "mode": "fts" | "trgm"}
+        """
+        try:
+            q = q.strip()
+            if not q or len(q) > SEARCH_MAX_LENGTH:
+                return (ResponseStatusCode.ENTITY_ERROR, Detail(f"q length must be between 1 and {SEARCH_MAX_LENGTH}"))
+
+            mode, position = None, None
+            if after:
+                try:
+                    mode, rank, upload_date, art_uuid = decode_cursor(after, 4)
+                    position = (float(rank), datetime.fromisoformat(upload_date), uuid.UUID(art_uuid))
+                    if mode not in ("fts", "trgm"):
+                        raise ValueError(f"{after} is not valid cursor")
+
+                except ValueError as e:
+                    return (ResponseStatusCode.ENTITY_ERROR, Detail(str(e)))
+
+            status_code, followed = await Article._resolve_scope(session, a_uuid, u_uuid)
             if status_code != ResponseStatusCode.SUCCESS:
-                return (status_code, result)
-            
-            articles = []
-            if u_uuid:
-                articles = dbo.session.query(Article).filter_by(u_uuid = u_uuid).all()
-            
-            else:
-                for u in result:
-                    articles = dbo.session.query(Article).filter_by(u_uuid = u).all()
-            
+                return (status_code, followed)
+
+            if not followed:
+                return (ResponseStatusCode.SUCCESS, {"articles": [], "next_cursor": None, "mode": mode or "fts"})
+
+            scope = Article.u_uuid == any_(bindparam("followed", followed, type_=ARRAY(UUID(as_uuid=True))))
+            terms = re.findall(r"\w+", q)[:SEARCH_MAX_TERMS]
+
+            rows = []
+            if mode in (None, "fts") and terms:
+                mode = "fts"
+                rows = (await session.execute(Article._fts_query(scope, terms, position, limit))).all()
+
+            if mode == "trgm" or (not rows and position is None):
+                mode = "trgm"
+                rows = (await session.execute(Article._trgm_query(scope, q, position, limit))).all()
+
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                last = rows[-1]
+                next_cursor = encode_cursor(mode, repr(last.rank), last.upload_date.isoformat(), last.art_uuid)
+
             articles_list = []
+            for row in rows:
+                item = Article._feed_item(row, row.nickname)
+                item["rank"] = row.rank
+                articles_list.append(item)
+
+            return (ResponseStatusCode.SUCCESS, {"articles": articles_list, "next_cursor": next_cursor, "mode": mode})
 
-            for article in articles[start: min(start + 11, len(articles))]:
-                if article.is_anonymous:
-                    nickname = "유니" #익명
-                    a_uuid = "Anonymous" #익명 
-                    
-                else:
-                    user = dbo.session.query(Account).filter_by(a_uuid=article.a_uuid).first()
-                    if user:
-                        nickname = user.nickname
-                        a_uuid = str(user.a_uuid)
-                        
-                    else:
-                        nickname = "알 수 없는 사용자"
-                        a_uuid = "Unknown"
-
-                articles_list.append({
-                    "art_uuid": str(article.art_uuid),
-                    "a_uuid": a_uuid,
-                    "nickname": nickname,
-                    "title": article.title,
-                    "u_uuid": article.u_uuid,
-                    "content": article.content,
-                    'upload_date': article.upload_date.strftime("%Y-%m-%d %H:%M:%S"),
-                    "is_anonymous": article.is_anonymous,
-                    "u_uuid": u_uuid,
-                    "images": article.image_urls
-                })
-
-            return (ResponseStatusCode.SUCCESS, articles_list)
+        except Exception as e:
+            logging.error(e, exc_info=e)
+            return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
+
+    @staticmethod
+    def _fts_query(scope, terms: List[str], position: Tuple[float, datetime, uuid.UUID] | None, limit: int):
+        # 각 단어를 접두사 검색(:*)으로 AND 해서 "학교"가 "학교에서"도 찾도록 합니다.
+        tsquery = func.to_tsquery(literal_column("'simple'::regconfig"), bindparam("tsquery", " & ".join(f"{term}:*" for term in terms)))
+        candidates = select(Article.art_uuid,
+                            Article.upload_date,
+                            func.ts_rank_cd(Article.search_vector, tsquery).label("rank"))\
+            .where(scope, Article.search_vector.op("@@")(tsquery))\
+            .order_by(Article.upload_date.desc())\
+            .limit(SEARCH_CANDIDATE_LIMIT)\
+            .subquery()
+
+        query = select(*FEED_COLUMNS, Account.nickname, candidates.c.rank)\
+            .join(candidates, candidates.c.art_uuid == Article.art_uuid)\
+            .outerjoin(Account, Account.a_uuid == Article.a_uuid)
+
+        if position:
+            rank, upload_date, art_uuid = position
+            query = query.where(or_(candidates.c.rank < rank,
+                                    and_(candidates.c.rank == rank, candidates.c.upload_date < upload_date),
+                                    and_(candidates.c.rank == rank, candidates.c.upload_date == upload_date,
+                                         candidates.c.art_uuid > art_uuid)))
+
+        return query.order_by(candidates.c.rank.desc(), candidates.c.upload_date.desc(), candidates.c.art_uuid)\
+            .limit(limit + 1)
+
+    @staticmethod
+    def _trgm_query(scope, q: str, position: Tuple[float, datetime, uuid.UUID] | None, limit: int):
+        pattern = "%" + q.replace("/", "//").replace("%", "/%").replace("_", "/_") + "%"
+        # 부분 문자열 검색은 관련도 점수가 없으므로 rank 는 0 으로 두고 최신순으로 정렬합니다.
+        query = select(*FEED_COLUMNS, Account.nickname, literal_column("0.0", Float).label("rank"))\
+            .outerjoin(Account, Account.a_uuid == Article.a_uuid)\
+            .where(scope, or_(Article.title.ilike(pattern, escape="/"), Article.content.ilike(pattern, escape="/")))
+
+        if position:
+            _, upload_date, art_uuid = position
+            query = query.where(or_(Article.upload_date < upload_date,
+                                    and_(Article.upload_date == upload_date, Article.art_uuid > art_uuid)))
+
+        return query.order_by(Article.upload_date.desc(), Article.art_uuid).limit(limit + 1)
+
+    @staticmethod
+    async def _resolve_scope(session: AsyncSession, a_uuid: str, u_uuid: str | None) -> Tuple[ResponseStatusCode, List[uuid.UUID] | Detail]:
+        """ u_uuid가 있으면 그 대학교만, 없으면 a_uuid가 팔로우한 대학교들을 조회 범위로 돌려줍니다.
+
+        """
+        if u_uuid:
+            if not is_valid_uuid_format(u_uuid):
+                return (ResponseStatusCode.ENTITY_ERROR, Detail(f"u_uuid {u_uuid} is not match format"))
+
+            return (ResponseStatusCode.SUCCESS, [uuid.UUID(u_uuid)])
+
+        status_code, result = await Following.get_follow_univ_list(session, a_uuid)
+        if status_code != ResponseStatusCode.SUCCESS:
+            return (status_code, result)
+
+        return (ResponseStatusCode.SUCCESS, [uuid.UUID(u) for u in result])
+
+    @staticmethod
+    async def get_articles_since(session: AsyncSession, u_uuids: List[uuid.UUID], last_art_uuid: str, limit: int = STREAM_REPLAY_LIMIT) -> Tuple[ResponseStatusCode, List[Dict[str, Any]] | Detail]:
+        """ 스트림이 끊겼다가 다시 연결됐을 때 last_art_uuid 보다 나중에 올라온 게시물을 오래된 순으로 돌려줍니다.
+            last_art_uuid 가 없어진 게시물이면 빈 리스트를 돌려주고, 클라이언트는 GET /article 로 다시 불러옵니다.
+
+        ### Returns
+            List[Dict[str, Any]]: 스트림 이벤트와 같은 형식의 게시물 리스트
+        """
+        try:
+            if not is_valid_uuid_format(last_art_uuid):
+                return (ResponseStatusCode.ENTITY_ERROR, Detail(f"Last-Event-ID {last_art_uuid} is not match format"))
+
+            last = (await session.execute(select(Article.upload_date, Article.art_uuid)
+                .where(Article.art_uuid == last_art_uuid))).first()
+            if last is None:
+                return (ResponseStatusCode.SUCCESS, [])
+
+            rows = (await session.execute(select(*FEED_COLUMNS, Account.nickname)
+                .outerjoin(Account, Account.a_uuid == Article.a_uuid)
+                .where(Article.u_uuid == any_(bindparam("followed", u_uuids, type_=ARRAY(UUID(as_uuid=True)))),
+                       or_(Article.upload_date > last.upload_date,
+                           and_(Article.upload_date == last.upload_date, Article.art_uuid < last.art_uuid)))
+                .order_by(Article.upload_date, Article.art_uuid.desc())
+                .limit(limit))).all()
+
+            return (ResponseStatusCode.SUCCESS, [Article._feed_event(row, row.nickname) for row in rows])
 
         except Exception as e:
-            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
 
     @staticmethod
-    def _load_article_from_uuid(dbo: DBObject, art_uuid: str) -> Tuple[ResponseStatusCode, Article | Detail]:
+    async def get_articles_posted_since(session: AsyncSession, u_uuids: List[uuid.UUID], since: datetime, limit: int) -> Tuple[ResponseStatusCode, List[Dict[str, Any]] | Detail]:
+        """ FeedHub 의 LISTEN 커넥션이 끊겼다가 다시 연결됐을 때, since 이후에 올라온 게시물을 오래된 순으로 돌려줍니다.
+
+        ### Returns
+            List[Dict[str, Any]]: 스트림 이벤트와 같은 형식의 게시물 리스트
+        """
+        try:
+            rows = (await session.execute(select(*FEED_COLUMNS, Account.nickname)
+                .outerjoin(Account, Account.a_uuid == Article.a_uuid)
+                .where(Article.u_uuid == any_(bindparam("followed", u_uuids, type_=ARRAY(UUID(as_uuid=True)))),
+                       Article.upload_date >= since)
+                .order_by(Article.upload_date, Article.art_uuid.desc())
+                .limit(limit))).all()
+
+            return (ResponseStatusCode.SUCCESS, [Article._feed_event(row, row.nickname) for row in rows])
+
+        except Exception as e:
+            logging.error(e, exc_info=e)
+            return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
+
+    @staticmethod
+    def _feed_event(article: Article | Row, author_nickname: str | None) -> Dict[str, Any]:
+        """ 스트림으로 보내는 게시물 요약, content 는 앞부분만 담고 전체 내용은 GET /article 로 불러옵니다.
+
+        """
+        item = Article._feed_item(article, author_nickname)
+        item["truncated"] = len(item["content"]) > FEED_PREVIEW_LENGTH
+        item["content"] = item["content"][:FEED_PREVIEW_LENGTH]
+        return item
+
+    @staticmethod
+    def _feed_item(article: Article | Row, author_nickname: str | None) -> Dict[str, Any]:
+        """ 피드 한 줄, FEED_COLUMNS 로 조회한 Row 와 Article 객체 모두 받습니다. UUID는 응답에서 그대로 직렬화됩니다.
+
+        """
+        if article.is_anonymous:
+            nickname = "유니" #익명
+            author_uuid = "Anonymous" #익명 
+            
+        else:
+            if author_nickname is not None:
+                nickname = author_nickname
+                author_uuid = article.a_uuid
+                
+            else:
+                nickname = "알 수 없는 사용자"
+                author_uuid = "Unknown"
+
+        return {
+            "art_uuid": article.art_uuid,
+            "a_uuid": author_uuid,
+            "nickname": nickname,
+            "title": article.title,
+            "content": article.content,
+            'upload_date': format_datetime(article.upload_date),
+            "is_anonymous": article.is_anonymous,
+            "u_uuid": article.u_uuid,
+            "images": article.image_urls
+        }
+
+    @staticmethod
+    async def _load_article_from_uuid(session: AsyncSession, art_uuid: str) -> Tuple[ResponseStatusCode, Article | Detail]:
         try:
             
-            article = dbo.session.query(Article).filter_by(art_uuid = art_uuid).first()
+            article = (await session.execute(select(Article).filter_by(art_uuid = art_uuid))).scalars().first()
             if not article:
                 return (ResponseStatusCode.NOT_FOUND, Detail(f"art_uuid {art_uuid} not found in article relation"))
             
             return (ResponseStatusCode.SUCCESS, article)
             
         except Exception as e:
-            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
         
-    
\ No newline at end of file
+    
+
+# 피드, 검색, 스트림이 조회하는 컬럼, ORM 객체를 만들지 않고 Row 그대로 _feed_item 에 넘깁니다.
+FEED_COLUMNS = (Article.art_uuid, Article.a_uuid, Article.u_uuid, Article.title, Article.content,
+                Article.upload_date, Article.is_anonymous, Article.image_urls)
@@ -1,33 +1,50 @@
-from sqlalchemy import Column, DateTime, ForeignKeyConstraint
+from sqlalchemy import Column, DateTime, ForeignKeyConstraint, Index, ARRAY, select, delete, any_, bindparam
 from models.response import ResponseStatusCode, Detail
 from utility.checker import is_valid_uuid_format
-from sqlalchemy.dialects.postgresql import UUID
-from models.university import University
-from database.conn import DBObject
-from models.account import Account
+from sqlalchemy.dialects.postgresql import UUID, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.university import UniversityCatalog
+from utility.cache import TTLCache
 from datetime import datetime
 from models.base import Base
-from typing import Tuple, TypeVar
-import traceback
+from typing import Any, Dict, List, Tuple, TypeVar
+from pydantic import BaseModel
 import logging
 import uuid
 
 Following = TypeVar("Following", bound="Following")
 
+FOLLOW_CACHE_SIZE = 10000
+FOLLOW_CACHE_TTL = 30  # 다른 워커에서 팔로우를 바꿨을 때 반영되기까지의 최대 지연 시간(초)
+
+FOLLOW_BATCH_MAX = 100  # 한 번의 일괄 요청에 담을 수 있는 u_uuid 개수의 상한
+
+_follow_cache = TTLCache(FOLLOW_CACHE_SIZE, FOLLOW_CACHE_TTL)
+
+
+class FollowBatchModel(BaseModel):
+    """ 한 번에 팔로우, 팔로우 취소할 대학교 u_uuid 목록
+
+    """
+    follow: List[str] = []
+    unfollow: List[str] = []
+
 class Following(Base):
     __tablename__ = "following"
     
     f_uuid = Column(UUID(as_uuid=True),
-                         primary_key=True, default=uuid.uuid4()) 
+                         primary_key=True, default=uuid.uuid4) 
     a_uuid = Column(UUID(as_uuid = True), default = None)
     u_uuid = Column(UUID(as_uuid = True), default = None)
-    following_date = Column(DateTime, default = datetime.now())
+    following_date = Column(DateTime, default = datetime.now)
     
     __table_args__ = (ForeignKeyConstraint(
         ["u_uuid"], ["university.u_uuid"]
     ),ForeignKeyConstraint(
         ["a_uuid"], ["account.a_uuid"]
         ),
+    # 같은 대학교를 두 번 팔로우하지 못하게 하고, a_uuid로 팔로우 목록을 찾는 인덱스로도 씁니다.
+    Index("uq_following_account_university", "a_uuid", "u_uuid", unique=True),
     )
     
     def __init__(self, a_uuid: str, u_uuid: str):
@@ -35,71 +52,173 @@ class Following(Base):
         self.u_uuid = u_uuid
         
     @staticmethod
-    def follow(dbo: DBObject, a_uuid: str, u_uuid: str) -> Tuple[ResponseStatusCode, None | Detail]:
-        try:
-            if not is_valid_uuid_format(a_uuid):
-                return (ResponseStatusCode.ENTITY_ERROR, Detail(f"a_uuid {a_uuid} is not match format"))
-            
-            if not is_valid_uuid_format(u_uuid):
-                return (ResponseStatusCode.ENTITY_ERROR, Detail(f"u_uuid {u_uuid} is not match format"))
+    async def _check_target(session: AsyncSession, a_uuid: str, u_uuid: str) -> Tuple[ResponseStatusCode, None | Detail]:
+        if not is_valid_uuid_format(a_uuid):
+            return (ResponseStatusCode.ENTITY_ERROR, Detail(f"a_uuid {a_uuid} is not match format"))
+
+        if not is_valid_uuid_format(u_uuid):
+            return (ResponseStatusCode.ENTITY_ERROR, Detail(f"u_uuid {u_uuid} is not match format"))
+
+        status_code, result = await UniversityCatalog.ensure_loaded(session)
+        if status_code != ResponseStatusCode.SUCCESS:
+            return (status_code, result)
+
+        if u_uuid not in UniversityCatalog.u_uuids:
+            return (ResponseStatusCode.NOT_FOUND, Detail(f"u_uuid {u_uuid} not in University relation"))
+
+        return (ResponseStatusCode.SUCCESS, None)
+
+    @staticmethod
+    async def follow(session: AsyncSession, a_uuid: str, u_uuid: str) -> Tuple[ResponseStatusCode, bool | Detail]:
+        """ 이미 팔로우한 대학교면 아무것도 하지 않는 INSERT ... ON CONFLICT DO NOTHING 한 번으로 팔로우합니다.
 
-            status_code, result = Account._load_user_info(dbo, a_uuid = a_uuid)
+        ### Returns
+            bool: 새로 팔로우했으면 True, 이미 팔로우하고 있었으면 False
+        """
+        try:
+            status_code, result = await Following._check_target(session, a_uuid, u_uuid)
             if status_code != ResponseStatusCode.SUCCESS:
                 return (status_code, result)
+
+            inserted = (await session.execute(pg_insert(Following)
+                .values(f_uuid=uuid.uuid4(), a_uuid=a_uuid, u_uuid=u_uuid, following_date=datetime.now())
+                .on_conflict_do_nothing(index_elements=["a_uuid", "u_uuid"])
+                .returning(Following.f_uuid))).first()
+            await session.commit()
+
+            if inserted is not None:
+                Following.invalidate_follow_cache(a_uuid)
+
+            return (ResponseStatusCode.SUCCESS, inserted is not None)
             
-            status_code, result = University._load_all_u_uuid(dbo)
+        except Exception as e:
+            await session.rollback()
+            logging.error(e, exc_info=e)
+            return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(f"{e}"))
+        
+    @staticmethod
+    async def unfollow(session: AsyncSession, a_uuid: str, u_uuid: str) -> Tuple[ResponseStatusCode, bool | Detail]:
+        """ DELETE ... RETURNING 한 번으로 팔로우를 취소합니다. 팔로우하지 않은 대학교여도 성공입니다.
+
+        ### Returns
+            bool: 팔로우를 취소했으면 True, 팔로우하고 있지 않았으면 False
+        """
+        try:
+            status_code, result = await Following._check_target(session, a_uuid, u_uuid)
             if status_code != ResponseStatusCode.SUCCESS:
                 return (status_code, result)
-            
-            if u_uuid not in result:
-                return (ResponseStatusCode.NOT_FOUND, Detail(f"u_uuid {u_uuid} not in University relation"))
-            
-            follow_obj = Following(a_uuid, u_uuid)
-            dbo.session.add(follow_obj)
-            dbo.session.commit()
-            return (ResponseStatusCode.SUCCESS, None)
+
+            deleted = (await session.execute(delete(Following)
+                .where(Following.a_uuid == a_uuid, Following.u_uuid == u_uuid)
+                .returning(Following.f_uuid))).first()
+            await session.commit()
+
+            if deleted is not None:
+                Following.invalidate_follow_cache(a_uuid)
+
+            return (ResponseStatusCode.SUCCESS, deleted is not None)
             
         except Exception as e:
-            dbo.session.rollback()
-            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            await session.rollback()
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(f"{e}"))
-        
+    
     @staticmethod
-    def unfollow(dbo: DBObject, a_uuid: str, u_uuid: str) -> Tuple[ResponseStatusCode, None | Detail]:
+    async def apply_batch(session: AsyncSession, a_uuid: str, follow: List[str], unfollow: List[str]) -> Tuple[ResponseStatusCode, List[Dict[str, Any]] | Detail]:
+        """ 여러 대학교의 팔로우, 팔로우 취소를 한 트랜잭션에서 처리합니다.
+            u_uuid는 메모리의 UniversityCatalog로 한 번에 검사하고, 유효한 것만 모아서
+            INSERT ... ON CONFLICT DO NOTHING 한 번과 DELETE ... RETURNING 한 번으로 반영합니다.
+
+        ### Returns
+            List[Dict[str, Any]]: 요청 순서대로 {"u_uuid", "action", "result"}
+                result: followed, already_following, unfollowed, not_following, invalid_format, not_found, duplicate
+        """
         try:
             if not is_valid_uuid_format(a_uuid):
                 return (ResponseStatusCode.ENTITY_ERROR, Detail(f"a_uuid {a_uuid} is not match format"))
-            
-            if not is_valid_uuid_format(u_uuid):
-                return (ResponseStatusCode.ENTITY_ERROR, Detail(f"u_uuid {u_uuid} is not match format"))
-            
-            status_code, result = Account._load_user_info(dbo, a_uuid = a_uuid)
-            if status_code != ResponseStatusCode.SUCCESS:
-                return (status_code, result)
-            
-            status_code, result = University._load_all_u_uuid(dbo)
+
+            if not 1 <= len(follow) + len(unfollow) <= FOLLOW_BATCH_MAX:
+                return (ResponseStatusCode.ENTITY_ERROR, Detail(f"follow and unfollow must contain between 1 and {FOLLOW_BATCH_MAX} u_uuids"))
+
+            status_code, result = await UniversityCatalog.ensure_loaded(session)
             if status_code != ResponseStatusCode.SUCCESS:
                 return (status_code, result)
-            
-            if u_uuid not in result:
-                return (ResponseStatusCode.NOT_FOUND, Detail(f"u_uuid {u_uuid} not in University relation"))
-            
-            follow_obj = Following(a_uuid, u_uuid)
-            dbo.session.delete(follow_obj)
-            dbo.session.commit()
-            return (ResponseStatusCode.SUCCESS, None)
-            
+
+            items, seen = [], set()
+            targets = {"follow": [], "unfollow": []}
+            for action, u_uuids in (("follow", follow), ("unfollow", unfollow)):
+                for u_uuid in u_uuids:
+                    item = {"u_uuid": u_uuid, "action": action, "result": None}
+                    items.append(item)
+                    if not is_valid_uuid_format(u_uuid):
+                        item["result"] = "invalid_format"
+                        continue
+
+                    item["u_uuid"] = u_uuid = str(uuid.UUID(u_uuid))
+                    if u_uuid in seen:
+                        item["result"] = "duplicate"
+                    elif u_uuid not in UniversityCatalog.u_uuids:
+                        item["result"] = "not_found"
+                    else:
+                        targets[action].append(u_uuid)
+
+                    seen.add(u_uuid)
+
+            followed, unfollowed = set(), set()
+            if targets["follow"]:
+                now = datetime.now()
+                rows = (await session.execute(pg_insert(Following)
+                    .values([{"f_uuid": uuid.uuid4(), "a_uuid": a_uuid, "u_uuid": u_uuid, "following_date": now}
+                             for u_uuid in targets["follow"]])
+                    .on_conflict_do_nothing(index_elements=["a_uuid", "u_uuid"])
+                    .returning(Following.u_uuid))).all()
+                followed = {str(row[0]) for row in rows}
+
+            if targets["unfollow"]:
+                rows = (await session.execute(delete(Following)
+                    .where(Following.a_uuid == a_uuid,
+                           Following.u_uuid == any_(bindparam("targets", targets["unfollow"], type_=ARRAY(UUID(as_uuid=False)))))
+                    .returning(Following.u_uuid))).all()
+                unfollowed = {str(row[0]) for row in rows}
+
+            await session.commit()
+            if followed or unfollowed:
+                Following.invalidate_follow_cache(a_uuid)
+
+            for item in items:
+                if item["result"] is None:
+                    if item["action"] == "follow":
+                        item["result"] = "followed" if item["u_uuid"] in followed else "already_following"
+                    else:
+                        item["result"] = "unfollowed" if item["u_uuid"] in unfollowed else "not_following"
+
+            return (ResponseStatusCode.SUCCESS, items)
+
         except Exception as e:
-            dbo.session.rollback()
-            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            await session.rollback()
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(f"{e}"))
-    
+
     @staticmethod
-    def get_follow_univ_list(dbo: DBObject, a_uuid: str):
+    async def get_follow_univ_list(session: AsyncSession, a_uuid: str) -> Tuple[ResponseStatusCode, List[str] | Detail]:
+        """ a_uuid가 팔로우한 u_uuid 리스트를 캐시에서 찾고, 없으면 인덱스로 조회해서 캐시에 저장합니다.
+            이 워커에서 팔로우가 바뀌면 바로 지우고, 다른 워커의 변경은 FOLLOW_CACHE_TTL 안에 반영됩니다.
+
+        """
+        followed = _follow_cache.get(a_uuid)
+        if followed is not None:
+            return (ResponseStatusCode.SUCCESS, list(followed))
+
         try:
-            results = dbo.session.query(Following.u_uuid).filter_by(a_uuid = a_uuid).all()
-            return (ResponseStatusCode.SUCCESS, list(map(lambda x: str(x[0]), results)))
+            results = (await session.execute(select(Following.u_uuid).filter_by(a_uuid = a_uuid))).all()
+            followed = tuple(str(row[0]) for row in results)
+            _follow_cache.set(a_uuid, followed)
+            return (ResponseStatusCode.SUCCESS, list(followed))
         
         except Exception as e:
-            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
-            return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(f"{e}"))
\ No newline at end of file
+            logging.error(e, exc_info=e)
+            return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(f"{e}"))
+
+    @staticmethod
+    def invalidate_follow_cache(a_uuid: str):
+        _follow_cache.pop(a_uuid)
@@ -0,0 +1,205 @@
+from models.response import ResponseStatusCode, Detail
+from models.university import University, logo_file_path
+from utility.image_meta import ImageMeta, describe_image_bytes
+from utility.checker import is_valid_uuid_format
+from utility.cache import TTLCache
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from pydantic import BaseModel
+from typing import Dict, List, Tuple
+from PIL import Image
+import logging
+import base64
+import math
+import io
+import os
+
+SPRITE_TILE_SIZES = (32, 64, 128, 200)  # 스프라이트 한 칸의 크기로 허용하는 값
+SPRITE_FORMATS = {"png": ("PNG", {}), "webp": ("WEBP", {"quality": 85})}  # webp는 png보다 3배 정도 작습니다.
+SPRITE_MAX_LOGOS = 500
+SPRITE_CACHE_SIZE = 64
+SPRITE_CACHE_TTL = 60 * 60
+
+
+class LogoSpriteModel(BaseModel):
+    """ 스프라이트로 묶을 대학교 u_uuid 목록과 한 칸의 크기
+
+    """
+    u_uuids: List[str]
+    size: int = 64
+    format: str = "png"
+
+
+class LogoEntry:
+    __slots__ = ("data", "meta")
+
+    def __init__(self, data: bytes, meta: ImageMeta):
+        self.data = data
+        self.meta = meta
+
+
+class LogoStore:
+    """ LogoStore 클래스는 images/logos 의 로고 파일을 u_uuid 별로 메모리에 올려 둔 저장소입니다.
+        서버가 시작될 때 UniversityCatalog 다음에 한 번 불러오고, 이후 로고 조회는 DB와 디스크를 거치지 않습니다.
+        여러 로고를 한 번에 요청하면 한 장의 스프라이트 이미지와 좌표표로 묶어서 돌려줍니다.
+
+    """
+    loaded: bool = False
+    logos: Dict[str, LogoEntry] = {}
+    _tiles: Dict[Tuple[str, int], Image.Image] = {}
+    _sprites = TTLCache(SPRITE_CACHE_SIZE, SPRITE_CACHE_TTL)
+
+    @staticmethod
+    def _read_logos(paths: Dict[str, str]) -> Dict[str, LogoEntry]:
+        logos = {}
+        for u_uuid, path in paths.items():
+            if not os.path.isfile(path):
+                continue
+
+            with open(path, "rb") as fp:
+                data = fp.read()
+                stat = os.fstat(fp.fileno())
+
+            logos[u_uuid] = LogoEntry(data, describe_image_bytes(path, data, stat))
+
+        return logos
+
+    @classmethod
+    async def load(cls, session: AsyncSession) -> Tuple[ResponseStatusCode, None | Detail]:
+        try:
+            data = (await session.execute(select(University.u_uuid,
+                                                 University.univ_name,
+                                                 University.logo_path))).all()
+
+            paths = {str(row.u_uuid): logo_file_path(row.univ_name, row.logo_path) for row in data}
+            cls.logos = await run_in_threadpool(cls._read_logos, paths)
+            cls._tiles = {}
+            cls._sprites.clear()
+            cls.loaded = True
+
+            missing = len(paths) - len(cls.logos)
+            if missing:
+                logging.warning(f"{missing} university logos not found in LogoStore.load")
+
+            return (ResponseStatusCode.SUCCESS, None)
+
+        except Exception as e:
+            logging.error(e, exc_info=e)
+            return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
+
+    @classmethod
+    async def ensure_loaded(cls, session: AsyncSession) -> Tuple[ResponseStatusCode, None | Detail]:
+        if cls.loaded:
+            return (ResponseStatusCode.SUCCESS, None)
+
+        return await cls.load(session)
+
+    @classmethod
+    async def get_logo(cls, session: AsyncSession, u_uuid: str) -> Tuple[ResponseStatusCode, LogoEntry | Detail]:
+        try:
+            if not is_valid_uuid_format(u_uuid):
+                return (ResponseStatusCode.ENTITY_ERROR,
+                        Detail(f"{u_uuid} is not valid uuid format"))
+
+            status_code, result = await cls.ensure_loaded(session)
+            if status_code != ResponseStatusCode.SUCCESS:
+                return (status_code, result)
+
+            entry = cls.logos.get(u_uuid)
+            if entry is None:
+                return (ResponseStatusCode.NOT_FOUND,
+                        Detail(f"{u_uuid} not founded in university"))
+
+            return (ResponseStatusCode.SUCCESS, entry)
+
+        except Exception as e:
+            logging.error(e, exc_info=e)
+            return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
+
+    @classmethod
+    def _tile(cls, u_uuid: str, size: int) -> Image.Image:
+        tile = cls._tiles.get((u_uuid, size))
+        if tile is None:
+            with Image.open(io.BytesIO(cls.logos[u_uuid].data)) as source:
+                tile = source.convert("RGBA")
+            tile.thumbnail((size, size))
+            cls._tiles[(u_uuid, size)] = tile
+
+        return tile
+
+    @classmethod
+    def _build_sprite(cls, u_uuids: Tuple[str, ...], size: int, image_format: str) -> Dict[str, object]:
+        """ 로고를 정사각형에 가까운 격자로 배치한 이미지 한 장과 u_uuid 별 좌표를 만듭니다.
+            Pillow 연산이라 스레드 풀에서 호출합니다.
+
+        """
+        columns = math.ceil(math.sqrt(len(u_uuids)))
+        rows = math.ceil(len(u_uuids) / columns)
+        sprite = Image.new("RGBA", (columns * size, rows * size), (0, 0, 0, 0))
+
+        coords = {}
+        for index, u_uuid in enumerate(u_uuids):
+            x, y = (index % columns) * size, (index // columns) * size
+            tile = cls._tile(u_uuid, size)
+            sprite.paste(tile, (x + (size - tile.width) // 2, y + (size - tile.height) // 2))
+            coords[u_uuid] = {"x": x, "y": y, "w": size, "h": size}
+
+        pil_format, options = SPRITE_FORMATS[image_format]
+        buffer = io.BytesIO()
+        sprite.save(buffer, format=pil_format, **options)
+        return {
+            "image": f"data:image/{image_format};base64," + base64.b64encode(buffer.getvalue()).decode("ascii"),
+            "width": sprite.width,
+            "height": sprite.height,
+            "coords": coords,
+        }
+
+    @classmethod
+    async def get_sprite(
+        cls,
+        session: AsyncSession,
+        u_uuids: List[str],
+        size: int,
+        image_format: str = "png"
+    ) -> Tuple[ResponseStatusCode, Tuple[Dict[str, object], List[str]] | Detail]:
+        """ 요청한 로고들을 스프라이트 한 장으로 묶어서 돌려줍니다.
+            같은 로고 집합과 크기로 만든 스프라이트는 SPRITE_CACHE_TTL 동안 재사용합니다.
+
+        ### Returns
+            Tuple[ResponseStatusCode, Tuple[Dict[str, object], List[str]] | Detail]: (스프라이트, 로고가 없는 u_uuid 리스트)
+        """
+        try:
+            if size not in SPRITE_TILE_SIZES:
+                return (ResponseStatusCode.ENTITY_ERROR,
+                        Detail(f"size must be one of {SPRITE_TILE_SIZES}"))
+
+            if image_format not in SPRITE_FORMATS:
+                return (ResponseStatusCode.ENTITY_ERROR,
+                        Detail(f"format must be one of {tuple(SPRITE_FORMATS)}"))
+
+            if not u_uuids or len(u_uuids) > SPRITE_MAX_LOGOS:
+                return (ResponseStatusCode.ENTITY_ERROR,
+                        Detail(f"u_uuids must contain 1 to {SPRITE_MAX_LOGOS} items"))
+
+            status_code, result = await cls.ensure_loaded(session)
+            if status_code != ResponseStatusCode.SUCCESS:
+                return (status_code, result)
+
+            requested = sorted(set(u_uuids))
+            found = tuple(u_uuid for u_uuid in requested if u_uuid in cls.logos)
+            missing = [u_uuid for u_uuid in requested if u_uuid not in cls.logos]
+            if not found:
+                return (ResponseStatusCode.NOT_FOUND,
+                        Detail("No logos found for requested u_uuids"))
+
+            sprite = cls._sprites.get((found, size, image_format))
+            if sprite is None:
+                sprite = await run_in_threadpool(cls._build_sprite, found, size, image_format)
+                cls._sprites.set((found, size, image_format), sprite)
+
+            return (ResponseStatusCode.SUCCESS, (sprite, missing))
+
+        except Exception as e:
+            logging.error(e, exc_info=e)
+            return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
@@ -1,5 +1,23 @@
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi import Request
+from utility.image_meta import ImageMeta, load_image_meta
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Iterator, Tuple
+from datetime import datetime
 from enum import Enum
+import orjson
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"  # 이름에 uuid가 들어가서 내용이 바뀌지 않는 파일
+REVALIDATE_CACHE = "no-cache"  # 저장은 하되 매번 ETag로 확인
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def format_datetime(value: datetime | None) -> str | None:
+    """ 응답에 쓰는 "%Y-%m-%d %H:%M:%S" 형식의 문자열, strftime 보다 몇 배 빠른 isoformat 으로 만듭니다.
+
+    """
+    return value.isoformat(sep=" ", timespec="seconds") if value is not None else None
 
 
 class ResponseStatusCode(Enum):
@@ -11,6 +29,7 @@ class ResponseStatusCode(Enum):
     CONFLICT = 409  # 데이터 충돌
     ENTITY_ERROR = 422  # 입력 데이터 타입이 잘못됨
     INTERNAL_SERVER_ERROR = 500  # 서버 내부 에러
+    SERVICE_UNAVAILABLE = 503  # 요청이 몰려서 지금은 처리할 수 없음
 
 
 class Detail:
@@ -20,18 +39,158 @@ class Detail:
         self.text = text
 
 
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def _not_modified(request: Request, meta: ImageMeta) -> bool:
+    """ If-None-Match가 있으면 그것만 보고, 없을 때만 If-Modified-Since를 봅니다. (RFC 9110 13.2.2)
+
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, meta.etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            return int(meta.mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+
+        except (TypeError, ValueError):
+            return False
+
+    return False
+
+
+def _parse_range(header: str, size: int) -> Tuple[int, int] | None:
+    """ "bytes=start-end" 형태의 단일 범위만 지원합니다. 만족할 수 없는 범위면 None을 돌려줍니다.
+
+    ### Raises
+        - ValueError: 해석할 수 없는 Range 헤더일 때 발생하는 에러입니다.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        raise ValueError(header)
+
+    start, _, end = spec.strip().partition("-")
+    if start == "":
+        length = int(end)
+        if length <= 0:
+            return None
+        return (max(size - length, 0), size - 1)
+
+    first, last = int(start), (int(end) if end else size - 1)
+    if first >= size or first > last:
+        return None
+
+    return (first, min(last, size - 1))
+
+
+def _iter_file(image_path: str, start: int, end: int) -> Iterator[bytes]:
+    with open(image_path, "rb") as fp:
+        fp.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = fp.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
 class ResponseModel:
     status_code: int
 
     @staticmethod
     def show_json(status_code: int, **kwargs):
+        """ None 인 값만 빼고 응답 본문에 넣습니다. False, 0, 빈 목록은 그대로 내보냅니다.
+
+        """
         show_dict = {"status_code": status_code}
         for key in kwargs.keys():
-            if kwargs[key]:
+            if kwargs[key] is not None:
                 show_dict[key] = kwargs[key]
 
-        return JSONResponse(show_dict, status_code=status_code)
+        # UUID와 datetime 은 str() 없이 그대로 넣어도 orjson 이 직렬화합니다.
+        return Response(orjson.dumps(show_dict, option=orjson.OPT_NON_STR_KEYS), status_code=status_code, media_type="application/json")
 
     @staticmethod
-    def show_image(image_path: str):
-        return FileResponse(path=image_path, media_type="image/png")
+    def show_raw_json(status_code: int, raw: Dict[str, bytes], **kwargs):
+        """ 미리 직렬화해 둔 JSON 값(raw)을 다시 직렬화하지 않고 show_json()과 같은 형태의 본문에 이어 붙입니다.
+
+        """
+        show_dict = {"status_code": status_code}
+        for key in kwargs.keys():
+            if kwargs[key] is not None:
+                show_dict[key] = kwargs[key]
+
+        body = orjson.dumps(show_dict)
+        parts = [body[:-1]]
+        for key, value in raw.items():
+            parts.append(b"," + orjson.dumps(key) + b":" + value)
+
+        return Response(b"".join(parts) + b"}", status_code=status_code, media_type="application/json")
+
+    @staticmethod
+    def _image_headers(meta: ImageMeta, cache_control: str, vary: str | None) -> Dict[str, str]:
+        headers = {
+            "ETag": meta.etag,
+            "Last-Modified": formatdate(meta.mtime, usegmt=True),
+            "Cache-Control": cache_control,
+        }
+        if vary:
+            headers["Vary"] = vary
+
+        return headers
+
+    @staticmethod
+    def show_image_bytes(data: bytes, meta: ImageMeta, request: Request | None = None, cache_control: str = REVALIDATE_CACHE):
+        """ 메모리에 올려 둔 이미지를 show_image()와 같은 캐시 헤더로 응답합니다.
+
+        """
+        headers = ResponseModel._image_headers(meta, cache_control, None)
+        if request is not None and _not_modified(request, meta):
+            return Response(status_code=304, headers=headers)
+
+        return Response(data, media_type=meta.media_type, headers=headers)
+
+    @staticmethod
+    async def show_image(image_path: str, request: Request | None = None, cache_control: str = REVALIDATE_CACHE, vary: str | None = None):
+        """ 파일 내용의 해시로 만든 ETag와 Last-Modified, Cache-Control을 붙여서 이미지를 응답합니다.
+            조건부 요청이 일치하면 본문 없이 304를, 단일 Range 요청이면 206을 돌려줍니다.
+            해시는 파일마다 처음 한 번만 계산해서 사이드카 파일에 저장하고, stat 과 사이드카 읽기도 스레드 풀에서 합니다.
+
+        ### Raises
+            - FileNotFoundError: 이미지 파일이 없을 때 발생하는 에러입니다.
+        """
+        meta = await run_in_threadpool(load_image_meta, image_path)
+        headers = ResponseModel._image_headers(meta, cache_control, vary)
+        headers["Accept-Ranges"] = "bytes"
+        if request is None:
+            return FileResponse(path=image_path, media_type=meta.media_type, headers=headers)
+
+        if _not_modified(request, meta):
+            return Response(status_code=304, headers=headers)
+
+        range_header = request.headers.get("range")
+        if_range = request.headers.get("if-range")
+        if range_header and (if_range is None or if_range.strip() == meta.etag):
+            try:
+                byte_range = _parse_range(range_header, meta.size)
+
+            except ValueError:
+                # 해석할 수 없는 Range 헤더는 무시하고 전체를 응답합니다.
+                return FileResponse(path=image_path, media_type=meta.media_type, headers=headers)
+
+            if byte_range is None:
+                return Response(status_code=416, headers={"Content-Range": f"bytes */{meta.size}"})
+
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{meta.size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(_iter_file(image_path, start, end), status_code=206, media_type=meta.media_type, headers=headers)
+
+        return FileResponse(path=image_path, media_type=meta.media_type, headers=headers)
@@ -1,23 +1,47 @@
 from models.response import ResponseStatusCode, Detail
-from typing import Dict, Any, List, TypeVar, Tuple
+from typing import Dict, Any, List, TypeVar, Tuple, Callable, Iterable
 from utility.checker import is_valid_uuid_format
-from sqlalchemy import Column, String, TEXT, or_
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import Column, String, TEXT, Index, or_, select, literal_column, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.dialects.postgresql import UUID, insert as pg_insert
 from sqlalchemy.engine.row import Row
-from database.conn import DBObject
 from models.base import Base
-from pathlib import Path
-from PIL import Image
-import traceback
+from utility.logo_pipeline import SOURCE_DIR as LOGO_ROOT_PATH, OUTPUT_DIR as LOGO_PROCESSED_PATH
+from utility.crawler import CareerNetCrawler, CrawlError
+import asyncio
 import requests
+import orjson
 import logging
-import rembg
 import uuid
 import os
 
 University = TypeVar("University", bound="University")
 
+UPSERT_BATCH_SIZE = 1000  # 한 INSERT 문에 담는 행 수 (asyncpg 바인드 파라미터 한도 32767 이내)
+CATALOG_REFRESH_INTERVAL = 300  # 다른 프로세스(python main.py init)가 university 테이블을 바꿨는지 확인하는 주기 (초)
+# university 테이블 전체 내용의 요약 값, 마지막으로 불러온 값과 다를 때만 카탈로그와 로고를 다시 불러옵니다.
+CATALOG_SIGNATURE_SQL = text("""
+    SELECT md5(coalesce(string_agg(concat_ws('|', u_uuid, univ_name, address, logo_path), ',' ORDER BY u_uuid), ''))
+    FROM university
+""")
+
+
+def logo_file_path(univ_name: str, logo_path: str | None = None) -> str:
+    """ logo_path 컬럼이 비어 있으면 대학교 이름의 첫 단어로 로고 파일 경로를 만듭니다.
+        전처리된 로고(LOGO_PROCESSED_PATH)가 있으면 원본(images/logos)보다 먼저 씁니다.
+
+    """
+    if logo_path:
+        return logo_path
+
+    file_name = f"{univ_name.split(' ')[0]}.png"
+    processed_path = os.path.join(LOGO_PROCESSED_PATH, file_name)
+    if os.path.exists(processed_path):
+        return processed_path
+
+    return os.path.join(LOGO_ROOT_PATH, file_name)
+
+
 class UniversityNameModel:
     u_uuid: str
     univ_name: str
@@ -30,12 +54,110 @@ class UniversityNameModel:
 
     @property
     def info(self):
-        return {"u_uuid": str(self.u_uuid),
+        return {"u_uuid": self.u_uuid,
                 "univ_name": f"{self.univ_name}({self.address.split(' ')[0]})"}
 
 
+class UniversityCatalog:
+    """ UniversityCatalog 클래스는 프로세스 전체에서 공유하는 university 테이블의 메모리 캐시입니다.
+        서버가 시작될 때 한 번 불러오고, _init_univ()로 데이터가 추가되면 refresh 됩니다.
+        다른 프로세스에서 바꾼 내용은 start() 가 CATALOG_REFRESH_INTERVAL 초마다 확인해서 다시 불러옵니다.
+
+    """
+    loaded: bool = False
+    u_uuids: frozenset = frozenset()
+    names: Dict[str, UniversityNameModel] = {}
+    name_list_json: bytes = b"[]"
+    signature: str | None = None
+    _task: asyncio.Task | None = None
+    _stopping: asyncio.Event | None = None
+
+    @classmethod
+    async def load(cls, session: AsyncSession) -> Tuple[ResponseStatusCode, None | Detail]:
+        try:
+            # 요약 값을 먼저 읽어서, 읽는 사이에 테이블이 바뀌면 다음 확인 때 다시 불러오게 합니다.
+            signature = (await session.execute(CATALOG_SIGNATURE_SQL)).scalar()
+            data = (await session.execute(select(University.u_uuid,
+                                                 University.address,
+                                                 University.univ_name))).all()
+
+            names = {str(row.u_uuid): UniversityNameModel(row) for row in data}
+            cls.names = names
+            cls.u_uuids = frozenset(names.keys())
+            cls.name_list_json = orjson.dumps([model.info for model in names.values()])
+            cls.signature = signature
+            cls.loaded = True
+            return (ResponseStatusCode.SUCCESS, None)
+
+        except Exception as e:
+            logging.error(e, exc_info=e)
+            return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
+
+    @classmethod
+    async def ensure_loaded(cls, session: AsyncSession) -> Tuple[ResponseStatusCode, None | Detail]:
+        if cls.loaded:
+            return (ResponseStatusCode.SUCCESS, None)
+
+        return await cls.load(session)
+
+    @classmethod
+    async def refresh(cls, session: AsyncSession) -> bool:
+        """ university 테이블이 마지막으로 불러온 뒤에 바뀌었으면 다시 불러옵니다.
+
+        ### Returns
+            bool: 다시 불러왔는지 여부
+        """
+        signature = (await session.execute(CATALOG_SIGNATURE_SQL)).scalar()
+        if cls.loaded and signature == cls.signature:
+            return False
+
+        status_code, _ = await cls.load(session)
+        return status_code == ResponseStatusCode.SUCCESS
+
+    @classmethod
+    async def _run(cls, session_factory: async_sessionmaker, interval: float, on_change: Iterable[Callable]):
+        while not cls._stopping.is_set():
+            try:
+                await asyncio.wait_for(cls._stopping.wait(), interval)
+                break
+
+            except asyncio.TimeoutError:
+                pass
+
+            try:
+                async with session_factory() as session:
+                    if await cls.refresh(session):
+                        logging.info("University catalog changed, reloaded")
+                        for callback in on_change:
+                            await callback(session)
+
+            except Exception as e:
+                logging.error(e, exc_info=e)
+
+    @classmethod
+    def start(cls, session_factory: async_sessionmaker, interval: float = CATALOG_REFRESH_INTERVAL, on_change: Iterable[Callable] = ()):
+        """ interval 초마다 university 테이블이 바뀌었는지 확인하고, 바뀌었으면 다시 불러온 다음 on_change 를 세션과 함께 부릅니다.
+
+        """
+        if cls._task is not None:
+            return
+
+        cls._stopping = asyncio.Event()
+        cls._task = asyncio.get_running_loop().create_task(cls._run(session_factory, interval, tuple(on_change)))
+
+    @classmethod
+    async def stop(cls):
+        if cls._task is not None:
+            cls._stopping.set()
+            await cls._task
+            cls._task, cls._stopping = None, None
+
+
 class University(Base):
     __tablename__ = "university"
+    __table_args__ = (Index(
+        "uq_university_name_address", "univ_name", "address", unique=True
+    ),)
 
     u_uuid = Column(UUID(as_uuid=True), nullable=False,
                     default=uuid.uuid4, primary_key=True)
@@ -73,33 +195,31 @@ class University(Base):
             "address": self.address,
             "link": self.link,
             "logo_path": self.logo_path,
-            "u_uuid": str(self.u_uuid)
+            "u_uuid": self.u_uuid
         }
 
     @staticmethod
-    def get_univ_name_list(
-        dbo: DBObject
-    ) -> Tuple[ResponseStatusCode, List[UniversityNameModel] | Detail]:
+    async def get_univ_name_list(
+        session: AsyncSession
+    ) -> Tuple[ResponseStatusCode, bytes | Detail]:
         try:
-            data = dbo.session.query(University.u_uuid,
-                                    University.address,
-                                    University.univ_name).all()
+            status_code, result = await UniversityCatalog.ensure_loaded(session)
+            if status_code != ResponseStatusCode.SUCCESS:
+                return (status_code, result)
 
-            if len(data) == 0:
+            if len(UniversityCatalog.u_uuids) == 0:
                 return (ResponseStatusCode.NOT_FOUND,
                         Detail("Data doesn't exist"))
 
-            return (ResponseStatusCode.SUCCESS,
-                    list(map(lambda x: UniversityNameModel(x).info, data)))
+            return (ResponseStatusCode.SUCCESS, UniversityCatalog.name_list_json)
 
         except Exception as e:
-            logging.error(f"""{e}: {''.join(traceback.format_exception(None,
-                        e, e.__traceback__))}""")
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
 
     @staticmethod
-    def get_univ_from_uuid(
-        dbo: DBObject,
+    async def get_univ_from_uuid(
+        session: AsyncSession,
         u_uuid: str
     ) -> Tuple[ResponseStatusCode, University | Detail]:
         try:
@@ -107,8 +227,8 @@ class University(Base):
                 return (ResponseStatusCode.ENTITY_ERROR,
                         Detail(f"{u_uuid} is not valid uuid format"))
 
-            university = dbo.session.query(University)\
-                .filter_by(u_uuid=u_uuid).first()
+            university = (await session.execute(select(University)
+                .filter_by(u_uuid=u_uuid))).scalars().first()
             if university:
                 return (ResponseStatusCode.SUCCESS, university)
 
@@ -117,200 +237,178 @@ class University(Base):
                         Detail(f"{u_uuid} not founded in university"))
 
         except Exception as e:
-            logging.error(f"""{e}: {''.join(traceback.format_exception(None,
-                        e, e.__traceback__))}""")
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
 
     def get_logo_path(self) -> Tuple[ResponseStatusCode, str | Detail]:
         try:
-            if self.logo_path is None:
-                self.logo_path = f"./images/logos/\
-                    {self.univ_name.split(' ')[0]}.png"
-
+            self.logo_path = logo_file_path(self.univ_name, self.logo_path)
             return (ResponseStatusCode.SUCCESS, self.logo_path)
 
         except Exception as e:
-            logging.error(f"""{e}: {''.join(traceback.format_exception(None,
-                        e, e.__traceback__))}""")
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
         
     @staticmethod
-    def _load_all_u_uuid(dbo: DBObject) -> Tuple[ResponseStatusCode, list | Detail]:
-        try:
-            results = dbo.session.query(University.u_uuid).all()
-            return (ResponseStatusCode.SUCCESS, list(map(lambda x: str(x[0]), results)))
-            
-        except Exception as e:
-            logging.error(f"""{e}: {''.join(traceback.format_exception(None,
-                        e, e.__traceback__))}""")
-            return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
-
-    @staticmethod
-    def _change_logo_extension() -> Tuple[ResponseStatusCode, None | str]:
+    async def _load_all_u_uuid(session: AsyncSession) -> Tuple[ResponseStatusCode, frozenset | Detail]:
         try:
-            LOGO_ROOT_PATH = "./images/logos"
-            for img_path in os.listdir(LOGO_ROOT_PATH):
-                path_obj = Path(f"{LOGO_ROOT_PATH}/{img_path}")
-                path_obj.rename(path_obj.with_suffix(".png"))
-
-            return (ResponseStatusCode, None)
-
-        except Exception as e:
-            logging.error(f"""{e}: {''.join(traceback.format_exception(None,
-                        e, e.__traceback__))}""")
-            return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
-
-    @staticmethod
-    def _remove_icon_background() -> Tuple[ResponseStatusCode, None | str]:
-        try:
-            LOGO_ROOT_PATH = "./images/logos"
-            for img_path in os.listdir(LOGO_ROOT_PATH):
-                img = Image.open(f"{LOGO_ROOT_PATH}/{img_path}")
-                out = rembg.remove(img)
-                out.save(f"{LOGO_ROOT_PATH}/{img_path}")
-
-            return (ResponseStatusCode, None)
+            status_code, result = await UniversityCatalog.ensure_loaded(session)
+            if status_code != ResponseStatusCode.SUCCESS:
+                return (status_code, result)
 
+            return (ResponseStatusCode.SUCCESS, UniversityCatalog.u_uuids)
+            
         except Exception as e:
-            logging.error(f"""{e}: {''.join(traceback.format_exception(None,
-                        e, e.__traceback__))}""")
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
 
     @staticmethod
-    def _check_image_exist(
-        dbo: DBObject
+    async def _check_image_exist(
+        session: AsyncSession
     ) -> Tuple[ResponseStatusCode, None | Detail]:
         try:
-            LOGO_ROOT_PATH = "./images/logos"
-            data = dbo.session.query(University.univ_name).all()[0]
+            data = (await session.execute(select(University.univ_name,
+                                                 University.logo_path))).all()
 
-            for univ_name in data:
-                if not os.path.exists(f"{LOGO_ROOT_PATH}/{univ_name}.png"):
+            for univ_name, logo_path in data:
+                path = logo_file_path(univ_name, logo_path)
+                if not os.path.exists(path):
                     return (ResponseStatusCode.NOT_FOUND,
-                            Detail(str(f"University's logo doesn't exist in \
-                                {LOGO_ROOT_PATH}/{univ_name}.png")))
+                            Detail(f"University's logo doesn't exist in {path}"))
 
             return (ResponseStatusCode.SUCCESS, None)
 
         except Exception as e:
-            logging.error(f"""{e}: {''.join(traceback.format_exception(None,
-                        e, e.__traceback__))}""")
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
 
-    @staticmethod
-    def _resize_logo() -> Tuple[ResponseStatusCode, None | Detail]:
-        LOGO_ROOT_PATH = "./images/logos"
-        for img_path in os.listdir(LOGO_ROOT_PATH):
-            img = Image.open(f"{LOGO_ROOT_PATH}/{img_path}")
-            img = img.resize((200, 200))
-            img.save(f"{LOGO_ROOT_PATH}/{img_path}")
-
-    @staticmethod
-    def _check_data_exist(
-        dbo: DBObject
-    ) -> Tuple[ResponseStatusCode, None | str]:
-        return {
-            True: (ResponseStatusCode.SUCCESS, None),
-            False: (ResponseStatusCode.CONFLICT,
-                    Detail("Data Conflicted in University._check_data_exist"))
-        }[dbo.session.query(University).all() == []]
-
     @staticmethod
     def _crawl_univ_info(
         URL: str,
-        API_KEY: str
-    ) -> Tuple[ResponseStatusCode, List[Dict[str, Any]] | str]:
+        API_KEY: str,
+        fixture_dir: str | None = None
+    ) -> Tuple[ResponseStatusCode, List[Dict[str, Any]] | Detail]:
+        """ CareerNetCrawler 로 모든 페이지를 받아서 university 테이블 형식으로 바꿉니다.
+            fixture_dir 을 주면 네트워크 대신 저장된 응답을 읽습니다.
+
+        """
+        crawler = CareerNetCrawler(URL, API_KEY, fixture_dir=fixture_dir)
         try:
-            params = {"apiKey": API_KEY, "svcType": "api",
-                    "svcCode": "SCHOOL", "contentType": "json",
-                    "gubun": "univ_list", "perPage": 500}
-
-            response = requests.get(URL, params=params)
-
-            if response.status_code == 200:
-                data = response.json()
-                return (ResponseStatusCode.SUCCESS,
-                        list(map(lambda x: {"univ_name": x["schoolName"],
-                                            "univ_gubun": x["schoolGubun"],
-                                            "address": x["adres"],
-                                            "link": x["link"],
-                                            "est_type": x["estType"],
-                                            "total": x["totalCount"]},
-                                data["dataSearch"]["content"])))
-
-            else:
-                return (ResponseStatusCode.FAIL,
-                        Detail("""URL Not Responded in \
-                            University._crawl_univ_info"""))
-
-        except requests.exceptions.ConnectionError:
+            content = crawler.crawl()
+            return (ResponseStatusCode.SUCCESS,
+                    list(map(lambda x: {"univ_name": x["schoolName"],
+                                        "univ_gubun": x["schoolGubun"],
+                                        "address": x["adres"],
+                                        "link": x["link"],
+                                        "est_type": x["estType"],
+                                        "total": x["totalCount"]},
+                             content)))
+
+        except CrawlError as e:
+            return (ResponseStatusCode.FAIL, Detail(f"{e} in University._crawl_univ_info"))
+
+        except requests.exceptions.RequestException:
             return (ResponseStatusCode.NOT_FOUND,
                     Detail("URL Not Found in University._crawl_univ_info"))
 
         except Exception as e:
-            logging.error(f"""{e}: {''.join(traceback.format_exception(None,
-                        e, e.__traceback__))}""")
-            return (ResponseStatusCode.INTERNAL_SERVER_ERROR, str(e))
+            logging.error(e, exc_info=e)
+            return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
+
+        finally:
+            crawler.close()
 
     @staticmethod
-    def _insert_univ_info(
-        dbo: DBObject,
+    async def _insert_univ_info(
+        session: AsyncSession,
         univ_info: List[Dict[str, Any]]
-    ) -> Tuple[ResponseStatusCode, str | None]:
+    ) -> Tuple[ResponseStatusCode, Dict[str, int] | Detail]:
+        """ (univ_name, address)를 키로 INSERT ... ON CONFLICT DO UPDATE 를 한 트랜잭션 안에서 실행합니다.
+            값이 바뀐 행만 UPDATE 되고, RETURNING 의 xmax = 0 으로 새로 들어간 행과 갱신된 행을 구분합니다.
+            서버가 실행 중일 때 다시 돌려도 기존 u_uuid는 그대로 유지됩니다.
+
+        ### Returns
+            Tuple[ResponseStatusCode, Dict[str, int] | Detail]: {"inserted", "updated", "unchanged"} 개수
+        """
         try:
+            rows = {}
             for u in univ_info:
-                univ = University(
-                    univ_name=u["univ_name"],
-                    est_type=u["est_type"],
-                    link=u["link"],
-                    address=u["address"],
-                    univ_gubun=u["univ_gubun"]
-                )
-                dbo.session.add(univ)
-
-            return (ResponseStatusCode.SUCCESS, None)
-
-        except IntegrityError:
-            return (ResponseStatusCode.CONFLICT,
-                    Detail("""Data Already Exist in
-                        University._insert_univ_info"""))
+                rows[(u["univ_name"], u["address"])] = {
+                    "u_uuid": uuid.uuid4(),
+                    "univ_name": u["univ_name"],
+                    "est_type": u["est_type"],
+                    "link": u["link"],
+                    "address": u["address"],
+                    "univ_gubun": u["univ_gubun"]
+                }
+
+            rows = list(rows.values())
+            inserted = updated = 0
+            for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+                stmt = pg_insert(University).values(rows[start:start + UPSERT_BATCH_SIZE])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[University.univ_name, University.address],
+                    set_={
+                        "est_type": stmt.excluded.est_type,
+                        "link": stmt.excluded.link,
+                        "univ_gubun": stmt.excluded.univ_gubun
+                    },
+                    where=or_(University.est_type.is_distinct_from(stmt.excluded.est_type),
+                              University.link.is_distinct_from(stmt.excluded.link),
+                              University.univ_gubun.is_distinct_from(stmt.excluded.univ_gubun))
+                ).returning(literal_column("xmax = 0").label("inserted"))
+
+                for (is_inserted,) in (await session.execute(stmt)).all():
+                    if is_inserted:
+                        inserted += 1
+                    else:
+                        updated += 1
+
+            await session.commit()
+            return (ResponseStatusCode.SUCCESS, {"inserted": inserted,
+                                                 "updated": updated,
+                                                 "unchanged": len(rows) - inserted - updated})
 
         except Exception as e:
-            logging.error(f"""{e}: {''.join(traceback.format_exception(None,
-                        e, e.__traceback__))}""")
+            await session.rollback()
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
 
-        finally:
-            dbo.session.commit()
-
     @staticmethod
-    def _init_univ(
-        dbo: DBObject,
+    async def _init_univ(
+        session: AsyncSession,
         URL: str,
-        API_KEY: str
-    ) -> Tuple[ResponseStatusCode, str | None]:
+        API_KEY: str,
+        fixture_dir: str | None = None
+    ) -> Tuple[ResponseStatusCode, Dict[str, int] | Detail]:
+        """ CareerNet 에서 대학교 목록을 받아 university 테이블에 upsert 하고 카탈로그를 다시 불러옵니다.
+            이미 데이터가 있어도 바뀐 행만 갱신하므로 언제든 다시 실행할 수 있습니다.
+
+        ### Returns
+            Tuple[ResponseStatusCode, Dict[str, int] | Detail]: {"inserted", "updated", "unchanged"} 개수
+        """
         try:
-            result, data = University._check_data_exist(dbo)
+            # 크롤링은 블로킹 I/O라 스레드에서 실행합니다.
+            result, data = await asyncio.to_thread(University._crawl_univ_info, URL, API_KEY, fixture_dir)
             if result != ResponseStatusCode.SUCCESS:
                 return (result, data)
 
-            result, data = University._crawl_univ_info(URL, API_KEY)
-            if result != ResponseStatusCode.SUCCESS:
-                return (result, data)
-
-            if int(data[0]["total"]) != len(data):
-                return (ResponseStatusCode.DATA_REQUIRED,
+            if not data or int(data[0]["total"]) != len(data):
+                return (ResponseStatusCode.CONFLICT,
                         Detail("""Total University Count Not Equals in
                             University._init_univ"""))
 
             else:
-                result, detail = University._insert_univ_info(dbo, data)
-                if isinstance(detail, Detail):
-                    raise Exception(detail.message)
+                result, counts = await University._insert_univ_info(session, data)
+                if result != ResponseStatusCode.SUCCESS:
+                    return (result, counts)
+
+                status_code, detail = await UniversityCatalog.load(session)
+                if status_code != ResponseStatusCode.SUCCESS:
+                    return (status_code, detail)
 
-                return (ResponseStatusCode.SUCCESS, None)
+                return (ResponseStatusCode.SUCCESS, counts)
 
         except Exception as e:
-            logging.error(f"""{e}: {''.join(traceback.format_exception(None,
-                        e, e.__traceback__))}""")
+            logging.error(e, exc_info=e)
             return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
@@ -0,0 +1,181 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKeyConstraint, Index, select, update, func, case, text
+from sqlalchemy.dialects.postgresql import UUID, insert as pg_insert
+from models.university import UniversityCatalog
+from models.response import ResponseStatusCode, Detail, format_datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Tuple
+from datetime import datetime
+from models.base import Base
+import logging
+import math
+
+HOT_HALF_LIFE_HOURS = 24  # 게시물 하나의 hot 점수 기여도가 절반이 되는 시간
+RANKING_MAX_LIMIT = 100
+RANKING_ORDERS = ("hot", "count")
+HOT_EXP_FLOOR = -700  # PostgreSQL 의 float8 exp() 는 인자가 약 -708 보다 작으면 underflow 에러를 내므로 여기서 자릅니다.
+
+_DECAY_RATE = math.log(2) / (HOT_HALF_LIFE_HOURS * 60 * 60)
+_EPOCH = datetime(1970, 1, 1)
+
+
+def hot_exponent(posted_at: datetime) -> float:
+    """ 게시물 하나가 hot_score에 더하는 항의 지수 (시각이 늦을수록 큽니다.)
+
+    """
+    return (posted_at - _EPOCH).total_seconds() * _DECAY_RATE
+
+
+def _hot_score_add(score, added):
+    """ ln(exp(score) + exp(added)) = max + ln(1 + exp(-|score - added|))
+        두 게시물 시각이 반감기 24시간 기준 약 2.8년 넘게 떨어져 있으면 작은 쪽 항은 exp(HOT_EXP_FLOOR) 로 취급합니다.
+
+    """
+    return func.greatest(score, added) + func.ln(1 + func.exp(func.greatest(-func.abs(score - added), HOT_EXP_FLOOR)))
+
+
+def _hot_score_remove(score, exponent):
+    """ ln(exp(score) - exp(exponent)), 빼는 항이 합보다 훨씬 작으면 exp(HOT_EXP_FLOOR) 로 취급합니다.
+
+    """
+    return score + func.ln(func.greatest(1 - func.exp(func.greatest(exponent - score, HOT_EXP_FLOOR)), 1e-12))
+
+
+class UniversityStat(Base):
+    """ UniversityStat 클래스는 대학교 별 게시물 활동을 미리 집계해 둔 테이블입니다.
+        게시물이 작성, 삭제될 때 같은 트랜잭션 안에서 한 행만 갱신하므로 랭킹 조회는 article 을 읽지 않습니다.
+
+        hot_score 는 ln(Σ exp(hot_exponent(upload_date))) 로 저장합니다.
+        모든 대학교에 같은 값(현재 시각)을 빼는 것과 순서가 같아서, 시간이 지나도 다시 계산하지 않고
+        반감기 HOT_HALF_LIFE_HOURS 로 감쇠한 게시물 수의 순위를 그대로 유지합니다.
+
+    """
+    __tablename__ = "university_stat"
+
+    u_uuid = Column(UUID(as_uuid=True), primary_key=True)
+    article_count = Column(Integer, nullable=False, default=0)
+    last_post_date = Column(DateTime, nullable=True, default=None)
+    hot_score = Column(Float, nullable=True, default=None)
+
+    __table_args__ = (ForeignKeyConstraint(
+        ["u_uuid"], ["university.u_uuid"],
+        ondelete="CASCADE", onupdate="CASCADE"
+    ), Index("ix_university_stat_hot", hot_score.desc().nullslast()),
+       Index("ix_university_stat_count", article_count.desc()),)
+
+    @staticmethod
+    async def _on_article_insert(session: AsyncSession, u_uuid: str, posted_at: datetime):
+        """ 게시물 작성과 같은 트랜잭션에서 호출합니다. commit은 호출한 쪽에서 합니다.
+
+        """
+        exponent = hot_exponent(posted_at)
+        stmt = pg_insert(UniversityStat).values(u_uuid=u_uuid, article_count=1,
+                                                last_post_date=posted_at, hot_score=exponent)
+        score, added = UniversityStat.hot_score, stmt.excluded.hot_score
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UniversityStat.u_uuid],
+            set_={
+                "article_count": UniversityStat.article_count + 1,
+                "last_post_date": func.greatest(UniversityStat.last_post_date, stmt.excluded.last_post_date),
+                "hot_score": case((score.is_(None), added), else_=_hot_score_add(score, added)),
+            }
+        )
+        await session.execute(stmt)
+
+    @staticmethod
+    async def _on_article_delete(session: AsyncSession, u_uuid: str, posted_at: datetime):
+        """ 게시물 삭제와 같은 트랜잭션에서, article 행을 지운 다음에 호출합니다.
+
+        """
+        from models.article import Article
+
+        exponent = hot_exponent(posted_at)
+        last_post = select(func.max(Article.upload_date)).where(Article.u_uuid == u_uuid).scalar_subquery()
+        await session.execute(update(UniversityStat)
+            .where(UniversityStat.u_uuid == u_uuid)
+            .values(
+                article_count=func.greatest(UniversityStat.article_count - 1, 0),
+                last_post_date=last_post,
+                # ln(exp(score) - exp(exponent)), 마지막 게시물이면 NULL
+                hot_score=case((UniversityStat.article_count <= 1, None),
+                               else_=_hot_score_remove(UniversityStat.hot_score, exponent))))
+
+    @staticmethod
+    async def rebuild(session: AsyncSession) -> Tuple[ResponseStatusCode, None | Detail]:
+        """ article 테이블 전체로 집계를 다시 만듭니다. 기존 데이터를 옮기거나 집계가 어긋났을 때 한 번 실행합니다.
+
+        """
+        from models.article import Article
+
+        try:
+            await session.execute(text("""
+                WITH a AS (
+                    SELECT u_uuid, upload_date,
+                           extract(epoch FROM upload_date) * :rate AS x
+                    FROM article WHERE u_uuid IS NOT NULL
+                ), m AS (
+                    SELECT u_uuid, max(x) AS mx FROM a GROUP BY u_uuid
+                )
+                INSERT INTO university_stat (u_uuid, article_count, last_post_date, hot_score)
+                SELECT a.u_uuid, count(*), max(a.upload_date), m.mx + ln(sum(exp(greatest(a.x - m.mx, :floor))))
+                FROM a JOIN m ON a.u_uuid = m.u_uuid
+                GROUP BY a.u_uuid, m.mx
+                ON CONFLICT (u_uuid) DO UPDATE SET
+                    article_count = excluded.article_count,
+                    last_post_date = excluded.last_post_date,
+                    hot_score = excluded.hot_score
+            """).bindparams(rate=_DECAY_RATE, floor=HOT_EXP_FLOOR))
+            await session.execute(update(UniversityStat)
+                .where(~UniversityStat.u_uuid.in_(select(Article.u_uuid).where(Article.u_uuid.is_not(None))))
+                .values(article_count=0, last_post_date=None, hot_score=None))
+            await session.commit()
+            return (ResponseStatusCode.SUCCESS, None)
+
+        except Exception as e:
+            await session.rollback()
+            logging.error(e, exc_info=e)
+            return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
+
+    @staticmethod
+    async def get_ranking(session: AsyncSession, limit: int = 10, order: str = "hot") -> Tuple[ResponseStatusCode, List[Dict[str, Any]] | Detail]:
+        """ hot_score(또는 article_count) 순으로 상위 limit개 대학교를 돌려줍니다.
+            정렬 컬럼의 인덱스에서 limit개만 읽으므로 게시물 수와 관계없이 O(limit) 입니다.
+
+        ### Returns
+            List[Dict[str, Any]]: hot 은 반감기로 감쇠한 최근 게시물 수입니다.
+        """
+        try:
+            if order not in RANKING_ORDERS:
+                return (ResponseStatusCode.ENTITY_ERROR, Detail(f"order must be one of {RANKING_ORDERS}"))
+
+            if not 1 <= limit <= RANKING_MAX_LIMIT:
+                return (ResponseStatusCode.ENTITY_ERROR, Detail(f"limit must be between 1 and {RANKING_MAX_LIMIT}"))
+
+            status_code, result = await UniversityCatalog.ensure_loaded(session)
+            if status_code != ResponseStatusCode.SUCCESS:
+                return (status_code, result)
+
+            order_by = (UniversityStat.hot_score.desc().nullslast() if order == "hot"
+                        else UniversityStat.article_count.desc())
+            rows = (await session.execute(select(UniversityStat)
+                .where(UniversityStat.article_count > 0)
+                .order_by(order_by)
+                .limit(limit))).scalars().all()
+
+            now_exponent = hot_exponent(datetime.now())
+            ranking = []
+            for rank, stat in enumerate(rows, start=1):
+                name = UniversityCatalog.names.get(str(stat.u_uuid))
+                ranking.append({
+                    "rank": rank,
+                    "u_uuid": str(stat.u_uuid),
+                    "univ_name": name.info["univ_name"] if name else None,
+                    "article_count": stat.article_count,
+                    "last_post_date": format_datetime(stat.last_post_date),
+                    "hot": round(math.exp(min(stat.hot_score - now_exponent, 700)), 3) if stat.hot_score is not None else 0.0,
+                })
+
+            return (ResponseStatusCode.SUCCESS, ranking)
+
+        except Exception as e:
+            logging.error(e, exc_info=e)
+            return (ResponseStatusCode.INTERNAL_SERVER_ERROR, Detail(str(e)))
@@ -1,4 +1,6 @@
 from routers.account import account_router
 from routers.university import univ_router
 from routers.article import article_router
-from routers.following import following_router
\ No newline at end of file
+from routers.following import following_router
+from routers.metrics import metrics_router
+from routers.admin import admin_router
\ No newline at end of file
@@ -1,9 +1,14 @@
 from models.response import ResponseStatusCode, ResponseModel, Detail
 from models.account import SignUpModel, ForgotPasswordModel
-from fastapi import APIRouter, Depends, UploadFile, File
+from fastapi import APIRouter, Depends, UploadFile, File, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
-from database.conn import DBObject
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.conn import get_session
 from models.account import Account
+from utility.upload import UploadError, save_upload
+from utility.derivative import schedule_derivatives, resolve_variant
+from utility.auth import get_a_uuid
 import os
 
 
@@ -12,6 +17,8 @@ account_router = APIRouter(
     tags=["account"]
 )
 
+PROFILE_DIR = "images/profile"
+
 @account_router.put("/register", 
     responses={
         200: {
@@ -65,17 +72,18 @@ account_router = APIRouter(
     },
     name = "회원 가입"
 )
-async def register(model: SignUpModel):
+async def register(model: SignUpModel, session: AsyncSession = Depends(get_session)):
     response_dict = {
         ResponseStatusCode.SUCCESS: "회원가입에 성공하였습니다.",
         ResponseStatusCode.FAIL: "회원가입에 실패하였습니다.",
         ResponseStatusCode.NOT_FOUND: "등록되지 않은 대학교입니다.",
         ResponseStatusCode.CONFLICT: "이미 등록된 계정 또는 이메일 입니다.",
         ResponseStatusCode.ENTITY_ERROR: "유효하지 않은 uuid 포맷입니다.",
-        ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
+        ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다.",
+        ResponseStatusCode.SERVICE_UNAVAILABLE: "요청이 많아 처리하지 못했습니다. 잠시 후 다시 시도해 주세요."
     }
     
-    status_code, detail = Account.register(DBObject.instance, model.user_id, model.password, model.nickname, model.email, model.phone, model.u_uuid, model.s_id)
+    status_code, detail = await Account.register(session, model.user_id, model.password, model.nickname, model.email, model.phone, model.u_uuid, model.s_id)
 
     if status_code != ResponseStatusCode.SUCCESS:
         return ResponseModel.show_json(status_code = status_code.value, message = response_dict[status_code], detail = detail.text)
@@ -116,18 +124,27 @@ responses={
             }
         }
     },
+    503:{
+        "description": "비밀번호 확인을 기다리는 요청이 너무 많을때 발생한다.",
+        "content": {
+            "application/json": {
+                "example": {"status_code": 503, "message": "요청이 많아 처리하지 못했습니다. 잠시 후 다시 시도해 주세요.","detail": "64 password hashing requests are already waiting"}
+            }
+        }
+    },
 },
 name = "로그인"
 )
-async def login(model: OAuth2PasswordRequestForm = Depends()):
+async def login(model: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_session)):
     response_dict = {
         ResponseStatusCode.SUCCESS: "로그인에 성공하였습니다.",
         ResponseStatusCode.FAIL: "아이디 또는 비밀번호가 일치하지 않습니다.",
         ResponseStatusCode.ENTITY_ERROR: "데이터 형식이 잘못되었습니다.",
-        ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
+        ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다.",
+        ResponseStatusCode.SERVICE_UNAVAILABLE: "요청이 많아 처리하지 못했습니다. 잠시 후 다시 시도해 주세요."
     }
     
-    status_code, detail = Account.login(DBObject.instance, model.username, model.password)
+    status_code, detail = await Account.login(session, model.username, model.password)
     
     if isinstance(detail, Detail):
         return ResponseModel.show_json(status_code.value, message = response_dict[status_code], detail = detail.text)
@@ -164,25 +181,29 @@ async def login(model: OAuth2PasswordRequestForm = Depends()):
     },
     name = "회원탈퇴"
 )
-async def register_out(id: str, password: str):
+async def register_out(id: str, password: str, session: AsyncSession = Depends(get_session)):
     response_dict = {
         ResponseStatusCode.SUCCESS: "회원탈퇴에 성공하였습니다.",
         ResponseStatusCode.FAIL: "회원탈퇴에 실패하였습니다.",
+        ResponseStatusCode.NOT_FOUND: "사용자 정보를 찾을 수 없습니다.",
         ResponseStatusCode.TIME_OUT: "세션이 만료되었습니다.",
-        ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
+        ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다.",
+        ResponseStatusCode.SERVICE_UNAVAILABLE: "요청이 많아 처리하지 못했습니다. 잠시 후 다시 시도해 주세요."
     }
 
-    result = (ResponseStatusCode.FAIL, "User Not founded")
-    status_code, result = Account._load_user_info(DBObject.instance, id = id)
+    status_code, result = await Account._load_user_info(session, id = id)
     if status_code != ResponseStatusCode.SUCCESS:
-        return ResponseModel.show_json(status_code.value, message = response_dict[status_code], detail = detail.text)
+        return ResponseModel.show_json(status_code.value, message = response_dict[status_code], detail = result.text)
     
     user = result
-    if Account.login(DBObject.instance, id, password)[0] == ResponseStatusCode.SUCCESS:
-        result = user.register_out(DBObject.instance)
+    status_code, result = await Account.login(session, id, password)
+    if status_code == ResponseStatusCode.SUCCESS:
+        status_code, result = await user.register_out(session)
+
+    if status_code != ResponseStatusCode.SUCCESS:
+        return ResponseModel.show_json(status_code.value, message = response_dict[status_code], detail = result.text)
 
-    status_code, detail = result
-    return ResponseModel.show_json(status_code.value, message = response_dict[status_code], detail = detail)
+    return ResponseModel.show_json(status_code.value, message = response_dict[status_code])
 
 @account_router.post("/forgot/id", responses={
         200: {
@@ -209,14 +230,14 @@ async def register_out(id: str, password: str):
         }
     },
     name = "아이디 찾기")
-async def forgot_id(email: str):
+async def forgot_id(email: str, session: AsyncSession = Depends(get_session)):
     response_dict = {
         ResponseStatusCode.SUCCESS: "아이디를 성공적으로 찾았습니다!",
         ResponseStatusCode.FAIL: "아이디를 불러오는데 실패하였습니다.",
         ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부에러가 발생하였습니다."
     }
     
-    status_code, result = Account.forgot_id(DBObject.instance, email)
+    status_code, result = await Account.forgot_id(session, email)
     if status_code != ResponseStatusCode.SUCCESS:
         return ResponseModel.show_json(status_code.value, message = response_dict[status_code], detail = result.text)
     
@@ -247,14 +268,15 @@ async def forgot_id(email: str):
         }
     },
     name = "비밀번호 변경")
-async def forgot_password(model: ForgotPasswordModel):
+async def forgot_password(model: ForgotPasswordModel, session: AsyncSession = Depends(get_session)):
     response_dict = {
         ResponseStatusCode.SUCCESS: "성공적으로 정보를 변경하였습니다.",              
         ResponseStatusCode.FAIL: "정보 변경에 실패하였습니다.",
-        ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
+        ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다.",
+        ResponseStatusCode.SERVICE_UNAVAILABLE: "요청이 많아 처리하지 못했습니다. 잠시 후 다시 시도해 주세요."
     }
     
-    status_code, result = Account.forgot_password(DBObject.instance, model.user_id, model.password)
+    status_code, result = await Account.forgot_password(session, model.user_id, model.password)
     if status_code != ResponseStatusCode.SUCCESS:
         return ResponseModel.show_json(status_code.value, message = response_dict[status_code], detail = result.text)
     
@@ -296,7 +318,7 @@ async def forgot_password(model: ForgotPasswordModel):
     },
     name = "정보 중복 체크"
 )
-async def check_duplicate(parameter: str, data: str):
+async def check_duplicate(parameter: str, data: str, session: AsyncSession = Depends(get_session)):
     data_dict = {
         "id": "아이디",
         "nickname": "닉네임",
@@ -314,16 +336,16 @@ async def check_duplicate(parameter: str, data: str):
     }
     
     if parameter == "id":
-        status_code, result = Account.check_duplicate(DBObject.instance, id = data)
+        status_code, result = await Account.check_duplicate(session, id = data)
     
     elif parameter == "nickname":
-        status_code, result = Account.check_duplicate(DBObject.instance, nickname = data)
+        status_code, result = await Account.check_duplicate(session, nickname = data)
     
     elif parameter == "phone":
-        status_code, result = Account.check_duplicate(DBObject.instance, phone = data)
+        status_code, result = await Account.check_duplicate(session, phone = data)
         
     else:
-        status_code, result = Account.check_duplicate(DBObject.instance, email = data)
+        status_code, result = await Account.check_duplicate(session, email = data)
     
     if status_code != ResponseStatusCode.SUCCESS:
         return ResponseModel.show_json(status_code.value, message = response_dict[status_code], detail = result.text)
@@ -375,7 +397,7 @@ async def check_duplicate(parameter: str, data: str):
     },
     name="프로필 조회"
 )
-async def get_profile(access_token: str):
+async def get_profile(a_uuid: str = Depends(get_a_uuid), session: AsyncSession = Depends(get_session)):
     response_dict = {
         ResponseStatusCode.SUCCESS: "프로필을 성공적으로 조회하였습니다.",
         ResponseStatusCode.NOT_FOUND: "프로필 정보를 불러오는데 실패하였습니다.",
@@ -383,17 +405,14 @@ async def get_profile(access_token: str):
         ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
     
-    status_code, result = Account._decode_token_to_uuid(access_token)
+    status_code, result = await Account._load_user_info(session, a_uuid = a_uuid)
     if status_code == ResponseStatusCode.SUCCESS:
-        status_code, result = Account._load_user_info(DBObject.instance, a_uuid=result)
-        
         return ResponseModel.show_json(status_code.value, message = response_dict[status_code], account_info = result.info)
     
-    if status_code != ResponseStatusCode.SUCCESS:
-        return ResponseModel.show_json(status_code.value, message = response_dict[status_code], detail = result.text)
+    return ResponseModel.show_json(status_code.value, message = response_dict[status_code], detail = result.text)
         
 @account_router.get("/profile/image")
-async def get_profile_image(access_token: str):
+async def get_profile_image(request: Request, size: int | None = None, a_uuid: str = Depends(get_a_uuid), session: AsyncSession = Depends(get_session)):
     response_dict = {
         ResponseStatusCode.SUCCESS: "프로필을 성공적으로 조회하였습니다.",
         ResponseStatusCode.NOT_FOUND: "프로필 정보를 불러오는데 실패하였습니다.",
@@ -401,16 +420,19 @@ async def get_profile_image(access_token: str):
         ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
     
-    status_code, result = Account._decode_token_to_uuid(access_token)
+    status_code, result = await Account._load_user_info(session, a_uuid = a_uuid)
     if status_code == ResponseStatusCode.SUCCESS:
-        status_code, result = Account._load_user_info(DBObject.instance, a_uuid = result)
-        if status_code == ResponseStatusCode.SUCCESS:
-            return ResponseModel.show_image(os.path.join("images/profile", "default_user.png") if not result.profile else result.profile)
+        if not result.profile:
+            return await ResponseModel.show_image(os.path.join(PROFILE_DIR, "default_user.png"), request, cache_control="private, no-cache")
+
+        # 같은 주소가 프로필 변경 후 다른 파일을 가리킬 수 있으므로 매번 ETag로 재검증합니다.
+        variant_path, _ = await run_in_threadpool(resolve_variant, result.profile, size, request.headers.get("accept"))
+        return await ResponseModel.show_image(variant_path, request, cache_control="private, no-cache", vary="Accept")
     
     return ResponseModel.show_json(status_code.value, message = response_dict[status_code], detail = result.text)
 
 @account_router.post("/profile/image/update")
-async def update_profile_image(access_token: str, file: UploadFile = File(None)):
+async def update_profile_image(file: UploadFile = File(None), a_uuid: str = Depends(get_a_uuid), session: AsyncSession = Depends(get_session)):
     response_dict = {
         ResponseStatusCode.SUCCESS: "프로필을 성공적으로 업데이트 하였습니다.",
         ResponseStatusCode.FAIL: "ㅁㄴㅇ",
@@ -419,15 +441,22 @@ async def update_profile_image(access_token: str, file: UploadFile = File(None))
         ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
     
-    status_code, result = Account._decode_token_to_uuid(access_token)
+    status_code, result = await Account._load_user_info(session, a_uuid = a_uuid)
     if status_code == ResponseStatusCode.SUCCESS:
-        status_code, result = Account._load_user_info(DBObject.instance, a_uuid = result)
+        profile_path = None
+        if file:
+            try:
+                profile_path, _ = await save_upload(file, PROFILE_DIR)
+
+            except UploadError as e:
+                return ResponseModel.show_json(e.status_code.value, message = e.message, detail = e.detail)
+
+        status_code, result = await result.update_profile_image(session, profile_path)
         
         if status_code == ResponseStatusCode.SUCCESS:
-            status_code, result = result.update_profile_image(DBObject.instance, access_token, file)
-            
-            if status_code == ResponseStatusCode.SUCCESS:
-                return ResponseModel.show_json(status_code.value, message = response_dict[status_code])
+            if profile_path:
+                schedule_derivatives([profile_path])
+            return ResponseModel.show_json(status_code.value, message = response_dict[status_code])
             
     return ResponseModel.show_json(status_code.value, message = response_dict[status_code], detail = result.text)
     
\ No newline at end of file
@@ -0,0 +1,44 @@
+from models.response import ResponseStatusCode, ResponseModel
+from utility.slow_query import recent_slow_queries
+from utility.auth import require_admin
+from fastapi import APIRouter, Depends
+
+admin_router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)]
+)
+
+
+@admin_router.get("/slow-queries",
+    responses={
+        200: {
+            "description": "이 워커에서 최근에 기록된 느린 쿼리를 최신순으로 돌려줍니다. plan은 EXPLAIN을 실행한 기록에만 있습니다.",
+            "content": {
+                "application/json": {
+                    "example": {"status_code": 200, "message": "느린 쿼리를 조회했습니다.", "queries": [
+                        {
+                            "time": "2024-05-01T12:30:00.123",
+                            "elapsed_ms": 412.5,
+                            "caller": "Article.get_article_list",
+                            "statement": "SELECT article.art_uuid, ... FROM article LEFT OUTER JOIN account ON ... WHERE article.u_uuid = ANY ($1::UUID[]) ...",
+                            "parameters": ["<list:3>", 11],
+                            "plan": ["Limit  (cost=0.42..12.85 rows=11 width=412) (actual time=0.031..0.102 rows=11 loops=1)", "..."]
+                        }
+                    ]}
+                }
+            }
+        },
+        403: {
+            "description": "X-Admin-Token 헤더가 없거나 틀렸을 때, 또는 ADMIN_TOKEN이 설정되지 않았을 때 발생합니다.",
+            "content": {
+                "application/json": {
+                    "example": {"status_code": 403, "message": "접근 권한이 없습니다.", "detail": "admin token is missing or invalid"}
+                }
+            }
+        }
+    },
+    name = "느린 쿼리 조회"
+)
+async def slow_queries():
+    return ResponseModel.show_json(ResponseStatusCode.SUCCESS.value, message = "느린 쿼리를 조회했습니다.", queries = recent_slow_queries())
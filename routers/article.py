@@ -1,12 +1,18 @@
-from models.response import ResponseStatusCode, ResponseModel
-from database.conn import DBObject
+from models.response import ResponseStatusCode, ResponseModel, IMMUTABLE_CACHE, REVALIDATE_CACHE
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.conn import DBObject, get_session
+from utility.upload import UploadBudget, UploadError, save_upload, discard_uploads
+from utility.derivative import schedule_derivatives, resolve_variant
+from utility.image_meta import SIDECAR_SUFFIX
+from utility.auth import get_a_uuid, get_principal
+from utility.feed import FeedHub, event_stream
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from models.account import Principal
 from models.article import Article
-from models.account import Account
-from fastapi import APIRouter, File, UploadFile
+from fastapi import APIRouter, Depends, File, UploadFile, Request
 from typing import List
 import os
-import shutil
-import uuid
 
 article_router = APIRouter(
     prefix="/article",
@@ -55,13 +61,122 @@ if not os.path.exists(UPLOAD_DIR):
     },
     name = "게시물 조회"
 )
-async def get_articles(access_token :str, page: int = 1, u_uuid: str | None = None):
-    if page < 1:
-        return ResponseModel.show_json(ResponseStatusCode.ENTITY_ERROR.value, message = "엔티티 전달이 잘못되었습니다.", detail = "page parameter must be bigger than 0")
+async def get_articles(after: str | None = None, u_uuid: str | None = None, a_uuid: str = Depends(get_a_uuid), session: AsyncSession = Depends(get_session)):
+    status_code, result = await Article.get_article_list(session, a_uuid, after, u_uuid)
+    if status_code == ResponseStatusCode.SUCCESS:
+        return ResponseModel.show_json(ResponseStatusCode.SUCCESS.value, message = "글을 성공적으로 조회했습니다!", articles = result["articles"], next_cursor = result["next_cursor"])
+
+    elif status_code == ResponseStatusCode.ENTITY_ERROR:
+        return ResponseModel.show_json(status_code.value, message = "엔티티 전달이 잘못되었습니다.", detail = result.text)
+
+    else:
+        return ResponseModel.show_json(ResponseStatusCode.INTERNAL_SERVER_ERROR.value, message = "서버 내부 에러가 발생하였습니다", detail = result.text)
+
+@article_router.get("/search",
+    responses={
+        200: {
+            "description": "검색에 성공했을 때 발생합니다. mode는 전문 검색(fts) 또는 부분 문자열 검색(trgm) 중 실제로 사용된 방식이고, next_cursor를 after로 넘기면 다음 페이지를 조회합니다.",
+            "content": {
+                "application/json": {
+                    "example": {"status_code": 200, "message": "검색에 성공하였습니다!", "articles": [
+                        {
+                            "art_uuid": "7c2f6a59-0f9a-4a4f-8d55-2f1f0b7a3c11",
+                            "a_uuid": "Anonymous",
+                            "nickname": "유니",
+                            "title": "축제 일정 공유합니다",
+                            "content": "이번 주 금요일부터 학교 축제가 시작됩니다.",
+                            "upload_date": "2024-05-01 12:30:00",
+                            "is_anonymous": True,
+                            "u_uuid": "f50f071e-06e1-43f5-aae3-dfb8c23fb063",
+                            "images": [],
+                            "rank": 0.1
+                        }
+                    ], "next_cursor": "WyJmdHMiLCIwLjEiLCIyMDI0LTA1LTAxVDEyOjMwOjAwIiwiN2MyZjZhNTkiXQ", "mode": "fts"}
+                }
+            }
+        },
+        422: {
+            "description": "검색어 길이, u_uuid 형식, 커서 형식이 잘못되었을 때 발생합니다.",
+            "content": {
+                "application/json": {
+                    "example": {"status_code": 422, "message": "엔티티 전달이 잘못되었습니다.", "detail": "q length must be between 1 and 100"}
+                }
+            }
+        },
+        500: {
+            "description": "예상하지 못한 서버 에러가 발생하였을 때 발생합니다.",
+            "content": {
+                "application/json": {
+                    "example": {"status_code": 500, "message": "서버 내부 에러가 발생하였습니다", "detail": "Error occured."}
+                }
+            }
+        }
+    },
+    name = "게시물 검색"
+)
+async def search_articles(q: str, after: str | None = None, u_uuid: str | None = None, a_uuid: str = Depends(get_a_uuid), session: AsyncSession = Depends(get_session)):
+    status_code, result = await Article.search_articles(session, a_uuid, q, after, u_uuid)
+    if status_code == ResponseStatusCode.SUCCESS:
+        return ResponseModel.show_json(ResponseStatusCode.SUCCESS.value, message = "검색에 성공하였습니다!", articles = result["articles"], next_cursor = result["next_cursor"], mode = result["mode"])
+
+    elif status_code == ResponseStatusCode.ENTITY_ERROR:
+        return ResponseModel.show_json(status_code.value, message = "엔티티 전달이 잘못되었습니다.", detail = result.text)
+
+    else:
+        return ResponseModel.show_json(ResponseStatusCode.INTERNAL_SERVER_ERROR.value, message = "서버 내부 에러가 발생하였습니다", detail = result.text)
+
+@article_router.get("/stream",
+    responses={
+        200: {
+            "description": "팔로우한 대학교(또는 u_uuid로 지정한 대학교)에 새 게시물이 올라오면 바로 보내 주는 Server-Sent Events 스트림입니다. "
+                           "article 이벤트의 id는 art_uuid이고, 다시 연결할 때 Last-Event-ID 헤더로 보내면 그 이후 게시물부터 받습니다. "
+                           "lagged 이벤트를 받으면 놓친 게시물이 있으므로 GET /article 로 다시 불러옵니다.",
+            "content": {
+                "text/event-stream": {
+                    "example": "retry: 3000\n\nid: 7c2f6a59-0f9a-4a4f-8d55-2f1f0b7a3c11\nevent: article\ndata: {\"art_uuid\": \"7c2f6a59-0f9a-4a4f-8d55-2f1f0b7a3c11\", \"a_uuid\": \"Anonymous\", \"nickname\": \"유니\", \"title\": \"축제 일정 공유합니다\", \"content\": \"이번 주 금요일부터 학교 축제가 시작됩니다.\", \"upload_date\": \"2024-05-01 12:30:00\", \"is_anonymous\": true, \"u_uuid\": \"f50f071e-06e1-43f5-aae3-dfb8c23fb063\", \"images\": [], \"truncated\": false}\n\n: ping\n\n"
+                }
+            }
+        },
+        422: {
+            "description": "u_uuid 또는 Last-Event-ID 형식이 잘못되었을 때 발생합니다.",
+            "content": {
+                "application/json": {
+                    "example": {"status_code": 422, "message": "엔티티 전달이 잘못되었습니다.", "detail": "u_uuid 1234 is not match format"}
+                }
+            }
+        },
+        500: {
+            "description": "예상하지 못한 서버 에러가 발생하였을 때 발생합니다.",
+            "content": {
+                "application/json": {
+                    "example": {"status_code": 500, "message": "서버 내부 에러가 발생하였습니다", "detail": "Error occured."}
+                }
+            }
+        }
+    },
+    name = "실시간 게시물 스트림"
+)
+async def stream_articles(request: Request, u_uuid: str | None = None, a_uuid: str = Depends(get_a_uuid)):
+    # 스트림은 오래 열려 있으므로 get_session 의존성 대신 구독 범위를 구하는 동안만 커넥션을 빌립니다.
+    async with DBObject.instance.session_factory() as session:
+        status_code, result = await Article._resolve_scope(session, a_uuid, u_uuid)
+        if status_code == ResponseStatusCode.SUCCESS:
+            followed = result
+            # 구독을 먼저 하고 놓친 게시물을 조회해야 그 사이에 올라온 게시물이 빠지지 않습니다.
+            subscription = FeedHub.subscribe(followed)
+            result = []
+            last_event_id = request.headers.get("last-event-id")
+            if last_event_id and followed:
+                status_code, result = await Article.get_articles_since(session, followed, last_event_id)
+                if status_code != ResponseStatusCode.SUCCESS:
+                    FeedHub.unsubscribe(subscription)
 
-    status_code, result = Article.get_article_list(DBObject.instance, access_token, (page - 1) * 10, u_uuid)
     if status_code == ResponseStatusCode.SUCCESS:
-        return ResponseModel.show_json(ResponseStatusCode.SUCCESS.value, message = "글을 성공적으로 조회했습니다!", articles = result)
+        return StreamingResponse(event_stream(subscription, result), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    elif status_code == ResponseStatusCode.ENTITY_ERROR:
+        return ResponseModel.show_json(status_code.value, message = "엔티티 전달이 잘못되었습니다.", detail = result.text)
 
     else:
         return ResponseModel.show_json(ResponseStatusCode.INTERNAL_SERVER_ERROR.value, message = "서버 내부 에러가 발생하였습니다", detail = result.text)
@@ -103,7 +218,7 @@ async def get_articles(access_token :str, page: int = 1, u_uuid: str | None = No
     },
     name = "게시물 작성"
 )
-async def posting_article(access_token: str, title: str, content: str, is_anonymous: bool, images_files: List[UploadFile] | None = File(None)):
+async def posting_article(title: str, content: str, is_anonymous: bool, images_files: List[UploadFile] | None = File(None), principal: Principal = Depends(get_principal), session: AsyncSession = Depends(get_session)):
     response_dict = {
         ResponseStatusCode.SUCCESS: "성공적으로 게시물을 적었습니다.",              
         ResponseStatusCode.FAIL: "게시물 작성에 실패하였습니다.",
@@ -111,30 +226,30 @@ async def posting_article(access_token: str, title: str, content: str, is_anonym
         ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
        
-    image_urls = []
+    image_urls, image_types = [], []
     if images_files:
         if len(images_files) > 9:
             return ResponseModel.show_json(ResponseStatusCode.ENTITY_ERROR.value, message="이미지는 최대 9개까지 업로드 가능합니다.", detail="Too many files.")
         
-        for file in images_files:
-            file_ext = file.filename.split(".")[-1].lower()
-            if file_ext not in ["jpeg", "jpg", "png", "gif"]:
-                return ResponseModel.show_json(ResponseStatusCode.ENTITY_ERROR.value, message="지원하지 않는 파일 형식입니다.", detail="Unsupported file type.")
-            
-            file_name = f"{uuid.uuid4()}.{file_ext}"
-            file_path = os.path.join(UPLOAD_DIR, file_name)
-
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+        budget = UploadBudget()
+        try:
+            for file in images_files:
+                file_path, image_type = await save_upload(file, UPLOAD_DIR, budget)
+                image_urls.append(file_path)
+                image_types.append(image_type)
 
-            image_urls.append(file_path)
+        except UploadError as e:
+            discard_uploads(image_urls)
+            return ResponseModel.show_json(e.status_code.value, message=e.message, detail=e.detail)
 
 
-    status_code, result = Article.insert_article(DBObject.instance, access_token, title, content, is_anonymous,image_urls=image_urls)
+    status_code, result = await Article.insert_article(session, principal, title, content, is_anonymous,image_urls=image_urls, image_types=image_types)
 
     if status_code != ResponseStatusCode.SUCCESS:
+        discard_uploads(image_urls)
         return ResponseModel.show_json(status_code.value, message= response_dict[status_code], Detail= result.text)
         
+    schedule_derivatives(image_urls)
     return ResponseModel.show_json(status_code.value, message = response_dict[status_code])
 
 @article_router.delete("/delete",
@@ -174,7 +289,7 @@ async def posting_article(access_token: str, title: str, content: str, is_anonym
     },
     name = "게시물 삭제"
 )
-async def delete_article(art_uuid: str, access_token: str):
+async def delete_article(art_uuid: str, a_uuid: str = Depends(get_a_uuid), session: AsyncSession = Depends(get_session)):
     response_dict = {
         ResponseStatusCode.SUCCESS: "게시글이 성공적으로 삭제되었습니다.",
         ResponseStatusCode.FAIL: "게시글을 삭제할 권한이 없습니다.",
@@ -182,9 +297,7 @@ async def delete_article(art_uuid: str, access_token: str):
         ResponseStatusCode.ENTITY_ERROR: "엔티티 형식이 잘못되었습니다.",
         ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 오류가 발생하였습니다.",
     }
-    status_code, result = Account._decode_token_to_uuid(access_token)
-    if status_code == ResponseStatusCode.SUCCESS:
-        status_code, result = Article.delete_article(DBObject.instance, art_uuid, result)
+    status_code, result = await Article.delete_article(session, art_uuid, a_uuid)
     
     if status_code != ResponseStatusCode.SUCCESS:
         return ResponseModel.show_json(status_code.value, message= response_dict[status_code], Detail= result.text)
@@ -229,7 +342,7 @@ async def delete_article(art_uuid: str, access_token: str):
     },
     name = "게시물 수정"
 )
-async def update_article(art_uuid: str ,access_token: str,  title: str, content: str, is_anonymous: bool):
+async def update_article(art_uuid: str, title: str, content: str, is_anonymous: bool, a_uuid: str = Depends(get_a_uuid), session: AsyncSession = Depends(get_session)):
     response_dict = {
         ResponseStatusCode.SUCCESS: "게시글이 성공적으로 수정되었습니다.",
         ResponseStatusCode.FAIL: "게시글을 수정할 권한이 없습니다.",
@@ -238,17 +351,35 @@ async def update_article(art_uuid: str ,access_token: str,  title: str, content:
         ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 오류가 발생하였습니다.",
     }
     
-    status_code, result = Article.update_article(DBObject.instance, art_uuid, access_token, title = title, content = content, is_anonymous = is_anonymous)
+    status_code, result = await Article.update_article(session, art_uuid, a_uuid, title = title, content = content, is_anonymous = is_anonymous)
     
     if status_code != ResponseStatusCode.SUCCESS:
         return ResponseModel.show_json(status_code.value, message= response_dict[status_code], Detail= result.text)
         
     return ResponseModel.show_json(status_code.value, message = response_dict[status_code])
 
+def _locate_image(image_path: str, size: int | None, accept: str | None):
+    """ 업로드 폴더 안의 이미지면 보낼 variant 경로와 원본으로 대신했는지 여부를 돌려주고, 아니면 None 을 돌려줍니다.
+        파일 시스템을 여러 번 확인하므로 스레드 풀에서 호출합니다.
+
+    """
+    # 업로드 폴더 밖의 파일과 해시 사이드카는 내보내지 않습니다.
+    upload_root = os.path.realpath(UPLOAD_DIR) + os.sep
+    if image_path.endswith(SIDECAR_SUFFIX) or not (os.path.realpath(image_path).startswith(upload_root) and os.path.isfile(image_path)):
+        return None
+
+    return resolve_variant(image_path, size, accept)
+
+
 @article_router.get("/image")
-async def get_image(image_path: str):
-    if os.path.exists(image_path):
-        return ResponseModel.show_image(image_path)
+async def get_image(request: Request, image_path: str, size: int | None = None):
+    located = await run_in_threadpool(_locate_image, image_path, size, request.headers.get("accept"))
+    if located is not None:
+        # 게시글 이미지와 variant는 uuid 이름으로 한 번만 쓰이므로 브라우저가 재검증 없이 캐시해도 됩니다.
+        # 다만 variant가 아직 없어서 원본을 대신 보낼 때는 같은 주소가 나중에 variant로 바뀌므로 매번 재검증하게 합니다.
+        variant_path, fell_back = located
+        cache_control = REVALIDATE_CACHE if fell_back else IMMUTABLE_CACHE
+        return await ResponseModel.show_image(variant_path, request, cache_control=cache_control, vary="Accept")
     
     else:
         return ResponseModel.show_json(status_code = ResponseStatusCode.NOT_FOUND.value, message = "이미지를 찾을 수 없습니다.")
\ No newline at end of file
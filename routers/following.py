@@ -1,8 +1,10 @@
 from models.response import ResponseStatusCode, ResponseModel
-from models.following import Following
-from models.account import Account
-from database.conn import DBObject
-from fastapi import APIRouter
+from utility.auth import get_a_uuid, get_principal
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.following import Following, FollowBatchModel
+from models.account import Principal
+from database.conn import get_session
+from fastapi import APIRouter, Depends
 
 following_router = APIRouter(
     prefix="/account",
@@ -10,49 +12,62 @@ following_router = APIRouter(
 )
 
 @following_router.post("/follow")
-async def follow(access_token: str, u_uuid: str):
+async def follow(u_uuid: str, principal: Principal = Depends(get_principal), session: AsyncSession = Depends(get_session)):
     response_dict = {
         ResponseStatusCode.SUCCESS: "팔로우에 성공하였습니다!",
+        ResponseStatusCode.NOT_FOUND: "등록되지 않은 대학교입니다.",
         ResponseStatusCode.ENTITY_ERROR: "토큰 형식이 잘못되었습니다.",
         ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
     
-    status_code, result = Account._decode_token_to_uuid(access_token)
+    status_code, result = await Following.follow(session, a_uuid = principal.a_uuid, u_uuid = u_uuid)
     if status_code == ResponseStatusCode.SUCCESS:
-        status_code, result = Following.follow(DBObject.instance, a_uuid = result, u_uuid = u_uuid)
-        if status_code == ResponseStatusCode.SUCCESS:
-            return ResponseModel.show_json(status_code. value, message = response_dict[status_code])
+        # changed 가 False 면 이미 팔로우하고 있던 대학교입니다.
+        return ResponseModel.show_json(status_code. value, message = response_dict[status_code], changed = result)
     
     return ResponseModel.show_json(status_code.value, message = response_dict[status_code], detail = result.text)
 
 @following_router.post("/unfollow")
-async def unfollow(access_token: str, u_uuid: str):
+async def unfollow(u_uuid: str, principal: Principal = Depends(get_principal), session: AsyncSession = Depends(get_session)):
     response_dict = {
-        ResponseStatusCode.SUCCESS: "팔로우에 성공하였습니다!",
+        ResponseStatusCode.SUCCESS: "팔로우 취소에 성공하였습니다!",
+        ResponseStatusCode.NOT_FOUND: "등록되지 않은 대학교입니다.",
         ResponseStatusCode.ENTITY_ERROR: "토큰 형식이 잘못되었습니다.",
         ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
     
-    status_code, result = Account._decode_token_to_uuid(access_token)
+    status_code, result = await Following.unfollow(session, principal.a_uuid, u_uuid)
     if status_code == ResponseStatusCode.SUCCESS:
-        status_code, result = Following.unfollow(DBObject.instance, result, u_uuid)
-        if status_code == ResponseStatusCode.SUCCESS:
-            return ResponseModel.show_json(status_code. value, message = response_dict[status_code])
+        # changed 가 False 면 팔로우하고 있지 않던 대학교입니다.
+        return ResponseModel.show_json(status_code. value, message = response_dict[status_code], changed = result)
     
     return ResponseModel.show_json(status_code.value, message = response_dict[status_code], detail = result.text)
 
+@following_router.post("/follow/batch")
+async def follow_batch(batch_model: FollowBatchModel, principal: Principal = Depends(get_principal), session: AsyncSession = Depends(get_session)):
+    response_dict = {
+        ResponseStatusCode.SUCCESS: "팔로우 변경에 성공하였습니다!",
+        ResponseStatusCode.ENTITY_ERROR: "입력 형식이 잘못되었습니다.",
+        ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
+    }
+
+    # 항목 하나가 잘못되어도 나머지는 반영하고, 항목 별 결과는 results 에 담습니다.
+    status_code, result = await Following.apply_batch(session, principal.a_uuid, batch_model.follow, batch_model.unfollow)
+    if status_code == ResponseStatusCode.SUCCESS:
+        return ResponseModel.show_json(status_code.value, message = response_dict[status_code], results = result)
+
+    return ResponseModel.show_json(status_code.value, message = response_dict[status_code], detail = result.text)
+
 @following_router.get("/follow/list")
-async def follow_list(access_token: str):
+async def follow_list(a_uuid: str = Depends(get_a_uuid), session: AsyncSession = Depends(get_session)):
     response_dict = {
         ResponseStatusCode.SUCCESS: "성공적으로 조회하였습니다.",
         ResponseStatusCode.ENTITY_ERROR: "토큰 형식이 잘못되었습니다.",
         ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
     
-    status_code, result = Account._decode_token_to_uuid(access_token)
+    status_code, result = await Following.get_follow_univ_list(session, a_uuid)
     if status_code == ResponseStatusCode.SUCCESS:
-        status_code, result = Following.get_follow_univ_list(DBObject.instance, result)
-        if status_code == ResponseStatusCode.SUCCESS:
-            return ResponseModel.show_json(status_code. value, message = response_dict[status_code], univ_list = result)
+        return ResponseModel.show_json(status_code. value, message = response_dict[status_code], univ_list = result)
     
     return ResponseModel.show_json(status_code.value, message = response_dict[status_code], detail = result.text)
\ No newline at end of file
@@ -0,0 +1,15 @@
+from utility.metrics import render_metrics
+from fastapi.responses import PlainTextResponse
+from fastapi import APIRouter
+
+metrics_router = APIRouter(
+    tags=["metrics"]
+)
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """ 이 워커의 라우트 별 지연 시간, 상태 코드, 쿼리 수, DB 시간을 Prometheus 텍스트 형식으로 돌려줍니다.
+
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
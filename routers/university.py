@@ -1,7 +1,10 @@
 from models.response import ResponseStatusCode, ResponseModel, Detail
 from models.university import University
-from database.conn import DBObject
-from fastapi import APIRouter
+from models.logo_store import LogoStore, LogoSpriteModel
+from models.university_stat import UniversityStat
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.conn import get_session
+from fastapi import APIRouter, Depends, Request
 
 univ_router = APIRouter(
     prefix="/univ",
@@ -63,18 +66,68 @@ univ_router = APIRouter(
 }, 
 name="대학교 이름 조회",
 description = "데이터베이스 내부에 존재하는 모든 대학교의 이름, uuid를 조회합니다.")
-async def get_all_univ_list():
+async def get_all_univ_list(session: AsyncSession = Depends(get_session)):
     message_dict = {
         ResponseStatusCode.SUCCESS: "데이터를 불러오는데 성공하였습니다.",
         ResponseStatusCode.NOT_FOUND: "데이터를 불러오는데 실패하였습니다.",
         ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
 
-    status_code, result = University.get_univ_name_list(DBObject.instance)
+    status_code, result = await University.get_univ_name_list(session)
     if isinstance(result, Detail):
         return ResponseModel.show_json(status_code=status_code.value, message = message_dict[status_code], detail = result.text)
         
-    return ResponseModel.show_json(status_code = status_code.value, message = message_dict[status_code], univ_list = result)
+    return ResponseModel.show_raw_json(status_code.value, {"univ_list": result}, message = message_dict[status_code])
+
+@univ_router.get("/ranking", responses={
+    200: {
+        "description": "hot은 최근 게시물일수록 크게 반영한 게시물 수(반감기 24시간)입니다. order=count 면 전체 게시물 수 순으로 정렬합니다.",
+        "content": {
+            "application/json": {
+                "example": {"status_code": 200, "message": "데이터를 불러오는데 성공하였습니다.", "ranking": [
+                    {
+                        "rank": 1,
+                        "u_uuid": "f50f071e-06e1-43f5-aae3-dfb8c23fb063",
+                        "univ_name": "배재대학교(대전광역시)",
+                        "article_count": 152,
+                        "last_post_date": "2024-05-01 12:30:00",
+                        "hot": 7.412
+                    }
+                ]}
+            }
+        }
+    },
+    422: {
+        "description": "order, limit 값이 허용 범위를 벗어났을 때 발생합니다.",
+        "content": {
+            "application/json": {
+                "example": {"status_code": 422, "message": "입력 형식이 잘못되었습니다.", "detail": "order must be one of ('hot', 'count')"}
+            }
+        }
+    },
+    500: {
+        "description": "예상하지 못한 서버 에러가 발생하였을 때 발생합니다.",
+        "content": {
+            "application/json": {
+                "example": {"status_code": 500, "message": "서버 내부 에러가 발생하였습니다.", "detail": "Error occured"}
+            }
+        }
+    }
+},
+name="대학교 활동 랭킹 조회",
+description="대학교 별로 미리 집계해 둔 게시물 수, 마지막 게시 시각, hot 점수로 상위 limit개 대학교를 조회합니다.")
+async def get_univ_ranking(limit: int = 10, order: str = "hot", session: AsyncSession = Depends(get_session)):
+    message_dict = {
+        ResponseStatusCode.SUCCESS: "데이터를 불러오는데 성공하였습니다.",
+        ResponseStatusCode.ENTITY_ERROR: "입력 형식이 잘못되었습니다.",
+        ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
+    }
+
+    status_code, result = await UniversityStat.get_ranking(session, limit, order)
+    if isinstance(result, Detail):
+        return ResponseModel.show_json(status_code = status_code.value, message = message_dict[status_code], detail = result.text)
+
+    return ResponseModel.show_json(status_code = status_code.value, message = message_dict[status_code], ranking = result)
 
 @univ_router.get("/desc/{u_uuid}", responses={
     200: {
@@ -120,7 +173,7 @@ async def get_all_univ_list():
 },
 name="대학교 정보 자세히 조회",
 description="데이터베이스에서 입력받은 u_uuid 값을 가지고 있는 university 튜플을 조회합니다.")
-async def get_univ_desc(u_uuid: str):
+async def get_univ_desc(u_uuid: str, session: AsyncSession = Depends(get_session)):
     message_dict = {
         ResponseStatusCode.SUCCESS: "데이터를 불러오는데 성공하였습니다.",
         ResponseStatusCode.NOT_FOUND: "데이터를 찾는데 실패하였습니다.",
@@ -128,7 +181,7 @@ async def get_univ_desc(u_uuid: str):
         ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
 
-    status_code, result = University.get_univ_from_uuid(DBObject.instance, u_uuid)
+    status_code, result = await University.get_univ_from_uuid(session, u_uuid)
     if isinstance(result, Detail):
         return ResponseModel.show_json(status_code = status_code.value, message = message_dict[status_code], detail = result.text)
     
@@ -165,8 +218,8 @@ async def get_univ_desc(u_uuid: str):
     }
 }, 
 name="대학교 로고 불러오기",
-description="데이터베이스에서 입력받은 u_uuid 값을 가지고 있는 university logo 조회합니다.")
-async def get_univ_logo(u_uuid):
+description="메모리에 올려 둔 로고 저장소에서 입력받은 u_uuid 값을 가지고 있는 university logo 조회합니다.")
+async def get_univ_logo(request: Request, u_uuid, session: AsyncSession = Depends(get_session)):
     message_dict = {
         ResponseStatusCode.SUCCESS: "데이터를 불러오는데 성공하였습니다.",
         ResponseStatusCode.NOT_FOUND: "데이터를 찾는데 실패하였습니다.",
@@ -174,13 +227,67 @@ async def get_univ_logo(u_uuid):
         ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
     
-    status_code, result = University.get_univ_from_uuid(DBObject.instance, u_uuid)
+    status_code, result = await LogoStore.get_logo(session, u_uuid)
     if status_code != ResponseStatusCode.SUCCESS:
         return ResponseModel.show_json(status_code = status_code.value, message = message_dict[status_code], detail = result.text)
-    
-    university = result
-    status_code, logo_path = university.get_logo_path()
-    if status_code != ResponseStatusCode.SUCCESS:
+
+    return ResponseModel.show_image_bytes(result.data, result.meta, request, cache_control="public, max-age=86400")
+
+@univ_router.post("/logo/sprite", responses = {
+    200: {
+        "description": "요청한 로고를 한 장의 PNG(data URI)로 묶고, u_uuid 별 좌표를 함께 돌려줍니다. 로고가 없는 u_uuid는 missing에 담깁니다.",
+        "content": {
+            "application/json": {
+                "example": {"status_code": 200, "message": "데이터를 불러오는데 성공하였습니다.", "sprite": {
+                    "image": "data:image/png;base64,iVBORw0KGgo...",
+                    "width": 128,
+                    "height": 64,
+                    "coords": {
+                        "066ce1a1-4153-4b3e-9a3a-04b92a877fc1": {"x": 0, "y": 0, "w": 64, "h": 64},
+                        "ff934e6f-294b-472a-8e64-6e1c3b012a1b": {"x": 64, "y": 0, "w": 64, "h": 64}
+                    }
+                }, "missing": ["0939c83e-b5e7-4fd1-b3b1-0babe272ebbb"]}
+            }
+        }
+    },
+    404: {
+        "description": "요청한 u_uuid 중 로고가 있는 대학교가 하나도 없을 때 발생합니다.",
+        "content": {
+            "application/json": {
+                "example": {"status_code": 404, "message": "데이터를 찾는데 실패하였습니다.", "detail": "No logos found for requested u_uuids"}
+            }
+        }
+    },
+    422: {
+        "description": "size, format이 허용된 값이 아니거나 u_uuids 개수가 범위를 벗어났을 때 발생합니다.",
+        "content": {
+            "application/json": {
+                "example": {"status_code": 422, "message": "입력 형식이 잘못되었습니다.", "detail": "size must be one of (32, 64, 128, 200)"}
+            }
+        }
+    },
+    500: {
+        "description": "예상하지 못한 서버 에러가 발생하였을 때 발생합니다.",
+        "content": {
+            "application/json": {
+                "example": {"status_code": 500, "message": "서버 내부 에러가 발생하였습니다.", "detail": "Error occured"}
+            }
+        }
+    }
+},
+name="대학교 로고 스프라이트 불러오기",
+description="여러 대학교의 로고를 한 번의 요청으로 받을 수 있도록 스프라이트 이미지와 좌표표로 묶어서 조회합니다. format은 png, webp 중 하나입니다.")
+async def get_univ_logo_sprite(sprite_model: LogoSpriteModel, session: AsyncSession = Depends(get_session)):
+    message_dict = {
+        ResponseStatusCode.SUCCESS: "데이터를 불러오는데 성공하였습니다.",
+        ResponseStatusCode.NOT_FOUND: "데이터를 찾는데 실패하였습니다.",
+        ResponseStatusCode.ENTITY_ERROR: "입력 형식이 잘못되었습니다.",
+        ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
+    }
+
+    status_code, result = await LogoStore.get_sprite(session, sprite_model.u_uuids, sprite_model.size, sprite_model.format)
+    if isinstance(result, Detail):
         return ResponseModel.show_json(status_code = status_code.value, message = message_dict[status_code], detail = result.text)
-        
-    return ResponseModel.show_image(logo_path)
\ No newline at end of file
+
+    sprite, missing = result
+    return ResponseModel.show_json(status_code = status_code.value, message = message_dict[status_code], sprite = sprite, missing = missing)
\ No newline at end of file
@@ -0,0 +1,10 @@
+""" 테스트도 서버와 같은 설정(user_info.txt, env/)으로 실행합니다. models 를 불러오면 DBObject 가 엔진을 만들지만 접속은 하지 않습니다.
+
+    user_info.txt 가 있는 디렉터리에서 python -m pytest /path/to/tests
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
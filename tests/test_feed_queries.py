@@ -0,0 +1,108 @@
+""" 피드 조회가 게시물 수와 상관없이 정해진 개수의 SQL 문만 실행하는지 확인합니다. (작성자 닉네임을 게시물마다 따로 조회하지 않음)
+
+    세션은 실행된 문장을 기록하고 준비한 결과를 돌려주는 가짜 세션이라 PostgreSQL 이 필요 없습니다.
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta
+import asyncio
+import uuid
+
+from sqlalchemy.dialects import postgresql
+
+from models.article import Article, FEED_COLUMNS, FEED_PAGE_SIZE
+from models.following import _follow_cache
+from models.response import ResponseStatusCode
+from utility.cursor import encode_cursor
+
+FeedRow = namedtuple("FeedRow", [column.key for column in FEED_COLUMNS] + ["nickname"])
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class RecordingSession:
+    """ execute() 로 실행된 문장을 순서대로 기록하고, 준비한 결과를 하나씩 돌려줍니다.
+
+    """
+    def __init__(self, *results):
+        self.statements = []
+        self._results = list(results)
+
+    async def execute(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        return FakeResult(self._results.pop(0))
+
+
+def feed_rows(count: int, u_uuid: uuid.UUID):
+    now = datetime.now()
+    return [FeedRow(art_uuid=uuid.uuid4(), a_uuid=uuid.uuid4(), u_uuid=u_uuid, title=f"title {i}", content="content",
+                    upload_date=now - timedelta(minutes=i), is_anonymous=False, image_urls=[], nickname=f"user{i}")
+            for i in range(count)]
+
+
+def setup_function():
+    _follow_cache.clear()
+
+
+def test_feed_cold_cache_runs_follow_query_and_one_joined_feed_query():
+    a_uuid, u_uuid = str(uuid.uuid4()), uuid.uuid4()
+    session = RecordingSession([(u_uuid,)], feed_rows(FEED_PAGE_SIZE + 1, u_uuid))
+
+    status_code, result = asyncio.run(Article.get_article_list(session, a_uuid))
+
+    assert status_code == ResponseStatusCode.SUCCESS
+    assert len(result["articles"]) == FEED_PAGE_SIZE
+    assert result["next_cursor"] is not None
+    assert len(session.statements) == 2
+    assert "JOIN account" in str(session.statements[1])
+
+
+def test_feed_warm_cache_runs_single_query():
+    a_uuid, u_uuid = str(uuid.uuid4()), uuid.uuid4()
+    asyncio.run(Article.get_article_list(RecordingSession([(u_uuid,)], feed_rows(3, u_uuid)), a_uuid))
+
+    session = RecordingSession(feed_rows(FEED_PAGE_SIZE, u_uuid))
+    status_code, result = asyncio.run(Article.get_article_list(session, a_uuid))
+
+    assert status_code == ResponseStatusCode.SUCCESS
+    assert [article["nickname"] for article in result["articles"]] == [f"user{i}" for i in range(FEED_PAGE_SIZE)]
+    assert len(session.statements) == 1
+
+
+def test_feed_for_given_university_skips_follow_query():
+    u_uuid = uuid.uuid4()
+    session = RecordingSession(feed_rows(FEED_PAGE_SIZE, u_uuid))
+
+    status_code, result = asyncio.run(Article.get_article_list(session, str(uuid.uuid4()), u_uuid=str(u_uuid)))
+
+    assert status_code == ResponseStatusCode.SUCCESS
+    assert len(result["articles"]) == FEED_PAGE_SIZE
+    assert len(session.statements) == 1
+
+
+def test_feed_without_follows_runs_no_feed_query():
+    session = RecordingSession([])
+
+    status_code, result = asyncio.run(Article.get_article_list(session, str(uuid.uuid4())))
+
+    assert status_code == ResponseStatusCode.SUCCESS
+    assert result == {"articles": [], "next_cursor": None}
+    assert len(session.statements) == 1
+
+
+def test_feed_reads_each_university_from_its_index_range():
+    u_uuid = uuid.uuid4()
+    session = RecordingSession(feed_rows(FEED_PAGE_SIZE, u_uuid))
+    after = encode_cursor(datetime.now().isoformat(), uuid.uuid4())
+
+    asyncio.run(Article.get_article_list(session, str(uuid.uuid4()), after=after, u_uuid=str(u_uuid)))
+
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+    assert "JOIN LATERAL" in sql
+    assert "(article.upload_date, article.art_uuid) <" in sql
+    assert "ORDER BY article.upload_date DESC, article.art_uuid DESC" in sql
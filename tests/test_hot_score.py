@@ -0,0 +1,64 @@
+""" hot_score 를 갱신하는 SQL 식이 게시물 시각이 몇 년씩 떨어져 있어도 PostgreSQL exp() underflow 에러를 내지 않는지 확인합니다.
+
+    SQLAlchemy 식 트리를 PostgreSQL float8 규칙(exp 인자가 -708 보다 작으면 에러)으로 직접 계산하므로 PostgreSQL 이 필요 없습니다.
+"""
+from datetime import datetime, timedelta
+import operator
+import math
+
+import pytest
+from sqlalchemy import literal
+from sqlalchemy.sql.elements import BindParameter, BinaryExpression, UnaryExpression, Grouping
+from sqlalchemy.sql.functions import FunctionElement
+
+from models.university_stat import hot_exponent, _hot_score_add, _hot_score_remove
+
+PG_EXP_MIN = -708.4
+
+
+def pg_exp(x: float) -> float:
+    if x < PG_EXP_MIN:
+        raise ArithmeticError("value out of range: underflow")
+
+    return math.exp(x)
+
+
+FUNCTIONS = {"greatest": max, "ln": math.log, "abs": abs, "exp": pg_exp}
+OPERATORS = {operator.add: operator.add, operator.sub: operator.sub, operator.mul: operator.mul, operator.neg: operator.neg}
+
+
+def evaluate(expr) -> float:
+    if isinstance(expr, BindParameter):
+        return expr.value
+
+    if isinstance(expr, Grouping):
+        return evaluate(expr.element)
+
+    if isinstance(expr, FunctionElement):
+        return FUNCTIONS[expr.name.lower()](*(evaluate(arg) for arg in expr.clauses))
+
+    if isinstance(expr, BinaryExpression):
+        return OPERATORS[expr.operator](evaluate(expr.left), evaluate(expr.right))
+
+    if isinstance(expr, UnaryExpression):
+        return OPERATORS[expr.operator](evaluate(expr.element))
+
+    raise TypeError(type(expr))
+
+
+NOW = datetime(2024, 5, 1, 12, 0)
+
+
+@pytest.mark.parametrize("years", [0, 1, 3, 10])
+def test_insert_after_long_quiet_period(years):
+    old, new = hot_exponent(NOW - timedelta(days=365 * years)), hot_exponent(NOW)
+    score = evaluate(_hot_score_add(literal(old), literal(new)))
+    assert score == pytest.approx(max(old, new) + math.log1p(math.exp(-abs(old - new))))
+
+
+@pytest.mark.parametrize("years", [0, 1, 3, 10])
+def test_delete_much_older_article(years):
+    old, new = hot_exponent(NOW - timedelta(days=365 * years)), hot_exponent(NOW)
+    total = max(old, new) + math.log1p(math.exp(-abs(old - new)))
+    score = evaluate(_hot_score_remove(literal(total), literal(old)))
+    assert score == pytest.approx(new)
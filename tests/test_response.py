@@ -0,0 +1,15 @@
+""" show_json() 은 None 인 값만 빼고 False, 0, 빈 목록은 그대로 내보내야 합니다. (팔로우 응답의 changed 가 false 일 때)
+"""
+import orjson
+
+from models.response import ResponseModel
+
+
+def test_show_json_keeps_falsy_values():
+    response = ResponseModel.show_json(200, message="ok", changed=False, count=0, items=[], detail=None)
+    assert orjson.loads(response.body) == {"status_code": 200, "message": "ok", "changed": False, "count": 0, "items": []}
+
+
+def test_show_raw_json_keeps_falsy_values():
+    response = ResponseModel.show_raw_json(200, {"univ_list": b"[]"}, changed=False, detail=None)
+    assert orjson.loads(response.body) == {"status_code": 200, "changed": False, "univ_list": []}
@@ -0,0 +1,60 @@
+""" 새 프로세스에서 `import main` 과 lifespan 시작(카탈로그, 로고 적재, 피드 LISTEN)에 걸리는 시간이 예산 안인지 확인합니다.
+
+    예산은 benchmark.startup 과 같습니다. import 는 항상 재고, lifespan 은 user_info.txt 의 DB에 접속할 수 있을 때만 잽니다.
+"""
+import subprocess
+import json
+import sys
+import os
+
+import pytest
+
+from benchmark.startup import IMPORT_BUDGET_MS, STARTUP_BUDGET_MS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# DB에 접속할 수 있는지 먼저 보고, 그 커넥션은 버려서 lifespan 이 빈 풀에서 시작하게 합니다.
+STARTUP_PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter() - started
+
+async def lifespan():
+    from database.conn import DBObject
+    try:
+        async with DBObject.instance.engine.connect():
+            pass
+
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+    await DBObject.instance.engine.dispose()
+    started = time.perf_counter()
+    async with main.lifespan(main.app):
+        elapsed = time.perf_counter() - started
+
+    return elapsed, None
+
+lifespan_s, error = asyncio.run(lifespan())
+print(json.dumps({"import_s": imported, "lifespan_s": lifespan_s, "error": error}))
+"""
+
+
+@pytest.fixture(scope="module")
+def startup():
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    output = subprocess.run([sys.executable, "-c", STARTUP_PROBE], capture_output=True, text=True, env=env, timeout=120)
+    assert output.returncode == 0, output.stderr
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def test_import_main_within_budget(startup):
+    assert startup["import_s"] * 1000 <= IMPORT_BUDGET_MS
+
+
+def test_lifespan_startup_within_budget(startup):
+    if startup["lifespan_s"] is None:
+        pytest.skip(f"database not reachable: {startup['error']}")
+
+    assert startup["lifespan_s"] * 1000 <= STARTUP_BUDGET_MS
@@ -0,0 +1,63 @@
+from models.response import ResponseStatusCode, Detail
+from models.account import Account, Principal
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.conn import get_session
+from fastapi import Depends, Header
+import env.ACCOUNT as account_env
+import hmac
+
+# env/ACCOUNT.py 에 ADMIN_TOKEN 을 넣어야 관리자 엔드포인트를 쓸 수 있습니다. (없으면 항상 403)
+ADMIN_TOKEN = getattr(account_env, "ADMIN_TOKEN", None)
+
+
+class AuthenticationError(Exception):
+    """ 인증 의존성에서 토큰 검증 또는 사용자 조회에 실패했을 때 발생하는 에러입니다.
+        main.py의 exception handler가 ResponseModel.show_json() 형식으로 응답합니다.
+
+    """
+    messages = {
+        ResponseStatusCode.NOT_FOUND: "사용자 정보를 불러오는데 실패하였습니다.",
+        ResponseStatusCode.FORBIDDEN: "접근 권한이 없습니다.",
+        ResponseStatusCode.TIME_OUT: "세션이 만료되었습니다.",
+        ResponseStatusCode.ENTITY_ERROR: "토큰 형식이 잘못되었습니다.",
+        ResponseStatusCode.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
+    }
+
+    def __init__(self, status_code: ResponseStatusCode, detail: Detail):
+        super().__init__(detail.text)
+        self.status_code = status_code
+        self.detail = detail
+
+    @property
+    def message(self) -> str:
+        return self.messages.get(self.status_code, self.messages[ResponseStatusCode.INTERNAL_SERVER_ERROR])
+
+
+async def get_a_uuid(access_token: str) -> str:
+    """ access_token을 검증하고 a_uuid만 돌려주는 의존성입니다. 데이터베이스를 조회하지 않습니다.
+
+    """
+    status_code, result = Account._decode_token_to_uuid(access_token)
+    if status_code != ResponseStatusCode.SUCCESS:
+        raise AuthenticationError(status_code, result)
+
+    return result
+
+
+async def get_principal(a_uuid: str = Depends(get_a_uuid), session: AsyncSession = Depends(get_session)) -> Principal:
+    """ access_token을 검증하고 캐시된 Principal(a_uuid, u_uuid, nickname)을 돌려주는 의존성입니다.
+
+    """
+    status_code, result = await Account.load_principal(session, a_uuid)
+    if status_code != ResponseStatusCode.SUCCESS:
+        raise AuthenticationError(status_code, result)
+
+    return result
+
+
+async def require_admin(x_admin_token: str | None = Header(None)):
+    """ X-Admin-Token 헤더가 ADMIN_TOKEN 과 같은지 확인하는 의존성입니다.
+
+    """
+    if not ADMIN_TOKEN or x_admin_token is None or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise AuthenticationError(ResponseStatusCode.FORBIDDEN, Detail("admin token is missing or invalid"))
@@ -0,0 +1,58 @@
+from collections import OrderedDict
+from typing import Any, Hashable
+import threading
+import time
+
+
+class TTLCache:
+    """ TTLCache 클래스는 크기가 제한된 LRU 캐시에 항목별 만료 시각을 더한 캐시입니다.
+        maxsize를 넘으면 가장 오래 사용되지 않은 항목부터 버리고,
+        만료 시각이 지난 항목은 조회할 때 지웁니다.
+
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+
+            value, expires_at = item
+            if expires_at <= time.time():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: float | None = None):
+        """ expires_at(epoch 초)을 주면 기본 ttl과 비교해서 더 빠른 시각에 만료시킵니다.
+
+        """
+        deadline = time.time() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+
+        with self._lock:
+            self._data[key] = (value, deadline)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+
+        return default if item is None else item[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
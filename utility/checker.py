@@ -1,6 +1,28 @@
+from typing import List, Tuple
 import re
 
+# (매직 바이트, 오프셋, 이미지 형식) 목록
+IMAGE_SIGNATURES: List[Tuple[bytes, int, str]] = [
+    (b"\xff\xd8\xff", 0, "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", 0, "png"),
+    (b"GIF87a", 0, "gif"),
+    (b"GIF89a", 0, "gif"),
+]
+
 def is_valid_uuid_format(data: str) -> bool:
     UUID_PATTERN = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-5][0-9a-f]{3}-[089ab][0-9a-f]{3}-[0-9a-f]{12}$")
     
-    return bool(re.match(UUID_PATTERN, data))
\ No newline at end of file
+    return bool(re.match(UUID_PATTERN, data))
+
+
+def sniff_image_type(header: bytes) -> str | None:
+    """ 파일 확장자 대신 앞부분의 매직 바이트로 실제 이미지 형식을 판별합니다.
+
+    ### Returns
+        str | None: jpeg, png, gif 중 하나, 지원하지 않는 형식이면 None
+    """
+    for signature, offset, image_type in IMAGE_SIGNATURES:
+        if header[offset:offset + len(signature)] == signature:
+            return image_type
+
+    return None
@@ -0,0 +1,190 @@
+""" CareerNet 대학교 목록 크롤러
+
+    하나의 requests.Session(커넥션 풀)으로 모든 페이지를 최대 max_workers개씩 동시에 받고,
+    실패한 요청은 지수 백오프로 재시도합니다. 받은 응답은 cache_dir 에 페이지 별 JSON으로 저장해 두고,
+    다음 실행 때 ETag/Last-Modified 로 조건부 요청을 보내서 바뀌지 않은 페이지는 다시 받지 않습니다.
+    fixture_dir 을 주면 네트워크를 쓰지 않고 저장된 JSON만 읽습니다. (cache_dir 을 그대로 fixture로 쓸 수 있습니다.)
+
+    사용법:
+        python -m utility.crawler [--cache-dir cache/careernet] [--fixtures DIR] [--per-page 100] [--workers 4]
+"""
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Any, Dict, List
+import threading
+import argparse
+import requests
+import json
+import math
+import time
+import os
+
+CACHE_DIR = "./cache/careernet"
+PER_PAGE = 100
+MAX_WORKERS = 4
+TIMEOUT = (3.05, 10)  # (연결, 읽기) 초
+RETRIES = 3
+BACKOFF_FACTOR = 0.5
+
+
+class CrawlError(Exception):
+    """ CareerNet 응답이 없거나 형식이 맞지 않을 때 발생하는 에러입니다.
+
+    """
+
+
+def _atomic_write_json(path: str, data: Any):
+    temp_path = f"{path}.part"
+    with open(temp_path, "w", encoding="utf-8") as fp:
+        json.dump(data, fp, ensure_ascii=False)
+
+    os.replace(temp_path, path)
+
+
+def _read_json(path: str) -> Any:
+    with open(path, "r", encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+class CareerNetCrawler:
+    """ CareerNetCrawler 클래스는 CareerNet 대학교 목록 API의 모든 페이지를 받아서 하나의 리스트로 합칩니다.
+
+    """
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        per_page: int = PER_PAGE,
+        max_workers: int = MAX_WORKERS,
+        cache_dir: str | None = CACHE_DIR,
+        fixture_dir: str | None = None
+    ):
+        self.url = url
+        self.api_key = api_key
+        self.per_page = per_page
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        self.fixture_dir = fixture_dir
+        self.stats = {"fetched": 0, "not_modified": 0, "replayed": 0}
+        self._stats_lock = threading.Lock()
+
+        self.session = requests.Session()
+        retry = Retry(total=RETRIES, backoff_factor=BACKOFF_FACTOR,
+                      status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        if cache_dir and not fixture_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _page_path(self, directory: str, page: int) -> str:
+        return os.path.join(directory, f"univ_list_{self.per_page}_{page}.json")
+
+    def fetch_page(self, page: int) -> Dict[str, Any]:
+        """ page 번째 페이지의 응답 본문을 돌려줍니다.
+            cache에 저장된 페이지가 있으면 조건부 요청을 보내고, 304면 저장된 본문을 그대로 씁니다.
+
+        ### Raises
+            - CrawlError: 응답 코드가 200, 304가 아니거나 fixture가 없을 때 발생하는 에러입니다.
+            - requests.exceptions.RequestException: 재시도 후에도 연결에 실패했을 때 발생하는 에러입니다.
+        """
+        if self.fixture_dir:
+            path = self._page_path(self.fixture_dir, page)
+            if not os.path.exists(path):
+                raise CrawlError(f"Fixture not found: {path}")
+
+            self._count("replayed")
+            return _read_json(path)["body"]
+
+        cached = None
+        headers = {}
+        if self.cache_dir:
+            path = self._page_path(self.cache_dir, page)
+            if os.path.exists(path):
+                cached = _read_json(path)
+                if cached.get("etag"):
+                    headers["If-None-Match"] = cached["etag"]
+                if cached.get("last_modified"):
+                    headers["If-Modified-Since"] = cached["last_modified"]
+
+        params = {"apiKey": self.api_key, "svcType": "api",
+                  "svcCode": "SCHOOL", "contentType": "json",
+                  "gubun": "univ_list", "perPage": self.per_page, "thisPage": page}
+        response = self.session.get(self.url, params=params, headers=headers, timeout=TIMEOUT)
+
+        if response.status_code == 304 and cached is not None:
+            self._count("not_modified")
+            return cached["body"]
+
+        if response.status_code != 200:
+            raise CrawlError(f"CareerNet responded {response.status_code} for page {page}")
+
+        body = response.json()
+        self._count("fetched")
+        if self.cache_dir:
+            _atomic_write_json(self._page_path(self.cache_dir, page), {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "body": body,
+            })
+
+        return body
+
+    def crawl(self) -> List[Dict[str, Any]]:
+        """ 첫 페이지의 totalCount 로 전체 페이지 수를 구하고 나머지 페이지를 동시에 받습니다.
+
+        ### Raises
+            - CrawlError: 받은 개수가 totalCount 와 다를 때 발생하는 에러입니다.
+
+        ### Returns
+            List[Dict[str, Any]]: CareerNet 의 dataSearch.content 항목 리스트
+        """
+        first = self.fetch_page(1)
+        content = list(first["dataSearch"]["content"])
+        if not content:
+            return []
+
+        total = int(content[0]["totalCount"])
+        pages = math.ceil(total / self.per_page)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for body in executor.map(self.fetch_page, range(2, pages + 1)):
+                content.extend(body["dataSearch"]["content"])
+
+        if len(content) != total:
+            raise CrawlError(f"Expected {total} universities but received {len(content)}")
+
+        return content
+
+    def close(self):
+        self.session.close()
+
+
+def main():
+    from env.UNIVERSITY import CARRERNET_URL, API_KEY
+
+    parser = argparse.ArgumentParser(description="CareerNet 대학교 목록 크롤러")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="응답을 저장할 폴더 (fixture로 다시 쓸 수 있습니다.)")
+    parser.add_argument("--fixtures", default=None, help="네트워크 대신 읽을 fixture 폴더")
+    parser.add_argument("--per-page", type=int, default=PER_PAGE)
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    args = parser.parse_args()
+
+    crawler = CareerNetCrawler(CARRERNET_URL, API_KEY, args.per_page, args.workers, args.cache_dir, args.fixtures)
+    started = time.perf_counter()
+    try:
+        content = crawler.crawl()
+
+    finally:
+        crawler.close()
+
+    print(json.dumps({"universities": len(content), "elapsed_s": round(time.perf_counter() - started, 3), **crawler.stats}))
+
+
+if __name__ == "__main__":
+    main()
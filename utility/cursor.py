@@ -0,0 +1,36 @@
+from typing import Any, List
+import base64
+import json
+
+
+def encode_cursor(*values: Any) -> str:
+    """ encode_cursor() 함수는 keyset 페이지네이션의 마지막 위치를 클라이언트에게 전달할
+        불투명한(opaque) 문자열로 변환합니다.
+
+    ### Returns
+        str: url-safe base64로 인코딩된 커서 문자열
+    """
+    raw = json.dumps([str(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[str]:
+    """ decode_cursor() 함수는 encode_cursor()로 만든 커서를 다시 값 리스트로 되돌립니다.
+
+    ### Raises
+        - ValueError: 커서 형식이 잘못됐거나 값의 개수가 size와 다를 때 발생하는 에러입니다.
+
+    ### Returns
+        List[str]: 커서에 담긴 값 리스트
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+
+    except Exception:
+        raise ValueError(f"{cursor} is not valid cursor")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError(f"{cursor} is not valid cursor")
+
+    return values
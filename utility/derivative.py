@@ -0,0 +1,109 @@
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageOps
+from typing import List, Set, Tuple
+import logging
+import asyncio
+import os
+
+DERIVATIVE_SIZES = (128, 512)  # 긴 변 기준 픽셀 크기, 그 외에는 원본 크기 variant
+DERIVATIVE_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+DERIVATIVE_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+ORIGINAL = "orig"
+
+_executor: ProcessPoolExecutor | None = None
+_pending: Set[asyncio.Future] = set()
+
+
+def derivative_path(image_path: str, size: int | str, image_format: str) -> str:
+    """ images/article/<uuid>.png -> images/article/<uuid>_128.webp 형태의 variant 경로를 만듭니다.
+
+    """
+    stem, _ = os.path.splitext(image_path)
+    return f"{stem}_{size}.{image_format}"
+
+
+def _save_variant(img: Image.Image, path: str, image_format: str):
+    if image_format == "JPEG" and img.mode != "RGB":
+        img = img.convert("RGB")
+
+    elif image_format == "WEBP" and img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+
+    temp_path = f"{path}.part"
+    img.save(temp_path, format=image_format, quality=82)
+    os.replace(temp_path, path)
+
+
+def generate_derivatives(image_path: str) -> List[str]:
+    """ 원본 이미지 하나로 DERIVATIVE_SIZES 크기와 원본 크기의 WebP, JPEG variant를 만듭니다.
+        프로세스 풀에서 실행되는 함수입니다.
+
+    ### Returns
+        List[str]: 생성된 variant 경로 리스트
+    """
+    created = []
+    with Image.open(image_path) as source:
+        img = ImageOps.exif_transpose(source)
+        img.load()
+
+    for size in (*DERIVATIVE_SIZES, ORIGINAL):
+        resized = img.copy()
+        if size != ORIGINAL:
+            resized.thumbnail((size, size))
+
+        for extension, image_format in DERIVATIVE_FORMATS.items():
+            path = derivative_path(image_path, size, extension)
+            _save_variant(resized, path, image_format)
+            created.append(path)
+
+    return created
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=DERIVATIVE_WORKERS)
+
+    return _executor
+
+
+def _on_done(future: asyncio.Future):
+    _pending.discard(future)
+    if not future.cancelled() and future.exception() is not None:
+        e = future.exception()
+        logging.error(e, exc_info=e)
+
+
+def schedule_derivatives(image_paths: List[str]):
+    """ 업로드 응답을 기다리게 하지 않고 백그라운드 프로세스 풀에서 variant 생성을 시작합니다.
+
+    """
+    loop = asyncio.get_running_loop()
+    for image_path in image_paths:
+        future = loop.run_in_executor(_get_executor(), generate_derivatives, image_path)
+        _pending.add(future)
+        future.add_done_callback(_on_done)
+
+
+def resolve_variant(image_path: str, size: int | None, accept: str | None) -> Tuple[str, bool]:
+    """ 요청한 size 이상인 가장 작은 variant를 고르고, Accept 헤더가 WebP를 허용하면 WebP를 고릅니다.
+        variant가 아직 만들어지지 않았으면 원본 경로를 그대로 돌려줍니다.
+
+    ### Returns
+        (보낼 파일 경로, variant 대신 원본으로 대신했는지 여부)
+
+    """
+    if size is None:
+        return (image_path, False)
+
+    target = next((s for s in DERIVATIVE_SIZES if size <= s), ORIGINAL)
+    extension = "webp" if accept and "image/webp" in accept else "jpeg"
+    path = derivative_path(image_path, target, extension)
+    return (path, False) if os.path.exists(path) else (image_path, True)
+
+
+def shutdown_derivative_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
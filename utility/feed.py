@@ -0,0 +1,312 @@
+""" 게시물 실시간 피드 (in-process pub/sub)
+
+    GET /article/stream 연결 하나가 FeedSubscription 하나이고, 구독은 u_uuid 별로 묶여 있어서
+    새 게시물 하나를 그 대학교를 팔로우한 연결들의 큐에만 넣습니다. (전체 구독자를 훑지 않습니다.)
+
+    워커가 하나면 Article.insert_article 이 commit 한 다음 publish() 로 바로 나눠 줍니다.
+    user_info.txt 에 feed_notify = true 를 주면 stage() 가 같은 트랜잭션에서 pg_notify 를 보내고,
+    모든 워커가 start() 에서 연 LISTEN 커넥션으로 받아서 각자의 구독자에게 나눠 줍니다.
+    NOTIFY 는 commit 될 때만 전달되므로 롤백된 게시물은 나가지 않습니다.
+    LISTEN 커넥션이 끊기면 간격을 늘려 가며 다시 연결하고, 끊겨 있던 동안 올라온 게시물을 구독자에게 다시 보냅니다.
+"""
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncConnection, AsyncSession
+from sqlalchemy import select, func, text
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Set
+from datetime import datetime, timedelta
+import logging
+import asyncio
+import orjson
+import uuid
+
+FEED_CHANNEL = "article_feed"
+FEED_QUEUE_SIZE = 100  # 연결 하나가 쌓아 둘 수 있는 이벤트 수, 넘으면 오래된 것부터 버리고 lagged 를 표시합니다.
+FEED_PREVIEW_LENGTH = 200  # NOTIFY payload 는 8000 byte 까지라 content 는 앞부분만 보냅니다.
+FEED_HEARTBEAT = 15  # 초, 프록시가 유휴 연결을 끊지 않도록 주석 줄을 보냅니다.
+FEED_RETRY_MS = 3000  # 연결이 끊겼을 때 EventSource가 다시 연결하기까지 기다리는 시간
+FEED_SEEN_SIZE = 256  # 연결 하나가 기억하는 최근 게시물 수, 다시 보낸 게시물이 두 번 나가지 않게 합니다.
+FEED_LISTEN_CHECK = 10  # 초, LISTEN 커넥션이 살아 있는지 SELECT 1 로 확인하는 주기
+FEED_LISTEN_TIMEOUT = 5  # 초, 확인 쿼리를 기다리는 최대 시간
+FEED_RECONNECT_MIN = 0.5  # 초, 다시 연결하지 못하면 두 배씩 늘려서 FEED_RECONNECT_MAX 까지 기다립니다.
+FEED_RECONNECT_MAX = 30
+FEED_REPLAY_MARGIN = 5  # 초, 마지막 확인 시각보다 이만큼 앞에서부터 다시 보냅니다. (워커 사이의 시계 차이)
+FEED_REPLAY_LIMIT = 500  # 다시 보낼 게시물 수의 상한, 넘으면 lagged 를 표시합니다.
+
+
+class FeedSubscription:
+    """ 스트리밍 연결 하나가 받는 이벤트 큐
+
+    """
+    def __init__(self, u_uuids: Iterable[str]):
+        self.u_uuids = frozenset(u_uuids)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=FEED_QUEUE_SIZE)
+        self.lagged = False
+        self._seen: Dict[str, None] = {}
+
+    def offer(self, event: Dict[str, Any]):
+        art_uuid = str(event["art_uuid"])
+        if art_uuid in self._seen:
+            return
+
+        self._seen[art_uuid] = None
+        if len(self._seen) > FEED_SEEN_SIZE:
+            del self._seen[next(iter(self._seen))]
+
+        if self.queue.full():
+            # 느린 클라이언트 때문에 다른 연결이나 게시물 작성이 기다리지 않도록 가장 오래된 이벤트를 버립니다.
+            self.queue.get_nowait()
+            self.lagged = True
+
+        self.queue.put_nowait(event)
+
+
+class FeedHub:
+    """ FeedHub 클래스는 워커 프로세스 하나 안의 u_uuid -> 구독 집합 색인입니다.
+
+    """
+    _subscribers: Dict[str, Set[FeedSubscription]] = {}
+    _listener: AsyncConnection | None = None
+    _supervisor: asyncio.Task | None = None
+    _lost: asyncio.Event | None = None
+    _replay: Callable | None = None
+    notify: bool = False
+
+    @classmethod
+    def subscribe(cls, u_uuids: Iterable[str]) -> FeedSubscription:
+        subscription = FeedSubscription(str(u_uuid) for u_uuid in u_uuids)
+        for u_uuid in subscription.u_uuids:
+            cls._subscribers.setdefault(u_uuid, set()).add(subscription)
+
+        return subscription
+
+    @classmethod
+    def unsubscribe(cls, subscription: FeedSubscription):
+        for u_uuid in subscription.u_uuids:
+            subscribers = cls._subscribers.get(u_uuid)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del cls._subscribers[u_uuid]
+
+    @classmethod
+    def _fanout(cls, event: Dict[str, Any]) -> int:
+        subscribers = cls._subscribers.get(str(event["u_uuid"]), ())
+        for subscription in subscribers:
+            subscription.offer(event)
+
+        return len(subscribers)
+
+    @classmethod
+    async def stage(cls, session: AsyncSession, event: Dict[str, Any]):
+        """ 게시물을 저장하는 트랜잭션 안에서 commit 전에 호출합니다. notify 모드에서만 pg_notify 를 실행합니다.
+
+        """
+        if cls.notify:
+            await session.execute(select(func.pg_notify(FEED_CHANNEL, orjson.dumps(event).decode("utf-8"))))
+
+    @classmethod
+    def publish(cls, event: Dict[str, Any]):
+        """ commit 이 끝난 다음 호출합니다. notify 모드에서는 LISTEN 커넥션이 받아서 나눠 주므로 아무것도 하지 않습니다.
+
+        """
+        if not cls.notify:
+            cls._fanout(event)
+
+    @classmethod
+    def _on_notify(cls, connection, pid: int, channel: str, payload: str):
+        try:
+            cls._fanout(orjson.loads(payload))
+
+        except Exception as e:
+            logging.error(e, exc_info=e)
+
+    @classmethod
+    def _on_terminate(cls, connection):
+        cls._lost.set()
+
+    @classmethod
+    async def _listen(cls, engine: AsyncEngine):
+        connection = await engine.connect()
+        try:
+            raw = await connection.get_raw_connection()
+            await raw.driver_connection.add_listener(FEED_CHANNEL, cls._on_notify)
+            raw.driver_connection.add_termination_listener(cls._on_terminate)
+
+        except Exception:
+            await connection.invalidate()
+            await connection.close()
+            raise
+
+        cls._listener = connection
+
+    @classmethod
+    async def _close_listener(cls):
+        listener, cls._listener = cls._listener, None
+        if listener is None:
+            return
+
+        try:
+            raw = await listener.get_raw_connection()
+            raw.driver_connection.remove_termination_listener(cls._on_terminate)
+            await raw.driver_connection.remove_listener(FEED_CHANNEL, cls._on_notify)
+            await listener.close()
+
+        except Exception as e:
+            # 이미 끊긴 커넥션은 풀로 돌려보내지 않고 버립니다.
+            logging.warning(f"Feed listener close failed: {e}")
+            try:
+                await listener.invalidate()
+                await listener.close()
+
+            except Exception:
+                pass
+
+    @classmethod
+    async def _alive(cls) -> bool:
+        try:
+            await asyncio.wait_for(cls._listener.execute(text("SELECT 1")), FEED_LISTEN_TIMEOUT)
+            return True
+
+        except Exception:
+            return False
+
+    @classmethod
+    async def _replay_since(cls, engine: AsyncEngine, since: datetime):
+        """ since 이후에 올라온 게시물을 지금 구독 중인 연결들에 다시 나눠 줍니다. (이미 받은 게시물은 FeedSubscription 이 걸러냅니다.)
+            다시 보낼 수 없거나 너무 많으면 lagged 를 표시해서 클라이언트가 GET /article 로 다시 불러오게 합니다.
+
+        """
+        from models.response import ResponseStatusCode
+
+        subscriptions = {subscription for subscribers in cls._subscribers.values() for subscription in subscribers}
+        if not subscriptions:
+            return
+
+        status_code, result = None, None
+        if cls._replay is not None:
+            async with AsyncSession(engine) as session:
+                status_code, result = await cls._replay(session, [uuid.UUID(u_uuid) for u_uuid in cls._subscribers], since, FEED_REPLAY_LIMIT)
+
+        if status_code != ResponseStatusCode.SUCCESS or len(result) >= FEED_REPLAY_LIMIT:
+            for subscription in subscriptions:
+                subscription.lagged = True
+
+            return
+
+        for event in result:
+            cls._fanout(event)
+
+    @classmethod
+    async def _supervise(cls, engine: AsyncEngine):
+        """ LISTEN 커넥션이 끊겼는지 FEED_LISTEN_CHECK 초마다 확인하고, 끊기면 FEED_RECONNECT_MIN 부터 두 배씩 늘어나는 간격으로 다시 연결합니다.
+            다시 연결되면 마지막으로 살아 있던 시각 이후의 게시물을 다시 보냅니다.
+
+        """
+        healthy_at = datetime.now()
+        delay = FEED_RECONNECT_MIN
+        while True:
+            if cls._listener is None:
+                try:
+                    await cls._listen(engine)
+
+                except Exception as e:
+                    logging.warning(f"Feed listener reconnect failed, retrying in {delay}s: {e}")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, FEED_RECONNECT_MAX)
+                    continue
+
+                logging.info("Feed listener reconnected")
+                delay = FEED_RECONNECT_MIN
+                try:
+                    await cls._replay_since(engine, healthy_at - timedelta(seconds=FEED_REPLAY_MARGIN))
+
+                except Exception as e:
+                    logging.error(e, exc_info=e)
+
+            try:
+                await asyncio.wait_for(cls._lost.wait(), FEED_LISTEN_CHECK)
+
+            except asyncio.TimeoutError:
+                pass
+
+            if not cls._lost.is_set() and await cls._alive():
+                healthy_at = datetime.now()
+                continue
+
+            logging.warning("Feed listener connection lost")
+            cls._lost.clear()
+            await cls._close_listener()
+
+    @classmethod
+    async def start(cls, engine: AsyncEngine, notify: bool, replay: Callable | None = None):
+        """ notify 모드면 커넥션 하나를 풀에서 빌려서 워커가 끝날 때까지 LISTEN 하고, 끊기면 다시 연결합니다.
+            replay(session, u_uuids, since, limit) 는 since 이후에 올라온 게시물을 (ResponseStatusCode, 이벤트 리스트) 로 돌려줍니다.
+
+        """
+        cls.notify = notify
+        if not notify or cls._supervisor is not None:
+            return
+
+        cls._replay = replay
+        cls._lost = asyncio.Event()
+        await cls._listen(engine)
+        cls._supervisor = asyncio.get_running_loop().create_task(cls._supervise(engine))
+
+    @classmethod
+    async def stop(cls):
+        if cls._supervisor is not None:
+            cls._supervisor.cancel()
+            try:
+                await cls._supervisor
+
+            except asyncio.CancelledError:
+                pass
+
+            cls._supervisor = None
+
+        await cls._close_listener()
+
+
+def _sse(event: str, data: Dict[str, Any], event_id: str | None = None) -> str:
+    lines = [f"id: {event_id}"] if event_id else []
+    lines += [f"event: {event}", f"data: {orjson.dumps(data).decode('utf-8')}"]
+    return "\n".join(lines) + "\n\n"
+
+
+async def event_stream(subscription: FeedSubscription, replay: Iterable[Dict[str, Any]] = ()) -> AsyncIterator[str]:
+    """ text/event-stream 본문을 만듭니다. 연결이 끊기면 StreamingResponse가 이 제너레이터를 취소하고, 그때 구독을 해제합니다.
+
+        - article: 새 게시물 (id는 art_uuid라서 다시 연결하면 Last-Event-ID로 놓친 게시물을 받습니다.)
+        - lagged: 큐가 넘쳐서 버린 게시물이 있음, 클라이언트는 GET /article 로 다시 불러옵니다.
+    """
+    try:
+        yield f"retry: {FEED_RETRY_MS}\n\n"
+        sent = set()
+        for event in replay:
+            sent.add(str(event["art_uuid"]))
+            yield _sse("article", event, event["art_uuid"])
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), FEED_HEARTBEAT)
+
+            except asyncio.TimeoutError:
+                # LISTEN 커넥션을 다시 연결하면서 lagged 가 표시됐을 수 있으므로 새 게시물이 없어도 알립니다.
+                if subscription.lagged:
+                    subscription.lagged = False
+                    yield _sse("lagged", {})
+
+                yield ": ping\n\n"
+                continue
+
+            if subscription.lagged:
+                subscription.lagged = False
+                yield _sse("lagged", {})
+
+            # 구독한 다음 replay를 조회했으므로 같은 게시물이 두 번 들어올 수 있습니다.
+            if str(event["art_uuid"]) in sent:
+                continue
+
+            yield _sse("article", event, event["art_uuid"])
+
+    finally:
+        FeedHub.unsubscribe(subscription)
@@ -0,0 +1,138 @@
+""" 이미지 응답의 ETag(파일 내용의 sha256)와 실제 형식
+
+    해시는 파일마다 한 번만 계산해서 이미지 옆의 사이드카 파일(<이미지 경로>.sha256)에 저장합니다.
+    사이드카에는 계산할 때의 mtime 과 크기가 같이 들어 있어서 파일이 바뀌면 다시 계산합니다.
+    워커나 재시작과 관계없이 사이드카를 읽기만 하면 되고, 자주 쓰는 값은 프로세스 메모리(TTLCache)에도 둡니다.
+"""
+from utility.checker import sniff_image_type
+from utility.cache import TTLCache
+import mimetypes
+import hashlib
+import os
+
+IMAGE_META_CACHE_SIZE = 4096
+IMAGE_META_CACHE_TTL = 24 * 60 * 60
+HASH_CHUNK_SIZE = 256 * 1024
+SIDECAR_SUFFIX = ".sha256"
+
+_meta_cache = TTLCache(IMAGE_META_CACHE_SIZE, IMAGE_META_CACHE_TTL)
+
+
+class ImageMeta:
+    """ ImageMeta 클래스는 이미지 응답 헤더를 만드는 데 필요한 값을 담습니다.
+        etag는 파일 내용의 sha256이라 같은 파일이면 서버를 재시작해도 값이 바뀌지 않습니다.
+
+    """
+    __slots__ = ("etag", "media_type", "size", "mtime", "_stat_key")
+
+    def __init__(self, digest: str, media_type: str, stat: os.stat_result):
+        self.etag = f'"{digest[:32]}"'
+        self.media_type = media_type
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+        self._stat_key = (stat.st_mtime_ns, stat.st_size)
+
+
+def _media_type(image_path: str, header: bytes) -> str:
+    image_type = sniff_image_type(header)
+    if image_type:
+        return f"image/{image_type}"
+
+    return mimetypes.guess_type(image_path)[0] or "application/octet-stream"
+
+
+def describe_image_bytes(image_path: str, data: bytes, stat: os.stat_result) -> ImageMeta:
+    """ 이미 메모리에 읽어 둔 파일 내용으로 ImageMeta를 만듭니다.
+
+    """
+    return ImageMeta(hashlib.sha256(data).hexdigest(), _media_type(image_path, data[:HASH_CHUNK_SIZE]), stat)
+
+
+def sidecar_path(image_path: str) -> str:
+    return image_path + SIDECAR_SUFFIX
+
+
+def _write_sidecar(image_path: str, digest: str, media_type: str, stat: os.stat_result):
+    """ 다른 워커가 반쯤 쓴 내용을 읽지 않도록 임시 파일에 쓰고 rename 합니다. 저장하지 못해도 응답에는 지장이 없습니다.
+
+    """
+    path = sidecar_path(image_path)
+    temp_path = f"{path}.{os.getpid()}.part"
+    try:
+        with open(temp_path, "w", encoding="ascii") as fp:
+            fp.write(f"{digest} {media_type} {stat.st_mtime_ns} {stat.st_size}\n")
+
+        os.replace(temp_path, path)
+
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _read_sidecar(image_path: str, stat: os.stat_result) -> ImageMeta | None:
+    """ 사이드카가 있고 이미지의 mtime, 크기가 저장할 때와 같을 때만 값을 돌려줍니다.
+
+    """
+    try:
+        with open(sidecar_path(image_path), "r", encoding="ascii") as fp:
+            digest, media_type, mtime_ns, size = fp.read().split()
+
+        if (int(mtime_ns), int(size)) != (stat.st_mtime_ns, stat.st_size):
+            return None
+
+    except (OSError, ValueError):
+        return None
+
+    return ImageMeta(digest, media_type, stat)
+
+
+def remember_image_meta(image_path: str, digest: str, image_type: str):
+    """ 업로드하면서 이미 계산한 해시를 사이드카에 저장해서 어느 워커도 파일을 다시 읽지 않게 합니다.
+        디스크에 쓰는 함수라 스레드 풀에서 호출합니다.
+
+    """
+    stat = os.stat(image_path)
+    meta = ImageMeta(digest, f"image/{image_type}", stat)
+    _write_sidecar(image_path, digest, meta.media_type, stat)
+    _meta_cache.set(image_path, meta)
+
+
+def compute_image_meta(image_path: str) -> ImageMeta:
+    """ 파일을 한 번 끝까지 읽어서 해시와 실제 형식을 구하고 사이드카와 캐시에 저장합니다.
+
+    ### Raises
+        - FileNotFoundError: 파일이 없을 때 발생하는 에러입니다.
+    """
+    digest = hashlib.sha256()
+    with open(image_path, "rb") as fp:
+        stat = os.fstat(fp.fileno())
+        header = fp.read(HASH_CHUNK_SIZE)
+        chunk = header
+        while chunk:
+            digest.update(chunk)
+            chunk = fp.read(HASH_CHUNK_SIZE)
+
+    meta = ImageMeta(digest.hexdigest(), _media_type(image_path, header), stat)
+    _write_sidecar(image_path, digest.hexdigest(), meta.media_type, stat)
+    _meta_cache.set(image_path, meta)
+    return meta
+
+
+def load_image_meta(image_path: str) -> ImageMeta:
+    """ 메모리 캐시, 사이드카 순서로 찾고 둘 다 없거나 파일이 바뀌었으면 해시를 계산합니다.
+        stat 과 파일 읽기가 있으므로 이벤트 루프가 아닌 스레드 풀에서 호출합니다.
+
+    ### Raises
+        - FileNotFoundError: 파일이 없을 때 발생하는 에러입니다.
+    """
+    stat = os.stat(image_path)
+    meta = _meta_cache.get(image_path)
+    if meta is not None and meta._stat_key == (stat.st_mtime_ns, stat.st_size):
+        return meta
+
+    meta = _read_sidecar(image_path, stat)
+    if meta is not None:
+        _meta_cache.set(image_path, meta)
+        return meta
+
+    return compute_image_meta(image_path)
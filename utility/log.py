@@ -0,0 +1,257 @@
+""" 구조화된 비동기 로깅
+
+    setup_logging() 은 루트 로거에 QueueHandler 하나만 달고, 실제 출력(stderr, 회전 로그 파일)은
+    QueueListener 스레드가 맡습니다. 이벤트 루프에서는 레코드를 큐에 넣기만 하고, traceback 문자열과
+    JSON 한 줄은 listener 스레드에서 레코드를 쓸 때 만듭니다.
+
+    - 요청 ID: RequestIdMiddleware 가 X-Request-ID 헤더(없으면 새로 만든 값)를 contextvar 에 넣고 응답 헤더로 돌려주며,
+      그 요청 안에서 남긴 로그에는 request_id 가 붙습니다.
+    - 중복 억제: 같은 위치에서 같은 종류의 WARNING 이상 로그는 LOG_DEDUPE_WINDOW 초에 LOG_DEDUPE_BURST 개까지만 남기고,
+      창이 지난 다음 처음 남는 로그에 그동안 버린 개수(suppressed)를 적습니다.
+    - 큐가 가득 차면 이벤트 루프를 멈추지 않고 버린 다음, 다음 로그에 버린 개수(dropped)를 적습니다.
+    - 따로 파일에 남기는 로거(느린 쿼리)는 queued_file_logger() 로 만들어서 같은 방식으로 listener 스레드가 씁니다.
+"""
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List
+import threading
+import logging
+import atexit
+import orjson
+import queue
+import copy
+import uuid
+import sys
+import os
+import re
+
+LOG_QUEUE_SIZE = 10000
+LOG_FILE_BYTES = 10 * 1024 * 1024
+LOG_FILE_BACKUPS = 5
+LOG_DEDUPE_WINDOW = 60.0  # 초
+LOG_DEDUPE_BURST = 5  # 창 하나에서 같은 로그를 남기는 최대 개수
+LOG_DEDUPE_KEYS = 1024  # 기억하는 로그 종류의 최대 개수
+REQUEST_ID_HEADER = b"x-request-id"
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")  # 클라이언트가 보낸 값은 로그와 헤더에 그대로 쓸 수 있을 때만 받습니다.
+
+_request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+_listener: QueueListener | None = None
+_file_listeners: List[QueueListener] = []
+
+
+def current_request_id() -> str | None:
+    return _request_id.get()
+
+
+class RequestIdFilter(logging.Filter):
+    """ 로그를 남긴 쪽(이벤트 루프)의 contextvar 에서 요청 ID를 읽어 레코드에 붙입니다.
+
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        return True
+
+
+class DedupeFilter(logging.Filter):
+    """ 같은 로그 위치, 레벨, 메시지 템플릿(예외를 넘겼으면 예외 타입)의 WARNING 이상 로그를 창마다 burst 개까지만 통과시킵니다.
+
+    """
+    def __init__(self, window: float = LOG_DEDUPE_WINDOW, burst: int = LOG_DEDUPE_BURST):
+        super().__init__()
+        self.window, self.burst = window, burst
+        # key -> [창 시작 시각, 창 안에서 통과한 개수, 창 안에서 버린 개수]
+        self._seen: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING:
+            return True
+
+        template = record.msg if isinstance(record.msg, str) else type(record.msg).__name__
+        key = (record.name, record.levelno, record.pathname, record.lineno, template)
+        with self._lock:
+            state = self._seen.get(key)
+            if state is None or record.created - state[0] >= self.window:
+                if state is None and len(self._seen) >= LOG_DEDUPE_KEYS:
+                    self._prune(record.created)
+
+                if state is not None and state[2]:
+                    record.suppressed = state[2]
+
+                self._seen[key] = [record.created, 1, 0]
+                return True
+
+            if state[1] < self.burst:
+                state[1] += 1
+                return True
+
+            state[2] += 1
+            return False
+
+    def _prune(self, now: float):
+        expired = [key for key, state in self._seen.items() if now - state[0] >= self.window]
+        for key in expired or list(self._seen)[:LOG_DEDUPE_KEYS // 2]:
+            del self._seen[key]
+
+
+class LazyQueueHandler(QueueHandler):
+    """ 기본 QueueHandler.prepare() 는 큐에 넣기 전에 format() 을 불러서 traceback 을 문자열로 만듭니다.
+        같은 프로세스 안의 큐라 pickle 할 필요가 없으므로 메시지만 확정하고 exc_info 는 그대로 listener 스레드로 넘깁니다.
+
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if self.dropped:
+            record.dropped, self.dropped = self.dropped, 0
+
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """ 레코드 하나를 JSON 한 줄로 만듭니다. listener 스레드에서만 호출됩니다.
+
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "location": f"{record.module}.{record.funcName}:{record.lineno}",
+            "request_id": getattr(record, "request_id", None),
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+
+        if record.exc_info:
+            entry["exc_type"] = record.exc_info[0].__name__
+            entry["traceback"] = self.formatException(record.exc_info)
+
+        for key in ("suppressed", "dropped"):
+            if getattr(record, key, 0):
+                entry[key] = getattr(record, key)
+
+        return orjson.dumps(entry, default=str).decode("utf-8")
+
+
+def setup_logging(level: str = "INFO", path: str | None = None):
+    """ 루트 로거의 핸들러를 QueueHandler 하나로 바꾸고 listener 스레드를 시작합니다. 여러 번 불러도 한 번만 설정합니다.
+        path 를 주면 stderr 와 함께 회전 로그 파일에도 씁니다. listener 는 프로세스가 끝날 때 남은 로그를 모두 쓰고 멈춥니다.
+
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    handlers = [logging.StreamHandler(sys.stderr)]
+    if path:
+        handlers.append(_rotating_file_handler(path, LOG_FILE_BYTES, LOG_FILE_BACKUPS))
+
+    formatter = JsonFormatter()
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    queue_handler = LazyQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+    queue_handler.addFilter(DedupeFilter())
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def _rotating_file_handler(path: str, max_bytes: int, backups: int) -> RotatingFileHandler:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    return RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+
+
+def queued_file_logger(name: str, path: str, max_bytes: int = LOG_FILE_BYTES, backups: int = LOG_FILE_BACKUPS) -> logging.Logger:
+    """ name 로거의 메시지를 그대로 한 줄씩 회전 로그 파일에 쓰도록 설정합니다. 루트 로거로는 전달하지 않습니다.
+        루트 로거와 마찬가지로 이벤트 루프에서는 큐에 넣기만 하고, 파일 쓰기와 회전은 이 로거 전용 listener 스레드가 맡습니다.
+
+    """
+    handler = _rotating_file_handler(path, max_bytes, backups)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    logger = logging.getLogger(name)
+    logger.addHandler(LazyQueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    _file_listeners.append(listener)
+    atexit.register(shutdown_logging)
+    return logger
+
+
+def shutdown_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+    while _file_listeners:
+        _file_listeners.pop().stop()
+
+
+class RequestIdMiddleware:
+    """ 요청마다 요청 ID를 정해서 contextvar 에 넣고 응답의 X-Request-ID 헤더로 돌려주는 ASGI 미들웨어입니다.
+
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                value = value.decode("latin-1")
+                request_id = value if REQUEST_ID_PATTERN.match(value) else None
+                break
+
+        request_id = request_id or uuid.uuid4().hex
+        token = _request_id.set(request_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(REQUEST_ID_HEADER, request_id.encode("latin-1"))]
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+
+        finally:
+            _request_id.reset(token)
@@ -0,0 +1,219 @@
+""" 대학교 로고 전처리 파이프라인
+
+    images/logos 의 원본 로고를 읽어서 PNG 변환, 배경 제거(rembg), 200x200 리사이즈를 거친 결과를
+    images/logos_processed 에 씁니다. 로고 하나가 작업 하나로 프로세스 풀에 나뉘어 실행되고,
+    원본의 sha256과 파이프라인 설정을 manifest.json 에 기록해서 다시 실행할 때 바뀌지 않은 로고는 건너뜁니다.
+
+    사용법:
+        python -m utility.logo_pipeline [--src images/logos] [--dst images/logos_processed]
+                                        [--workers N] [--no-rembg] [--force]
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Tuple
+from PIL import Image, ImageOps
+import argparse
+import hashlib
+import json
+import time
+import os
+
+SOURCE_DIR = "./images/logos"
+OUTPUT_DIR = "./images/logos_processed"
+MANIFEST_NAME = "manifest.json"
+LOGO_SIZE = (200, 200)
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp")
+STAGES = ("load", "rembg", "resize", "save")
+
+_rembg_session = None
+
+
+def _pipeline_version(use_rembg: bool) -> str:
+    """ 설정이 바뀌면 manifest에 기록된 결과를 모두 다시 만들도록 설정 값으로 버전 문자열을 만듭니다.
+
+    """
+    return f"v1:rembg={int(use_rembg)}:size={LOGO_SIZE[0]}x{LOGO_SIZE[1]}"
+
+
+def _init_worker(use_rembg: bool):
+    """ 작업 프로세스마다 rembg 모델을 한 번만 불러옵니다.
+
+    """
+    global _rembg_session
+    if use_rembg:
+        import rembg
+        _rembg_session = rembg.new_session()
+
+
+def _atomic_write(path: str, write):
+    temp_path = f"{path}.part"
+    with open(temp_path, "wb") as fp:
+        write(fp)
+        fp.flush()
+        os.fsync(fp.fileno())
+
+    os.replace(temp_path, path)
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(256 * 1024), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def process_logo(source_path: str, output_path: str, use_rembg: bool) -> Dict[str, float]:
+    """ 로고 하나를 처리하고 단계별 소요 시간(초)을 돌려줍니다. 프로세스 풀에서 실행되는 함수입니다.
+
+    """
+    timings = {}
+
+    started = time.perf_counter()
+    with Image.open(source_path) as source:
+        img = ImageOps.exif_transpose(source).convert("RGBA")
+    timings["load"] = time.perf_counter() - started
+
+    if use_rembg:
+        import rembg
+        started = time.perf_counter()
+        img = rembg.remove(img, session=_rembg_session)
+        timings["rembg"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    img = img.resize(LOGO_SIZE)
+    timings["resize"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    _atomic_write(output_path, lambda fp: img.save(fp, format="PNG"))
+    timings["save"] = time.perf_counter() - started
+
+    return timings
+
+
+def load_manifest(output_dir: str) -> Dict[str, Dict[str, str]]:
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), "r", encoding="utf-8") as fp:
+            return json.load(fp)
+
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest(output_dir: str, manifest: Dict[str, Dict[str, str]]):
+    body = json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True).encode("utf-8")
+    _atomic_write(os.path.join(output_dir, MANIFEST_NAME), lambda fp: fp.write(body))
+
+
+def plan_jobs(
+    source_dir: str,
+    output_dir: str,
+    manifest: Dict[str, Dict[str, str]],
+    version: str,
+    force: bool
+) -> Tuple[List[Tuple[str, str, str, str]], int]:
+    """ 원본 해시와 파이프라인 버전이 manifest와 같고 결과 파일이 남아 있는 로고는 작업에서 뺍니다.
+
+    ### Returns
+        Tuple[List[Tuple[str, str, str, str]], int]: ([(파일 이름, 원본 경로, 결과 경로, sha256)], 건너뛴 개수)
+    """
+    jobs, skipped = [], 0
+    for name in sorted(os.listdir(source_dir)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+
+        source_path = os.path.join(source_dir, name)
+        output_path = os.path.join(output_dir, f"{os.path.splitext(name)[0]}.png")
+        digest = file_sha256(source_path)
+
+        entry = manifest.get(name)
+        if (not force and entry and entry.get("sha256") == digest
+                and entry.get("version") == version and os.path.exists(output_path)):
+            skipped += 1
+            continue
+
+        jobs.append((name, source_path, output_path, digest))
+
+    return (jobs, skipped)
+
+
+def run_pipeline(
+    source_dir: str = SOURCE_DIR,
+    output_dir: str = OUTPUT_DIR,
+    workers: int | None = None,
+    use_rembg: bool = True,
+    force: bool = False
+) -> Dict[str, object]:
+    """ 바뀐 로고만 프로세스 풀에서 처리하고, 하나가 끝날 때마다 manifest를 갱신합니다.
+        중간에 멈춰도 끝난 로고는 manifest에 남아 있으므로 다시 실행하면 이어서 처리합니다.
+
+    ### Returns
+        Dict[str, object]: 처리/건너뜀/실패 개수, 전체 소요 시간, 단계별 소요 시간 리스트
+    """
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    version = _pipeline_version(use_rembg)
+    manifest = load_manifest(output_dir)
+    jobs, skipped = plan_jobs(source_dir, output_dir, manifest, version, force)
+
+    stage_timings: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    failed: Dict[str, str] = {}
+    workers = workers or os.cpu_count() or 1
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)),
+                                 initializer=_init_worker, initargs=(use_rembg,)) as executor:
+            futures = {executor.submit(process_logo, source_path, output_path, use_rembg): (name, output_path, digest)
+                       for name, source_path, output_path, digest in jobs}
+
+            for future in as_completed(futures):
+                name, output_path, digest = futures[future]
+                try:
+                    timings = future.result()
+
+                except Exception as e:
+                    failed[name] = str(e)
+                    continue
+
+                for stage, seconds in timings.items():
+                    stage_timings[stage].append(seconds)
+
+                manifest[name] = {"sha256": digest, "output": os.path.basename(output_path), "version": version}
+                save_manifest(output_dir, manifest)
+
+    return {
+        "processed": len(jobs) - len(failed),
+        "skipped": skipped,
+        "failed": failed,
+        "elapsed": time.perf_counter() - started,
+        "stages": stage_timings,
+    }
+
+
+def print_report(report: Dict[str, object]):
+    print(f"processed={report['processed']} skipped={report['skipped']} "
+          f"failed={len(report['failed'])} elapsed={report['elapsed']:.2f}s")
+    print(f"{'stage':<8}{'count':>7}{'total(s)':>11}{'mean(ms)':>11}{'max(ms)':>10}")
+    for stage, samples in report["stages"].items():
+        if samples:
+            print(f"{stage:<8}{len(samples):>7}{sum(samples):>11.2f}"
+                  f"{sum(samples) / len(samples) * 1000:>11.1f}{max(samples) * 1000:>10.1f}")
+
+    for name, error in report["failed"].items():
+        print(f"failed: {name}: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대학교 로고 전처리 파이프라인")
+    parser.add_argument("--src", default=SOURCE_DIR, help="원본 로고 폴더")
+    parser.add_argument("--dst", default=OUTPUT_DIR, help="결과를 쓸 폴더")
+    parser.add_argument("--workers", type=int, default=None, help="작업 프로세스 개수 (기본값: CPU 개수)")
+    parser.add_argument("--no-rembg", action="store_true", help="배경 제거 단계를 건너뜁니다.")
+    parser.add_argument("--force", action="store_true", help="manifest를 무시하고 모두 다시 처리합니다.")
+    args = parser.parse_args()
+
+    print_report(run_pipeline(args.src, args.dst, args.workers, not args.no_rembg, args.force))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+""" 요청 지연 시간과 DB 쿼리 계측
+
+    MetricsMiddleware 가 요청마다 RequestStats 를 contextvar 에 넣고, install_query_hooks() 로 엔진에 건
+    before/after_cursor_execute 훅이 그 요청의 쿼리 수와 DB 시간을 더합니다. 요청이 끝나면 라우트 템플릿
+    (예: /article/search) 별로 히스토그램과 카운터에 기록하고, GET /metrics 가 Prometheus 텍스트 형식으로 내보냅니다.
+
+    값은 워커 프로세스 하나의 것이므로 여러 워커로 띄우면 워커마다 따로 수집합니다.
+"""
+from sqlalchemy.ext.asyncio import AsyncEngine
+from contextvars import ContextVar
+from typing import Dict, Tuple
+from sqlalchemy import event
+import threading
+import bisect
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+UNMATCHED_ROUTE = "unmatched"  # 없는 경로로 온 요청은 경로마다 시계열이 생기지 않도록 하나로 묶습니다.
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name, self.documentation, self.labels = name, documentation, labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in self._values.items():
+                lines.append(f"{self.name}{_format_labels(self.labels, labels)} {value}")
+
+        return "\n".join(lines)
+
+
+class Gauge(Counter):
+    def dec(self, labels: Tuple[str, ...] = (), amount: float = 1.0):
+        self.inc(labels, -amount)
+
+    def render(self) -> str:
+        return super().render().replace(f"# TYPE {self.name} counter", f"# TYPE {self.name} gauge")
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name, self.documentation, self.labels, self.buckets = name, documentation, labels, buckets
+        # labels -> [버킷 별 개수 (누적 아님)..., +Inf 개수, 합계]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: Tuple[str, ...] = ()):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+
+            counts[index] += 1
+            counts[-1] += value
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, counts in self._values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += count
+                    le = f'le="{bound}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, labels, le)} {cumulative}")
+
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {counts[-1]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {cumulative}")
+
+        return "\n".join(lines)
+
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "Request latency by route template.", ("method", "route"))
+REQUESTS = Counter("http_requests_total", "Requests by route template and status code.", ("method", "route", "status"))
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled.", ("method",))
+REQUEST_QUERIES = Histogram("db_queries_per_request", "Number of SQL statements executed per request.",
+                            ("method", "route"), QUERY_COUNT_BUCKETS)
+REQUEST_DB_TIME = Histogram("db_time_per_request_seconds", "Time spent in SQL statements per request.", ("method", "route"))
+QUERIES = Counter("db_queries_total", "SQL statements executed, including those outside requests.")
+QUERY_TIME = Counter("db_query_seconds_total", "Time spent in SQL statements, including those outside requests.")
+
+METRICS = (REQUEST_LATENCY, REQUESTS, IN_FLIGHT, REQUEST_QUERIES, REQUEST_DB_TIME, QUERIES, QUERY_TIME)
+
+
+def render_metrics() -> str:
+    return "\n".join(metric.render() for metric in METRICS) + "\n"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # conn.info 는 풀의 커넥션에 남아 있으므로, 실패한 문장이 시작 시각을 남기지 않도록 실행 컨텍스트에 둡니다.
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_started
+    QUERIES.inc()
+    QUERY_TIME.inc(amount=elapsed)
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+
+
+def install_query_hooks(engine: AsyncEngine):
+    """ 엔진에서 실행되는 모든 SQL 문의 수와 시간을 현재 요청에 더하는 훅을 겁니다. 한 번만 호출합니다.
+
+    """
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """ 요청 하나의 지연 시간, 상태 코드, 쿼리 수, DB 시간을 라우트 템플릿 별로 기록하는 ASGI 미들웨어입니다.
+        BaseHTTPMiddleware 와 달리 응답 본문을 감싸지 않으므로 스트리밍 응답(SSE)도 그대로 흘려보냅니다.
+        응답 헤더에는 Server-Timing 으로 그 요청의 전체 시간과 DB 시간을 붙입니다.
+
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                timing = (f"app;dur={(time.perf_counter() - started) * 1000:.1f}, "
+                          f"db;dur={stats.db_time * 1000:.1f};desc=\"{stats.queries} queries\"")
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode("latin-1"))]
+
+            await send(message)
+
+        IN_FLIGHT.inc((method,))
+        try:
+            await self.app(scope, receive, send_wrapper)
+
+        finally:
+            IN_FLIGHT.dec((method,))
+            _request_stats.reset(token)
+            route = scope.get("route")
+            labels = (method, route.path if route is not None else UNMATCHED_ROUTE)
+            REQUEST_LATENCY.observe(time.perf_counter() - started, labels)
+            REQUESTS.inc(labels + (str(status),))
+            REQUEST_QUERIES.observe(stats.queries, labels)
+            REQUEST_DB_TIME.observe(stats.db_time, labels)
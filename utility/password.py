@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor
+import env.ACCOUNT as account_env
+import asyncio
+import bcrypt
+import os
+
+# env/ACCOUNT.py 에서 덮어쓸 수 있는 설정 값
+BCRYPT_ROUNDS = getattr(account_env, "BCRYPT_ROUNDS", 12)  # bcrypt cost factor
+HASH_WORKERS = getattr(account_env, "HASH_WORKERS", max(1, (os.cpu_count() or 2) - 1))  # 해싱 전용 스레드 개수
+HASH_QUEUE_LIMIT = getattr(account_env, "HASH_QUEUE_LIMIT", HASH_WORKERS * 8)  # 빈 스레드를 기다릴 수 있는 요청의 최대 개수
+HASH_WAIT_TIMEOUT = getattr(account_env, "HASH_WAIT_TIMEOUT", 5.0)  # 빈 스레드를 기다리는 최대 시간 (초)
+
+_executor: ThreadPoolExecutor | None = None
+_slots: asyncio.Semaphore | None = None
+_waiting = 0
+
+
+class PasswordHasherBusy(Exception):
+    """ 해싱 스레드가 모두 바쁘고 대기열도 가득 찼거나, HASH_WAIT_TIMEOUT 안에 차례가 오지 않았을 때 발생합니다.
+
+    """
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor, _slots
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+        _slots = asyncio.Semaphore(HASH_WORKERS)
+
+    return _executor
+
+
+async def _run(func, *args):
+    """ bcrypt 연산을 전용 스레드 풀에서 실행합니다.
+        bcrypt는 해싱하는 동안 GIL을 놓기 때문에 이벤트 루프는 다른 요청을 계속 처리할 수 있고,
+        동시에 실행되는 해싱은 HASH_WORKERS개로 제한되고, 나머지 요청은 HASH_QUEUE_LIMIT개까지만 HASH_WAIT_TIMEOUT초 동안 기다립니다.
+
+    ### Raises
+        PasswordHasherBusy: 대기열이 가득 찼거나 기다리는 시간이 HASH_WAIT_TIMEOUT을 넘었을 때
+
+    """
+    global _waiting
+    executor = _get_executor()
+    if _waiting >= HASH_QUEUE_LIMIT:
+        raise PasswordHasherBusy(f"{_waiting} password hashing requests are already waiting")
+
+    _waiting += 1
+    try:
+        await asyncio.wait_for(_slots.acquire(), HASH_WAIT_TIMEOUT)
+
+    except asyncio.TimeoutError:
+        raise PasswordHasherBusy(f"password hashing slot not available within {HASH_WAIT_TIMEOUT}s")
+
+    finally:
+        _waiting -= 1
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+    finally:
+        _slots.release()
+
+
+async def hash_password(password: str) -> str:
+    def _hash(raw: bytes) -> bytes:
+        return bcrypt.hashpw(raw, bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
+
+    return (await _run(_hash, password.encode("utf-8"))).decode("utf-8")
+
+
+async def check_password(password: str, hashed_password: str) -> bool:
+    return await _run(bcrypt.checkpw, password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+def shutdown_password_executor():
+    global _executor, _slots
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor, _slots = None, None
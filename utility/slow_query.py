@@ -0,0 +1,153 @@
+""" 느린 쿼리 기록
+
+    user_info.txt 에 slow_query_ms 를 주면 DBObject 가 엔진에 install_slow_query_log() 를 겁니다.
+    threshold_ms 이상 걸린 SQL 문은 문장, 값을 가린 파라미터, 호출한 모델 메소드(예: Article.get_article_list)와 함께
+    메모리(최근 SLOW_QUERY_KEEP 개, GET /admin/slow-queries)와 회전 로그 파일(JSON 한 줄씩)에 남깁니다.
+    파일에는 utility.log 의 listener 스레드가 쓰므로 SQL 을 실행한 쪽은 큐에 넣기만 합니다.
+
+    SELECT 문은 explain_rate 확률로 별도 커넥션에서 EXPLAIN (ANALYZE, BUFFERS) 를 실행해서 실행 계획도 함께 남깁니다.
+    EXPLAIN 은 읽기 전용 트랜잭션에서 실행하고 롤백하며, 같은 문장은 동시에 하나만 실행합니다.
+"""
+from sqlalchemy.ext.asyncio import AsyncEngine
+from utility.log import current_request_id, queued_file_logger
+from contextvars import ContextVar
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List
+from sqlalchemy import event
+import greenlet
+import logging
+import asyncio
+import random
+import orjson
+import time
+import sys
+import re
+
+SLOW_QUERY_LOG = "./logs/slow_query.log"
+SLOW_QUERY_LOG_BYTES = 5 * 1024 * 1024
+SLOW_QUERY_LOG_BACKUPS = 3
+SLOW_QUERY_KEEP = 200  # 관리자 엔드포인트로 보여 줄 최근 기록 수
+EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+DATA_MODIFYING = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+
+_records: deque = deque(maxlen=SLOW_QUERY_KEEP)
+_explaining: set = set()  # EXPLAIN 중인 SQL 문
+_tasks: set = set()  # 실행 중인 EXPLAIN 태스크 (가비지 컬렉션 방지)
+_in_explain: ContextVar[bool] = ContextVar("in_explain", default=False)
+_logger = logging.getLogger("slow_query")
+
+
+def recent_slow_queries() -> List[Dict[str, Any]]:
+    """ 최근 기록을 최신순으로 돌려줍니다.
+
+    """
+    return list(reversed(_records))
+
+
+def _redact(value: Any) -> Any:
+    """ 값은 가리고 타입과 길이만 남깁니다. 숫자, bool, None 은 실행 계획에 영향을 주므로 그대로 둡니다.
+
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+
+    if isinstance(value, (str, bytes, list, tuple)):
+        return f"<{type(value).__name__}:{len(value)}>"
+
+    return f"<{type(value).__name__}>"
+
+
+def _redact_parameters(parameters: Any, executemany: bool) -> Any:
+    if executemany:
+        return f"<executemany:{len(parameters)}>"
+
+    if isinstance(parameters, dict):
+        return {key: _redact(value) for key, value in parameters.items()}
+
+    return [_redact(value) for value in parameters or ()]
+
+
+def _find_caller() -> str | None:
+    """ SQL 문을 실행한 models/ 의 메소드 이름을 찾습니다.
+        AsyncSession 은 greenlet 안에서 실행되므로 현재 greenlet 의 스택이 끝나면 부모 greenlet(코루틴 쪽) 스택을 이어서 봅니다.
+
+    """
+    glet, frame = greenlet.getcurrent(), sys._getframe(1)
+    while glet is not None:
+        while frame is not None:
+            if frame.f_globals.get("__name__", "").startswith("models."):
+                return frame.f_code.co_qualname
+
+            frame = frame.f_back
+
+        glet = glet.parent
+        frame = glet.gr_frame if glet is not None else None
+
+    return None
+
+
+def _write(record: Dict[str, Any]):
+    _logger.info(orjson.dumps(record).decode("utf-8"))
+
+
+async def _explain(engine: AsyncEngine, record: Dict[str, Any], statement: str, parameters: Any):
+    _in_explain.set(True)
+    try:
+        async with engine.connect() as conn:
+            await conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+            result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+            record["plan"] = [row[0] for row in result]
+            await conn.rollback()
+
+    except Exception as e:
+        record["plan_error"] = str(e)
+
+    finally:
+        _explaining.discard(statement)
+        _write(record)
+
+
+def install_slow_query_log(engine: AsyncEngine, threshold_ms: float, explain_rate: float = 0.1, path: str = SLOW_QUERY_LOG):
+    """ threshold_ms 이상 걸린 SQL 문을 기록하는 훅을 겁니다. DBObject 가 한 번만 호출합니다.
+
+    """
+    queued_file_logger(_logger.name, path, SLOW_QUERY_LOG_BYTES, SLOW_QUERY_LOG_BACKUPS)
+    threshold = threshold_ms / 1000
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_started = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._slow_query_started
+        if elapsed < threshold or _in_explain.get():
+            return
+
+        try:
+            record = {
+                "time": datetime.now().isoformat(timespec="milliseconds"),
+                "elapsed_ms": round(elapsed * 1000, 2),
+                "caller": _find_caller(),
+                "request_id": current_request_id(),
+                "statement": statement,
+                "parameters": _redact_parameters(parameters, executemany),
+                "plan": None,
+            }
+            _records.append(record)
+
+            explain = (not executemany and statement not in _explaining and random.random() < explain_rate
+                       and EXPLAINABLE.match(statement) and not DATA_MODIFYING.search(statement))
+            if explain:
+                # 요청을 기다리게 하지 않도록 이벤트 루프에 따로 맡깁니다. 기록은 EXPLAIN 이 끝난 다음 파일에 씁니다.
+                _explaining.add(statement)
+                task = asyncio.get_running_loop().create_task(_explain(engine, record, statement, parameters))
+                _tasks.add(task)
+                task.add_done_callback(_tasks.discard)
+            else:
+                _write(record)
+
+        except Exception as e:
+            logging.error(e, exc_info=e)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
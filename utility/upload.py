@@ -0,0 +1,101 @@
+from models.response import ResponseStatusCode
+from utility.checker import sniff_image_type
+from utility.image_meta import remember_image_meta, sidecar_path
+from fastapi import UploadFile
+from typing import List, Tuple
+import tempfile
+import hashlib
+import asyncio
+import uuid
+import os
+
+CHUNK_SIZE = 64 * 1024
+MAX_FILE_BYTES = 10 * 1024 * 1024  # 이미지 한 장의 최대 크기
+MAX_REQUEST_BYTES = 40 * 1024 * 1024  # 요청 하나에 담긴 이미지 전체의 최대 크기
+
+
+class UploadError(Exception):
+    """ 업로드된 파일이 형식이나 크기 제한을 어겼을 때 발생하는 에러입니다.
+
+    """
+    def __init__(self, message: str, detail: str, status_code: ResponseStatusCode = ResponseStatusCode.ENTITY_ERROR):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.message = message
+        self.detail = detail
+
+
+class UploadBudget:
+    """ 요청 하나에서 저장할 수 있는 남은 바이트 수를 추적합니다.
+
+    """
+    def __init__(self, max_bytes: int = MAX_REQUEST_BYTES):
+        self.remaining = max_bytes
+
+    def consume(self, size: int):
+        self.remaining -= size
+        if self.remaining < 0:
+            raise UploadError("업로드 가능한 전체 용량을 초과하였습니다.", "Request too large.")
+
+
+def _close_file(fp, sync: bool):
+    fp.flush()
+    if sync:
+        os.fsync(fp.fileno())
+    fp.close()
+
+
+async def save_upload(file: UploadFile, directory: str, budget: UploadBudget | None = None, max_bytes: int = MAX_FILE_BYTES) -> Tuple[str, str]:
+    """ UploadFile을 CHUNK_SIZE 단위로 읽어서 임시 파일에 쓰고, 끝까지 쓰면 최종 이름으로 rename 합니다.
+        디스크 쓰기는 스레드 풀에서 실행되어 이벤트 루프를 막지 않고,
+        크기 제한은 다 읽은 뒤가 아니라 읽는 도중에 검사합니다.
+
+    ### Raises
+        - UploadError: 지원하지 않는 형식이거나 max_bytes, budget을 넘었을 때 발생하는 에러입니다.
+
+    ### Returns
+        Tuple[str, str]: (저장된 파일 경로, 이미지 형식)
+    """
+    loop = asyncio.get_running_loop()
+    chunk = await file.read(CHUNK_SIZE)
+    image_type = sniff_image_type(chunk)
+    if image_type is None:
+        raise UploadError("지원하지 않는 파일 형식입니다.", "Unsupported file type.")
+
+    os.makedirs(directory, exist_ok=True)
+    file_path = os.path.join(directory, f"{uuid.uuid4()}.{image_type}")
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    fp = os.fdopen(fd, "wb")
+
+    try:
+        written = 0
+        digest = hashlib.sha256()
+        while chunk:
+            written += len(chunk)
+            if written > max_bytes:
+                raise UploadError("이미지 용량이 너무 큽니다.", f"File exceeds {max_bytes} bytes.")
+
+            if budget:
+                budget.consume(len(chunk))
+
+            digest.update(chunk)
+            await loop.run_in_executor(None, fp.write, chunk)
+            chunk = await file.read(CHUNK_SIZE)
+
+        await loop.run_in_executor(None, _close_file, fp, True)
+        os.replace(temp_path, file_path)
+        await loop.run_in_executor(None, remember_image_meta, file_path, digest.hexdigest(), image_type)
+        return (file_path, image_type)
+
+    except BaseException:
+        fp.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def discard_uploads(file_paths: List[str]):
+    for file_path in file_paths:
+        for path in (file_path, sidecar_path(file_path)):
+            if os.path.exists(path):
+                os.remove(path)